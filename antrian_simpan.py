@@ -0,0 +1,357 @@
+"""
+Antrian tulis (write-behind) untuk form INPUT NILAI
+Submit divalidasi lalu langsung dicatat di antrian lokal (SQLite, tahan restart);
+worker latar belakang mengirim antrian per batch ke Supabase dengan retry dan backoff.
+Entri baru dihapus dari antrian setelah insert berhasil, jadi tidak ada data yang hilang
+saat koneksi terputus atau aplikasi dimulai ulang.
+
+Setelah kegagalan yang mungkin terjadi sesudah server commit (timeout, koneksi putus),
+batch berikutnya dicocokkan dulu dengan server lewat (nim, tanggal_input) agar tidak
+tersisip dua kali. Baris yang ditolak server secara permanen (lihat galat_permanen)
+dipisahkan dengan membelah batch lalu dipindah ke tabel antrian_gagal sehingga tidak
+menahan antrian.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from postgrest.exceptions import APIError
+
+from data_nilai import JEDA_AWAL, KOLOM_SEMUA, TABEL_NILAI
+from indeks_nim import normalisasi
+
+BERKAS_ANTRIAN = ".antrian_simpan.db"
+UKURAN_BATCH_ANTRIAN = 200
+INTERVAL_KIRIM = 0.5
+MAKS_JEDA = 60.0
+
+SKEMA_ANTRIAN = """
+CREATE TABLE IF NOT EXISTS antrian (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL,
+    dibuat REAL NOT NULL
+)
+"""
+
+SKEMA_ANTRIAN_GAGAL = """
+CREATE TABLE IF NOT EXISTS antrian_gagal (
+    id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    dibuat REAL NOT NULL,
+    galat TEXT NOT NULL,
+    waktu_gagal REAL NOT NULL
+)
+"""
+
+# Kelas SQLSTATE yang menandakan request ditolak karena isinya (22 = data, 23 = constraint,
+# 42 = kolom/tabel tidak ada atau tanpa hak akses); mengulang baris yang sama tidak akan
+# pernah berhasil
+KELAS_GALAT_PERMANEN = ("22", "23", "42")
+# Galat PostgREST PGRST0xx adalah koneksi ke database (sementara); PGRST1xx/2xx/3xx menolak
+# request, skema atau JWT-nya
+AWALAN_PGRST_SEMENTARA = "PGRST0"
+# Status 4xx yang tetap layak dicoba ulang (request timeout, rate limit)
+HTTP_SEMENTARA = ("408", "429")
+
+
+def kunci_baris(baris: dict) -> tuple:
+    """
+    (nim, tanggal_input) untuk mencocokkan baris kiriman dengan baris server; waktu
+    dinormalisasi karena server bisa mengembalikan timestamp dengan pecahan detik
+    dipangkas atau zona waktu
+    """
+    waktu = baris.get("tanggal_input")
+    try:
+        waktu = datetime.fromisoformat(str(waktu)).replace(tzinfo=None).isoformat()
+    except ValueError:
+        pass
+    return baris.get("nim"), waktu
+
+
+def galat_permanen(e: Exception) -> bool:
+    """
+    True jika request ditolak sehingga tidak perlu dicoba ulang: SQLSTATE data/constraint/
+    skema, galat PostgREST selain koneksi database, atau status HTTP 4xx (respons tanpa JSON
+    membawa status HTTP sebagai code). Galat jaringan, timeout, 408/429, 5xx dan sirkuit
+    terbuka dianggap sementara.
+    """
+    if isinstance(e, APIError):
+        kode = str(e.code or "")
+        if kode.startswith("PGRST"):
+            return not kode.startswith(AWALAN_PGRST_SEMENTARA)
+        if len(kode) == 3 and kode.isdigit():
+            return kode.startswith("4") and kode not in HTTP_SEMENTARA
+        return kode[:2] in KELAS_GALAT_PERMANEN
+    # Data antrian rusak / tidak bisa diserialisasi
+    return isinstance(e, (TypeError, ValueError))
+
+
+class AntrianSimpan:
+    """
+    Antrian insert persisten dengan satu worker pengirim per proses.
+    saat_tersimpan(baris) dipanggil dengan baris hasil insert (berisi id) setelah batch terkirim.
+    Baris yang ditolak permanen bisa dilihat lewat daftar_gagal() dan dibuang lewat buang_gagal().
+    """
+
+    def __init__(self, client, berkas: str = BERKAS_ANTRIAN,
+                 ukuran_batch: int = UKURAN_BATCH_ANTRIAN,
+                 interval: float = INTERVAL_KIRIM,
+                 jeda_awal: float = JEDA_AWAL,
+                 maks_jeda: float = MAKS_JEDA,
+                 saat_tersimpan: Optional[Callable[[List[dict]], None]] = None):
+        self.client = client
+        self.ukuran_batch = ukuran_batch
+        self.interval = interval
+        self.jeda_awal = jeda_awal
+        self.maks_jeda = maks_jeda
+        self.saat_tersimpan = saat_tersimpan
+
+        self._conn = sqlite3.connect(berkas, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SKEMA_ANTRIAN)
+        self._conn.execute(SKEMA_ANTRIAN_GAGAL)
+        self._lock = threading.Lock()
+        self._lock_kirim = threading.Lock()
+        self._ada_data = threading.Event()
+        self._berhenti = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.terkirim = 0
+        self.batch_terkirim = 0
+        self.gagal = 0
+        self.gagal_beruntun = 0
+        self.galat_terakhir = ""
+        self.ditolak = 0
+        self._latensi: deque = deque(maxlen=100)
+
+        # Sisa antrian dari proses sebelumnya langsung dikirim; bisa jadi sebagian sudah
+        # masuk ke server sebelum proses berhenti, jadi dicocokkan dulu
+        self._perlu_cek = False
+        if self.kedalaman():
+            self._perlu_cek = True
+            self._ada_data.set()
+
+    # ==================== ANTRIAN ====================
+    def tambah(self, data: dict) -> int:
+        """
+        Catat satu baris di antrian (commit ke disk sebelum kembali)
+        Returns: nomor antrian lokal
+        """
+        with self._lock:
+            kursor = self._conn.execute(
+                "INSERT INTO antrian (data, dibuat) VALUES (?, ?)",
+                (json.dumps(data), time.time()))
+        self._ada_data.set()
+        return int(kursor.lastrowid)
+
+    def kedalaman(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM antrian").fetchone()[0]
+
+    def cari(self, nim: str, semester: int) -> Optional[int]:
+        """
+        Nomor antrian entri dengan nim (ternormalisasi) + semester yang sama, None jika tidak ada.
+        Antrian biasanya pendek, jadi cukup dipindai.
+        """
+        kunci = (normalisasi(nim), str(semester))
+        with self._lock:
+            baris = self._conn.execute("SELECT id, data FROM antrian ORDER BY id").fetchall()
+        for i, data in baris:
+            data = json.loads(data)
+            if (normalisasi(data.get("nim")), str(data.get("semester"))) == kunci:
+                return i
+        return None
+
+    def _ambil_batch(self) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, data FROM antrian ORDER BY id LIMIT ?",
+                (self.ukuran_batch,)).fetchall()
+
+    def _hapus_batch(self, id_antrian: List[int]) -> None:
+        with self._lock:
+            self._conn.executemany("DELETE FROM antrian WHERE id = ?",
+                                   [(i,) for i in id_antrian])
+
+    def _pindah_gagal(self, entri: tuple, galat: str) -> None:
+        """
+        Pindahkan satu entri yang ditolak permanen ke antrian_gagal (satu transaksi)
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO antrian_gagal (id, data, dibuat, galat, waktu_gagal) "
+                "SELECT id, data, dibuat, ?, ? FROM antrian WHERE id = ?",
+                (galat, time.time(), entri[0]))
+            self._conn.execute("DELETE FROM antrian WHERE id = ?", (entri[0],))
+            self._conn.execute("COMMIT")
+        self.ditolak += 1
+
+    def jumlah_gagal(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM antrian_gagal").fetchone()[0]
+
+    def daftar_gagal(self) -> List[dict]:
+        """
+        Entri yang ditolak permanen beserta pesan galatnya, terlama dulu
+        """
+        with self._lock:
+            baris = self._conn.execute(
+                "SELECT id, data, galat, waktu_gagal FROM antrian_gagal ORDER BY id").fetchall()
+        return [{"antrian": i, **json.loads(data), "galat": galat, "waktu_gagal": waktu}
+                for i, data, galat, waktu in baris]
+
+    def buang_gagal(self) -> int:
+        """
+        Kosongkan antrian_gagal setelah barisnya diperiksa/diinput ulang
+        Returns: jumlah entri yang dibuang
+        """
+        with self._lock:
+            return self._conn.execute("DELETE FROM antrian_gagal").rowcount
+
+    # ==================== PENGIRIMAN ====================
+    def _cocokkan_server(self, batch: List[tuple]) -> List[dict]:
+        """
+        Buang dari antrian entri yang ternyata sudah ada di server, dicocokkan lewat
+        (nim, tanggal_input) yang diisi saat submit
+        Returns: baris server untuk entri yang sudah tersimpan
+        """
+        kunci, waktu = {}, set()
+        for i, data in batch:
+            baris = json.loads(data)
+            kunci.setdefault(kunci_baris(baris), []).append(i)
+            if baris.get("tanggal_input") is not None:
+                waktu.add(baris["tanggal_input"])
+        if not waktu:
+            return []
+        response = (self.client.table(TABEL_NILAI).select(",".join(KOLOM_SEMUA))
+                    .in_("tanggal_input", sorted(waktu)).execute())
+        ada, id_ada = [], []
+        for baris in response.data or []:
+            antre = kunci.get(kunci_baris(baris))
+            if antre:
+                id_ada.append(antre.pop(0))
+                ada.append(baris)
+        self._hapus_batch(id_ada)
+        self.terkirim += len(id_ada)
+        return ada
+
+    def _kirim(self, batch: List[tuple], tersimpan: List[dict]) -> None:
+        """
+        Insert batch dalam satu request; jika ditolak permanen, batch dibelah dua sampai
+        baris penyebabnya terisolasi lalu dipindah ke antrian_gagal.
+        Setiap bagian yang berhasil langsung dihapus dari antrian dan hasil insert-nya
+        ditambahkan ke tersimpan.
+        """
+        try:
+            mulai = time.perf_counter()
+            response = (self.client.table(TABEL_NILAI)
+                        .insert([json.loads(data) for _, data in batch])
+                        .execute())
+            self._latensi.append(time.perf_counter() - mulai)
+        except Exception as e:
+            if not galat_permanen(e):
+                # Bisa gagal sesudah server commit: batch berikutnya dicocokkan dulu
+                self._perlu_cek = True
+                raise
+            self.galat_terakhir = getattr(e, "message", None) or str(e)
+            if len(batch) == 1:
+                self._pindah_gagal(batch[0], self.galat_terakhir)
+                return
+            tengah = len(batch) // 2
+            self._kirim(batch[:tengah], tersimpan)
+            self._kirim(batch[tengah:], tersimpan)
+            return
+        self._hapus_batch([i for i, _ in batch])
+        self.terkirim += len(batch)
+        self.batch_terkirim += 1
+        tersimpan.extend(response.data or [])
+
+    def kirim_batch(self) -> int:
+        """
+        Kirim satu batch terlama dalam satu request insert.
+        Returns: jumlah entri yang keluar dari antrian (terkirim atau ditolak permanen);
+        exception sementara diteruskan dan batch tetap di antrian
+        """
+        tersimpan: List[dict] = []
+        try:
+            with self._lock_kirim:
+                batch = self._ambil_batch()
+                if not batch:
+                    return 0
+                if self._perlu_cek:
+                    tersimpan = self._cocokkan_server(batch)
+                    self._perlu_cek = False
+                    batch = self._ambil_batch()
+                if batch:
+                    self._kirim(batch, tersimpan)
+        finally:
+            if self.saat_tersimpan and tersimpan:
+                try:
+                    self.saat_tersimpan(tersimpan)
+                except Exception:
+                    pass
+        return len(batch) or len(tersimpan)
+
+    def _jalankan(self) -> None:
+        while not self._berhenti.is_set():
+            self._ada_data.wait(self.interval)
+            self._ada_data.clear()
+            try:
+                while self.kirim_batch() and not self._berhenti.is_set():
+                    pass
+                self.gagal_beruntun = 0
+            except Exception as e:
+                self.gagal += 1
+                self.gagal_beruntun += 1
+                self.galat_terakhir = str(e)
+                # Backoff eksponensial; antrian tetap utuh dan dicoba lagi setelah jeda
+                jeda = min(self.jeda_awal * (2 ** (self.gagal_beruntun - 1)), self.maks_jeda)
+                self._berhenti.wait(jeda)
+                self._ada_data.set()
+
+    def mulai(self) -> "AntrianSimpan":
+        if self._thread is None or not self._thread.is_alive():
+            self._berhenti.clear()
+            self._thread = threading.Thread(target=self._jalankan, name="antrian-simpan",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def hentikan(self, timeout: Optional[float] = None) -> None:
+        self._berhenti.set()
+        self._ada_data.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def tunggu_kosong(self, timeout: float = 10.0) -> bool:
+        """
+        Tunggu sampai antrian habis terkirim (untuk skrip/pengujian)
+        """
+        batas = time.monotonic() + timeout
+        self._ada_data.set()
+        while self.kedalaman():
+            if time.monotonic() > batas:
+                return False
+            time.sleep(0.05)
+        return True
+
+    # ==================== STATISTIK ====================
+    def statistik(self) -> dict:
+        latensi = list(self._latensi)
+        return {
+            "kedalaman": self.kedalaman(),
+            "terkirim": self.terkirim,
+            "batch": self.batch_terkirim,
+            "gagal": self.gagal,
+            "gagal_beruntun": self.gagal_beruntun,
+            "galat_terakhir": self.galat_terakhir,
+            "ditolak": self.jumlah_gagal(),
+            "latensi_terakhir": latensi[-1] if latensi else None,
+            "latensi_rata": sum(latensi) / len(latensi) if latensi else None,
+        }
@@ -2,14 +2,19 @@
 Aplikasi Hitung Nilai Mahasiswa
 Universitas Nurdin Hamzah
 UAS Pemrograman Berbasis Platform
+
+Modul berat (pandas, plotly, supabase) dan koneksi database baru dimuat saat halaman
+data pertama kali dibuka, sehingga cold start halaman HOME tidak membayarnya
 """
 
+from __future__ import annotations
+
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-from supabase import create_client, Client
+import math
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from latensi import UKURAN_BUFFER_DEFAULT, PencatatLatensi
 
 # ==================== KONFIGURASI ====================
 st.set_page_config(
@@ -27,78 +32,479 @@ def init_supabase() -> Client:
     Menggunakan st.secrets untuk deployment di Streamlit Cloud
     """
     try:
+        from supabase import create_client
+
         # Untuk Streamlit Cloud, gunakan st.secrets
         supabase_url = st.secrets["SUPABASE_URL"]
         supabase_key = st.secrets["SUPABASE_KEY"]
         
+        if KONEKSI_TERKELOLA:
+            return init_koneksi().buat_client(supabase_url, supabase_key)
         return create_client(supabase_url, supabase_key)
     except Exception as e:
         st.error(f"Gagal koneksi ke Supabase: {e}")
         st.info("Pastikan SUPABASE_URL dan SUPABASE_KEY sudah diset di Streamlit Secrets")
         return None
 
-supabase = init_supabase()
+def baca_konfigurasi(nama: str, default):
+    """
+    Membaca konfigurasi opsional dari st.secrets, fallback ke default
+    """
+    try:
+        nilai = st.secrets.get(nama, default)
+        if isinstance(default, bool) and isinstance(nilai, str):
+            return nilai.strip().lower() in ("1", "true", "ya", "yes")
+        return type(default)(nilai)
+    except Exception:
+        return default
 
-# ==================== FUNGSI UTILITY ====================
-def hitung_nilai_akhir(tugas: float, uts: float, uas: float) -> float:
+# Client Supabase lewat pool koneksi keep-alive dengan timeout per request, batas request
+# bersamaan dan pemutus sirkuit (pengaturan KONEKSI_* di secrets)
+KONEKSI_TERKELOLA = baca_konfigurasi("KONEKSI_TERKELOLA", True)
+
+@st.cache_resource
+def init_koneksi() -> KoneksiSupabase:
     """
-    Menghitung nilai akhir berdasarkan bobot:
-    - Tugas: 30%
-    - UTS: 30%
-    - UAS: 40%
+    Satu httpx.Client terkelola per proses, dipakai bersama semua sesi
     """
-    return (0.3 * tugas) + (0.3 * uts) + (0.4 * uas)
+    return KoneksiSupabase(KonfigurasiKoneksi.dari_konfigurasi(baca_konfigurasi))
 
-def konversi_nilai_huruf(nilai_akhir: float) -> tuple:
+# ==================== CACHE DATA ====================
+@st.cache_resource
+def init_cache() -> CacheNilai:
     """
-    Konversi nilai angka ke huruf dan predikat
-    Returns: (huruf, predikat)
+    Cache snapshot nilai_mahasiswa yang dipakai bersama oleh semua sesi
+    TTL dan batas memori diatur lewat CACHE_TTL_DETIK dan CACHE_MAKS_MB di secrets,
+    interval muat ulang penuh lewat CACHE_MUAT_PENUH_DETIK
     """
-    if nilai_akhir >= 85:
-        return ("A", "Sangat Baik")
-    elif nilai_akhir >= 70:
-        return ("B", "Baik")
-    elif nilai_akhir >= 60:
-        return ("C", "Cukup")
-    elif nilai_akhir >= 50:
-        return ("D", "Kurang")
-    else:
-        return ("E", "Gagal")
+    return CacheNilai(
+        ttl=baca_konfigurasi("CACHE_TTL_DETIK", TTL_DEFAULT),
+        maks_byte=baca_konfigurasi("CACHE_MAKS_MB", MAKS_BYTE_DEFAULT // (1024 * 1024)) * 1024 * 1024,
+        umur_penuh=baca_konfigurasi("CACHE_MUAT_PENUH_DETIK", UMUR_PENUH_DEFAULT),
+    )
+
+# ==================== SKEMA PENILAIAN ====================
+@st.cache_resource
+def init_registri() -> RegistriSkema:
+    """
+    Registri skema penilaian per prodi/semester, dikompilasi sekali per proses
+    """
+    return muat_registri()
+
+# ==================== CACHE GRAFIK ====================
+@st.cache_resource
+def init_cache_grafik() -> CacheGrafik:
+    """
+    Cache JSON grafik STATISTIK per sidik data agregat, batas entri lewat GRAFIK_MAKS_ENTRI
+    """
+    return CacheGrafik(baca_konfigurasi("GRAFIK_MAKS_ENTRI", MAKS_ENTRI_DEFAULT))
+
+# ==================== LATENSI ====================
+@st.cache_resource
+def init_pencatat() -> PencatatLatensi:
+    """
+    Pencatat latensi per operasi (ring buffer sepanjang LATENSI_UKURAN_BUFFER per operasi)
+    """
+    return PencatatLatensi(baca_konfigurasi("LATENSI_UKURAN_BUFFER", UKURAN_BUFFER_DEFAULT))
+
+pencatat = init_pencatat()
+
+# Panel kinerja (p50/p95/p99 per operasi) di sidebar, hanya untuk admin
+PANEL_KINERJA = baca_konfigurasi("PANEL_KINERJA", False)
+BERKAS_METRIK = baca_konfigurasi("BERKAS_METRIK", "metrik_latensi")
+
+# Mode sinkron delta: snapshot kedaluwarsa diperbarui inkremental, bukan dimuat ulang penuh
+SINKRON_DELTA = baca_konfigurasi("SINKRON_DELTA", True)
+
+# Penyimpanan lokal: baca/tulis dilayani SQLite lokal, disinkronkan ke Supabase di latar belakang
+PENYIMPANAN_LOKAL = baca_konfigurasi("PENYIMPANAN_LOKAL", False)
+
+# ==================== PENYIMPANAN LOKAL ====================
+@st.cache_resource
+def init_penyimpanan_lokal() -> PenyimpananLokal:
+    """
+    Berkas SQLite lokal (BERKAS_LOKAL) dengan worker sinkronisasi; tanpa koneksi Supabase
+    aplikasi berjalan offline dari berkas lokal saja
+    """
+    return PenyimpananLokal(
+        baca_konfigurasi("BERKAS_LOKAL", BERKAS_LOKAL), supabase,
+        interval=baca_konfigurasi("INTERVAL_SINKRON_DETIK", INTERVAL_SINKRON),
+    ).mulai()
+
+# Simpan asinkron: submit form masuk antrian lokal, dikirim per batch oleh worker latar belakang
+SIMPAN_ASINKRON = baca_konfigurasi("SIMPAN_ASINKRON", True)
+
+# ==================== ANTRIAN SIMPAN ====================
+@st.cache_resource
+def init_antrian() -> AntrianSimpan:
+    """
+    Antrian tulis persisten (satu worker per proses); baris yang terkirim langsung
+    dimasukkan ke cache snapshot dan agregat berjalan
+    """
+    def saat_tersimpan(baris: list) -> None:
+        cache.tambah_baris(baris)
+        if berjalan is not None:
+            berjalan.tambah(baris)
+
+    return AntrianSimpan(supabase, baca_konfigurasi("BERKAS_ANTRIAN", BERKAS_ANTRIAN),
+                         saat_tersimpan=saat_tersimpan).mulai()
+
+# ==================== INDEKS NIM ====================
+@st.cache_resource
+def init_indeks() -> IndeksNim:
+    """
+    Indeks NIM/nama di memori atas snapshot (id, nama, nim, prodi, semester), dipakai bersama
+    semua sesi untuk cek duplikat dan pencarian awalan
+    """
+    return IndeksNim()
+
+# Snapshot disimpan dengan tipe ringkas (kategori, int8, float32, string Arrow)
+SNAPSHOT_RINGKAS = baca_konfigurasi("SNAPSHOT_RINGKAS", True)
+
+# Statistik diagregasi di Postgres (RPC statistik_nilai) alih-alih mengunduh seluruh tabel
+STATISTIK_SERVER = baca_konfigurasi("STATISTIK_SERVER", True)
+
+# Agregat berjalan: sumber utama metrik dan statistik selama snapshot ada di proses (RPC hanya
+# dipakai jika membangunnya berarti mengunduh tabel); diperbarui per insert/delete, dibangun
+# ulang penuh dari snapshot setiap UMUR_STATISTIK_DETIK
+STATISTIK_BERJALAN = baca_konfigurasi("STATISTIK_BERJALAN", True)
+
+# ==================== STATISTIK BERJALAN ====================
+@st.cache_resource
+def init_statistik_berjalan() -> StatistikBerjalan:
+    """
+    Agregat berjalan bersama semua sesi; dibangun dari snapshot saat pertama dibaca
+    """
+    return StatistikBerjalan()
+
+# ==================== ROLLUP NILAI ====================
+@st.cache_resource
+def init_rollup() -> RollupNilai:
+    """
+    Rollup harian di memori atas snapshot, dipakai jika tabel rollup_nilai_harian belum ada di server
+    """
+    return RollupNilai()
 
+# ==================== FUNGSI UTILITY ====================
+@pencatat.bungkus()
 def simpan_data_mahasiswa(data: dict) -> bool:
     """
     Menyimpan data mahasiswa ke Supabase
+    Dengan antrian aktif, data dicatat di antrian lokal dan dikirim di latar belakang
     """
     try:
+        if lokal is not None:
+            lokal.simpan([data])
+            return True
+        if antrian is not None:
+            antrian.tambah(data)
+            return True
+
         response = supabase.table("nilai_mahasiswa").insert(data).execute()
+        if response.data:
+            cache.tambah_baris(response.data)
+            if berjalan is not None:
+                berjalan.tambah(response.data)
+        else:
+            cache.invalidasi()
+            if berjalan is not None:
+                berjalan.invalidasi()
         return True
     except Exception as e:
         st.error(f"Gagal menyimpan data: {e}")
         return False
 
-def ambil_semua_data() -> pd.DataFrame:
+@pencatat.bungkus()
+def perbarui_data_mahasiswa(id_data: int, data: dict) -> bool:
     """
-    Mengambil semua data dari Supabase
+    Menimpa baris yang sudah ada (upsert berdasarkan id) alih-alih menambah baris kedua
     """
     try:
-        response = supabase.table("nilai_mahasiswa").select("*").execute()
+        if lokal is not None:
+            if not lokal.perbarui(id_data, data):
+                # Baris lama sudah terhapus: simpan sebagai data baru
+                lokal.simpan([data])
+            return True
+
+        sebelum = snapshot_statistik()
+        response = (supabase.table("nilai_mahasiswa")
+                    .upsert({**data, "id": int(id_data)}, on_conflict="id").execute())
+        kurangi_statistik_berjalan(sebelum, [id_data])
+        cache.hapus_baris([id_data])
         if response.data:
-            return pd.DataFrame(response.data)
-        return pd.DataFrame()
+            cache.tambah_baris(response.data)
+            if berjalan is not None:
+                berjalan.tambah(response.data)
+        else:
+            cache.invalidasi()
+            if berjalan is not None:
+                berjalan.invalidasi()
+        return True
+    except Exception as e:
+        st.error(f"Gagal memperbarui data: {e}")
+        return False
+
+def sinkronkan_snapshot(kolom: list, df: pd.DataFrame, id_server: int = None):
+    """
+    Sinkronisasi delta snapshot lokal: hanya mengambil baris baru dan membuang baris terhapus
+    Returns: (snapshot baru, id terbesar yang sudah ditarik dari server)
+    """
+    df_baru, _, _, id_server = sinkron_delta(supabase, df, kolom, ringkas=SNAPSHOT_RINGKAS,
+                                             id_server=id_server)
+    return df_baru, id_server
+
+@pencatat.bungkus()
+def ambil_semua_data(kolom: list = None) -> pd.DataFrame:
+    """
+    Mengambil semua data dari Supabase secara bertahap per halaman
+    Parameter kolom membatasi kolom yang diambil (default: semua kolom)
+    """
+    try:
+        if lokal is not None:
+            return lokal.ambil(kolom or KOLOM_SEMUA)
+        return cache.ambil(kolom or KOLOM_SEMUA,
+                           lambda k: ambil_data(supabase, k, ringkas=SNAPSHOT_RINGKAS),
+                           sinkronkan_snapshot if SINKRON_DELTA else None)
     except Exception as e:
         st.error(f"Gagal mengambil data: {e}")
         return pd.DataFrame()
 
-def hapus_data(id_data: int) -> bool:
+def siapkan_statistik_berjalan() -> StatistikBerjalan:
+    """
+    Agregat berjalan yang siap dibaca; dibangun (ulang) dari snapshot jika belum ada atau sudah tua
+    """
+    if berjalan.perlu_bangun(UMUR_STATISTIK):
+        with pencatat.ukur("bangun_statistik_berjalan"):
+            berjalan.bangun(ambil_semua_data(KOLOM_STATISTIK))
+    return berjalan
+
+def statistik_berjalan_utama() -> bool:
+    """
+    True jika metrik dibaca dari agregat berjalan: agregat sudah dibangun dan masih segar, atau
+    snapshot kolom statistik sudah ada di cache sehingga membangunnya tidak mengunduh tabel
+    """
+    if berjalan is None:
+        return False
+    return (not berjalan.perlu_bangun(UMUR_STATISTIK)
+            or cache.tersedia(KOLOM_STATISTIK, delta=SINKRON_DELTA))
+
+def snapshot_statistik():
+    """
+    Snapshot kolom statistik yang diambil sebelum delete/update, agar nilai baris lamanya
+    masih ada (sinkron delta sesudah delete sudah membuangnya). None jika agregat belum dibangun
+    """
+    if berjalan is None or not berjalan.siap:
+        return None
+    return ambil_semua_data(KOLOM_STATISTIK)
+
+def kurangi_statistik_berjalan(sebelum, id_data: list) -> None:
+    """
+    Keluarkan baris yang dihapus dari agregat berjalan; nilainya dicari di snapshot_statistik()
+    yang diambil sebelum delete
+    """
+    if berjalan is None or not berjalan.siap:
+        return
+    if sebelum is None or sebelum.empty or "id" not in sebelum.columns:
+        berjalan.invalidasi()
+        return
+    berjalan.hapus(sebelum[sebelum["id"].isin(list(id_data))].to_dict("records"))
+
+def siapkan_indeks() -> IndeksNim:
+    """
+    Indeks NIM diselaraskan dengan snapshot terbaru (inkremental untuk baris baru)
+    """
+    return indeks.selaraskan(ambil_semua_data(KOLOM_INDEKS))
+
+@pencatat.bungkus()
+def cari_duplikat(nim: str, semester: int):
+    """
+    Id data dengan NIM dan semester yang sama, None jika belum ada.
+    Data yang masih di antrian simpan belum punya id; diperiksa terpisah lewat antrian.cari
+    """
+    try:
+        if lokal is not None:
+            return lokal.cari_duplikat(nim, semester)
+        return siapkan_indeks().cari_duplikat(nim, semester)
+    except Exception:
+        return None
+
+@pencatat.bungkus()
+def cari_mahasiswa(teks: str, batas: int = None) -> pd.DataFrame:
+    """
+    Pencarian awalan NIM atau nama; id dicari di indeks, baris lengkap diambil per id
+    """
+    batas = batas or BATAS_HASIL
+    try:
+        if lokal is not None:
+            return lokal.cari_teks(teks, KOLOM_REKAP, batas)
+        id_data = siapkan_indeks().cari(teks, batas)
+        if not id_data:
+            return pd.DataFrame(columns=KOLOM_REKAP)
+        df = ambil_data(supabase, KOLOM_REKAP, filter_data={"id": id_data})
+        # Urutan hasil indeks (kecocokan NIM lebih dulu) dipertahankan
+        return df.set_index("id").reindex(id_data).dropna(how="all").reset_index()
+    except Exception as e:
+        st.error(f"Gagal mencari data: {e}")
+        return pd.DataFrame(columns=KOLOM_REKAP)
+
+@pencatat.bungkus()
+def hapus_data(id_data: int) -> int:
     """
     Menghapus data berdasarkan ID
+    Returns: jumlah data yang dihapus (0 jika ID tidak ada), None jika gagal
+    """
+    return jalankan_hapus([id_data])
+
+@pencatat.bungkus()
+def hapus_banyak(id_data: list) -> int:
+    """
+    Menghapus banyak ID sekaligus (delete in_/rentang per batch), cache di-patch langsung
+    Returns: jumlah data yang dihapus, None jika gagal
+    """
+    return jalankan_hapus(id_data)
+
+def jalankan_hapus(id_data: list) -> int:
+    """
+    Isi hapus_data/hapus_banyak, tanpa pencatat latensi sendiri agar satu hapus
+    hanya tercatat sekali di bawah nama operasi pemanggilnya
     """
     try:
-        response = supabase.table("nilai_mahasiswa").delete().eq("id", id_data).execute()
-        return True
+        if lokal is not None:
+            return lokal.hapus(id_data)
+        sebelum = snapshot_statistik()
+        jumlah = hapus_id(supabase, id_data)
+        if jumlah == len(set(id_data)):
+            kurangi_statistik_berjalan(sebelum, id_data)
+            cache.hapus_baris(id_data)
+        else:
+            # Sebagian id tidak terhapus (sudah tidak ada atau ditolak RLS): tidak bisa di-patch
+            cache.invalidasi()
+            if berjalan is not None:
+                berjalan.invalidasi()
+        return jumlah
     except Exception as e:
         st.error(f"Gagal menghapus data: {e}")
-        return False
+        return None
+
+@pencatat.bungkus()
+def hapus_sesuai_filter(filter_data: dict) -> int:
+    """
+    Menghapus semua data yang cocok dengan filter dalam satu delete, cache di-patch langsung
+    Returns: jumlah data yang dihapus, None jika gagal
+    """
+    try:
+        if lokal is not None:
+            return lokal.hapus(lokal.cari_id(filter_data))
+        sebelum = snapshot_statistik()
+        id_data = hapus_dengan_filter(supabase, filter_data)
+        kurangi_statistik_berjalan(sebelum, id_data)
+        cache.hapus_baris(id_data)
+        return len(id_data)
+    except Exception as e:
+        st.error(f"Gagal menghapus data: {e}")
+        return None
+
+@pencatat.bungkus()
+def ambil_statistik() -> StatistikNilai:
+    """
+    Mengambil statistik nilai dari agregat berjalan jika snapshot ada di proses, selain itu
+    diagregasi di server lewat RPC statistik_nilai.
+    Fallback ke agregat berjalan (jika aktif) atau perhitungan pandas dari snapshot lokal
+    """
+    if lokal is not None:
+        return lokal.statistik()
+    if statistik_berjalan_utama():
+        siapkan_statistik_berjalan()
+        with pencatat.ukur("baca_statistik_berjalan"):
+            return berjalan.statistik()
+    if STATISTIK_SERVER:
+        try:
+            with pencatat.ukur("rpc_statistik_nilai"):
+                return statistik_dari_server(supabase)
+        except Exception:
+            pass
+    if berjalan is not None:
+        siapkan_statistik_berjalan()
+        with pencatat.ukur("baca_statistik_berjalan"):
+            return berjalan.statistik()
+    df = ambil_semua_data(KOLOM_STATISTIK)
+    with pencatat.ukur("agregasi_statistik"):
+        return statistik_dari_dataframe(df)
+
+@pencatat.bungkus()
+def ambil_ringkasan() -> dict:
+    """
+    Ringkasan jumlah/rata-rata/maks/min nilai akhir dari agregat berjalan jika snapshot ada di
+    proses, selain itu lewat agregasi di server.
+    Fallback ke agregat berjalan (jika aktif) atau snapshot lokal jika RPC ringkasan_nilai
+    belum tersedia
+    """
+    if lokal is not None:
+        return lokal.ringkasan()
+    if statistik_berjalan_utama():
+        return siapkan_statistik_berjalan().ringkasan()
+    if STATISTIK_SERVER:
+        try:
+            with pencatat.ukur("rpc_ringkasan_nilai"):
+                return ringkasan_dari_server(supabase)
+        except Exception:
+            pass
+    if berjalan is not None:
+        return siapkan_statistik_berjalan().ringkasan()
+    df = ambil_semua_data(KOLOM_STATISTIK)
+    with pencatat.ukur("agregasi_ringkasan"):
+        return ringkasan_dari_dataframe(df)
+
+@pencatat.bungkus()
+def ambil_rollup() -> pd.DataFrame:
+    """
+    Rollup harian nilai (tanggal x prodi x semester) untuk tab Tren Historis, dari tabel rollup
+    yang dipelihara trigger. Fallback ke rollup di memori jika migrasi rollup belum dijalankan
+    """
+    if lokal is not None:
+        return lokal.rollup()
+    if STATISTIK_SERVER:
+        try:
+            with pencatat.ukur("ambil_rollup_server"):
+                return ambil_rollup_server(supabase)
+        except Exception:
+            pass
+    df = ambil_semua_data(KOLOM_SUMBER_ROLLUP)
+    with pencatat.ukur("rollup_snapshot"):
+        return rollup.selaraskan(df).harian()
+
+@pencatat.bungkus()
+def hitung_data(filter_data: dict) -> int:
+    """
+    Jumlah data sesuai filter lewat count query
+    """
+    try:
+        if lokal is not None:
+            return lokal.hitung(filter_data)
+        return hitung_baris(supabase, filter_data=filter_data)
+    except Exception as e:
+        st.error(f"Gagal menghitung data: {e}")
+        return 0
+
+@pencatat.bungkus()
+def ambil_halaman_rekap(halaman: int, ukuran_halaman: int, filter_data: dict) -> pd.DataFrame:
+    """
+    Mengambil satu halaman tabel rekap yang sudah difilter di server
+    """
+    try:
+        if lokal is not None:
+            return lokal.halaman(halaman, ukuran_halaman, KOLOM_REKAP, filter_data)
+        return ambil_halaman_tampilan(supabase, halaman, ukuran_halaman, KOLOM_REKAP, filter_data)
+    except Exception as e:
+        st.error(f"Gagal mengambil data: {e}")
+        return pd.DataFrame(columns=KOLOM_REKAP)
+
+def tampilkan_grafik(nama: str, data) -> None:
+    """
+    Menampilkan grafik dari cache grafik; waktu bangun/ambil dan render dicatat per grafik
+    """
+    with pencatat.ukur(f"grafik_{nama}"):
+        st.plotly_chart(cache_grafik.ambil(nama, data), use_container_width=True)
 
 # ==================== STYLING CSS ====================
 st.markdown("""
@@ -150,6 +556,46 @@ UAS Pemrograman Berbasis Platform
 Tahun 2025
 """)
 
+# ==================== MODUL & LAYANAN DATA ====================
+# HOME hanya berisi teks statis. Halaman lain memuat modul data dan layanan bersama
+# (sekali per proses; rerun berikutnya memakai modul dan cache_resource yang sudah ada)
+HALAMAN_DATA = menu != "🏠 HOME"
+if HALAMAN_DATA:
+    import pandas as pd
+
+    from antrian_simpan import BERKAS_ANTRIAN, AntrianSimpan
+    from cache_nilai import MAKS_BYTE_DEFAULT, TTL_DEFAULT, UMUR_PENUH_DEFAULT, CacheNilai
+    from data_nilai import (KOLOM_REKAP, KOLOM_SEMUA, KOLOM_STATISTIK, Rentang, ambil_data,
+                            ambil_halaman_tampilan, hapus_dengan_filter, hapus_id, hitung_baris,
+                            sinkron_delta)
+    from ekspor_nilai import FORMAT_EKSPOR, ekspor_ke_berkas, format_tersedia
+    from grafik_nilai import (MAKS_ENTRI_DEFAULT, CacheGrafik, data_rata_prodi, data_sebaran_huruf,
+                              data_tren_angkatan, data_tren_prodi, data_tren_semester)
+    from hitung_ulang import baca_checkpoint, hitung_ulang
+    from impor_nilai import KOLOM_IMPOR, UKURAN_BATCH, impor
+    from indeks_nim import BATAS_HASIL, KOLOM_INDEKS, IndeksNim
+    from koneksi_supabase import STATUS_TERBUKA, KonfigurasiKoneksi, KoneksiSupabase
+    from penyimpanan import BERKAS_LOKAL, INTERVAL_SINKRON, PenyimpananLokal
+    from penilaian import RegistriSkema, muat_registri
+    from rollup_nilai import (KOLOM_SUMBER_ROLLUP, RollupNilai, ambil_rollup_server, rollup_periode,
+                              tren_angkatan, tren_prodi)
+    from statistik import (StatistikNilai, ringkasan_dari_dataframe, ringkasan_dari_server,
+                           statistik_dari_dataframe, statistik_dari_server)
+    from statistik_berjalan import UMUR_BANGUN_ULANG, StatistikBerjalan
+
+    supabase = init_supabase()
+    cache = init_cache()
+    registri = init_registri()
+    cache_grafik = init_cache_grafik()
+    indeks = init_indeks()
+    rollup = init_rollup()
+    lokal = init_penyimpanan_lokal() if PENYIMPANAN_LOKAL else None
+    # Penyimpanan lokal sudah mengagregasi lewat indeks SQLite
+    berjalan = init_statistik_berjalan() if STATISTIK_BERJALAN and lokal is None else None
+    UMUR_STATISTIK = baca_konfigurasi("UMUR_STATISTIK_DETIK", UMUR_BANGUN_ULANG)
+    # Penyimpanan lokal sudah menjadi antrian tulis sendiri
+    antrian = init_antrian() if SIMPAN_ASINKRON and supabase is not None and lokal is None else None
+
 # ==================== HALAMAN HOME ====================
 if menu == "🏠 HOME":
     st.markdown("""
@@ -237,7 +683,7 @@ elif menu == "📝 INPUT NILAI":
     </div>
     """, unsafe_allow_html=True)
     
-    if supabase is None:
+    if supabase is None and lokal is None:
         st.error("⚠️ Koneksi database tidak tersedia. Periksa konfigurasi Supabase.")
         st.stop()
     
@@ -250,10 +696,10 @@ elif menu == "📝 INPUT NILAI":
         with col1:
             nama = st.text_input("Nama Mahasiswa *", placeholder="Contoh: Budi Santoso")
             nim = st.text_input("NIM *", placeholder="Contoh: 2021001")
-            prodi = st.selectbox("Program Studi *", ["SI", "TI", "Teknosi"])
+            prodi = st.selectbox("Program Studi *", registri.daftar_prodi)
         
         with col2:
-            semester = st.selectbox("Semester *", list(range(1, 9)))
+            semester = st.selectbox("Semester *", registri.daftar_semester)
             st.write("")  # Spacer
             st.write("")  # Spacer
         
@@ -292,8 +738,8 @@ elif menu == "📝 INPUT NILAI":
             st.warning("⚠️ Minimal satu nilai harus diisi!")
         else:
             # Hitung nilai akhir
-            nilai_akhir = hitung_nilai_akhir(nilai_tugas, nilai_uts, nilai_uas)
-            nilai_huruf, predikat = konversi_nilai_huruf(nilai_akhir)
+            nilai_akhir, nilai_huruf, predikat = registri.nilai(
+                nilai_tugas, nilai_uts, nilai_uas, prodi, semester)
             
             # Tampilkan hasil perhitungan
             st.markdown("### 🎯 Hasil Perhitungan")
@@ -347,16 +793,106 @@ elif menu == "📝 INPUT NILAI":
                 "tanggal_input": datetime.now().isoformat()
             }
             
-            with st.spinner("Menyimpan data ke database..."):
-                if simpan_data_mahasiswa(data_mahasiswa):
-                    st.markdown("""
+            # NIM + semester yang sudah ada ditawarkan untuk diperbarui, bukan disimpan dua kali
+            id_duplikat = cari_duplikat(nim, semester)
+            if antrian is not None and id_duplikat is None and antrian.cari(nim, semester) is not None:
+                st.session_state.pop("duplikat_input", None)
+                st.warning(f"⚠️ Data NIM {nim} semester {semester} masih dalam antrian simpan. "
+                           f"Tunggu sampai terkirim, lalu simpan lagi untuk memperbaruinya.")
+            elif id_duplikat is not None:
+                st.session_state["duplikat_input"] = {"id": id_duplikat, "data": data_mahasiswa}
+            else:
+                st.session_state.pop("duplikat_input", None)
+                with st.spinner("Menyimpan data ke database..."):
+                    berhasil = simpan_data_mahasiswa(data_mahasiswa)
+                if berhasil:
+                    keterangan = ("Data mahasiswa masuk antrian dan dikirim ke database Supabase di latar belakang."
+                                  if antrian is not None else
+                                  "Data mahasiswa telah tersimpan ke database Supabase.")
+                    st.markdown(f"""
                     <div class="success-box">
                         <h4>✅ Data Berhasil Disimpan!</h4>
-                        <p>Data mahasiswa telah tersimpan ke database Supabase.</p>
+                        <p>{keterangan}</p>
                     </div>
                     """, unsafe_allow_html=True)
                     st.balloons()
 
+    # Konfirmasi data ganda (bertahan antar rerun sampai dipilih)
+    duplikat = st.session_state.get("duplikat_input")
+    if duplikat is not None:
+        data_baru = duplikat["data"]
+        st.warning(f"⚠️ Data NIM {data_baru['nim']} semester {data_baru['semester']} sudah ada "
+                   f"(ID {duplikat['id']}). Perbarui data lama dengan nilai baru?")
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            perbarui = st.button("🔁 Perbarui Data Lama", type="primary", key="perbarui_duplikat")
+        with col2:
+            batal = st.button("Batal", key="batal_duplikat")
+        if perbarui:
+            with st.spinner("Memperbarui data di database..."):
+                berhasil = perbarui_data_mahasiswa(duplikat["id"], data_baru)
+            if berhasil:
+                st.session_state.pop("duplikat_input", None)
+                st.success(f"✅ Data {data_baru['nama']} ({data_baru['nim']}) berhasil diperbarui.")
+        elif batal:
+            st.session_state.pop("duplikat_input", None)
+            st.rerun()
+
+    # Impor massal
+    st.markdown("---")
+    with st.expander("📂 Impor Massal dari CSV/Excel"):
+        st.caption("Kolom wajib: " + ", ".join(KOLOM_IMPOR) +
+                   ". Nilai akhir, huruf dan predikat dihitung otomatis. "
+                   "Impor selalu menambah baris baru tanpa cek NIM + semester ganda.")
+        berkas = st.file_uploader("Unggah berkas nilai", type=["csv", "xlsx"])
+        ukuran_batch = st.number_input("Jumlah baris per batch", min_value=50,
+                                       max_value=5000, value=UKURAN_BATCH, step=50)
+
+        if supabase is None:
+            st.caption("Impor massal membutuhkan koneksi Supabase.")
+        if berkas is not None and st.button("📥 Impor Data", type="primary", disabled=supabase is None):
+            # Perkiraan jumlah baris untuk progress bar (CSV: jumlah baris - header)
+            perkiraan = max(berkas.getvalue().count(b"\n") - 1, 1) if berkas.name.lower().endswith(".csv") else None
+            progres = st.progress(0.0)
+            status = st.empty()
+
+            def laporkan_batch(laporan, hasil):
+                if perkiraan:
+                    progres.progress(min((hasil.tersimpan + hasil.gagal + hasil.ditolak) / perkiraan, 1.0))
+                ikon = "✅" if laporan.berhasil else "❌"
+                status.write(f"{ikon} Batch {laporan.nomor}: {laporan.jumlah} baris "
+                             f"({laporan.durasi:.2f} dtk, percobaan {laporan.percobaan}) — "
+                             f"total tersimpan {hasil.tersimpan}")
+
+            try:
+                hasil = impor(supabase, berkas, berkas.name, int(ukuran_batch),
+                              registri=registri, saat_batch=laporkan_batch)
+            except Exception as e:
+                st.error(f"Gagal mengimpor berkas: {e}")
+            else:
+                progres.progress(1.0)
+                if hasil.tersimpan:
+                    st.success(f"✅ {hasil.tersimpan} data berhasil diimpor.")
+                if hasil.gagal:
+                    st.error(f"❌ {hasil.gagal} data gagal disimpan setelah beberapa percobaan.")
+                if hasil.kesalahan:
+                    st.warning(f"⚠️ {hasil.ditolak} baris ditolak karena tidak valid:")
+                    st.dataframe(pd.DataFrame(hasil.kesalahan), use_container_width=True, hide_index=True)
+
+                # Baris baru masuk ke cache lewat sinkron delta
+                if lokal is not None:
+                    lokal.minta_sinkron()
+                elif SINKRON_DELTA:
+                    try:
+                        cache.sinkronkan(sinkronkan_snapshot)
+                    except Exception:
+                        cache.invalidasi()
+                else:
+                    cache.invalidasi()
+                # Baris impor tidak lewat simpan_data_mahasiswa, agregat dibangun ulang
+                if berjalan is not None:
+                    berjalan.invalidasi()
+
 # ==================== HALAMAN REKAPITULASI NILAI ====================
 elif menu == "📊 REKAPITULASI NILAI":
     st.markdown("""
@@ -365,83 +901,139 @@ elif menu == "📊 REKAPITULASI NILAI":
     </div>
     """, unsafe_allow_html=True)
     
-    if supabase is None:
+    if supabase is None and lokal is None:
         st.error("⚠️ Koneksi database tidak tersedia. Periksa konfigurasi Supabase.")
         st.stop()
     
-    # Ambil data
+    # Ringkasan dihitung di server, tabel tidak diunduh
     with st.spinner("Memuat data dari database..."):
-        df = ambil_semua_data()
+        ringkasan = ambil_ringkasan()
     
-    if df.empty:
+    if ringkasan["jumlah"] == 0:
         st.info("📭 Belum ada data mahasiswa. Silakan input data terlebih dahulu.")
     else:
         # Statistik Ringkas
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("👥 Total Mahasiswa", len(df))
+            st.metric("👥 Total Mahasiswa", ringkasan["jumlah"])
         with col2:
-            st.metric("📚 Rata-rata Nilai", f"{df['nilai_akhir'].mean():.2f}")
+            st.metric("📚 Rata-rata Nilai", f"{ringkasan['rata_rata']:.2f}")
         with col3:
-            st.metric("⭐ Nilai Tertinggi", f"{df['nilai_akhir'].max():.2f}")
+            st.metric("⭐ Nilai Tertinggi", f"{ringkasan['maks']:.2f}")
         with col4:
-            st.metric("📉 Nilai Terendah", f"{df['nilai_akhir'].min():.2f}")
+            st.metric("📉 Nilai Terendah", f"{ringkasan['min']:.2f}")
         
         st.markdown("---")
         
-        # Filter
+        # Pencarian awalan NIM/nama lewat indeks, tanpa memindai tabel
+        kata_kunci = st.text_input("🔍 Cari NIM atau nama",
+                                   placeholder="Ketik awal NIM atau nama mahasiswa",
+                                   key="cari_rekap")
+        if kata_kunci.strip():
+            hasil_cari = cari_mahasiswa(kata_kunci)
+            if hasil_cari.empty:
+                st.caption(f"Tidak ada mahasiswa dengan NIM atau nama berawalan \"{kata_kunci.strip()}\".")
+            else:
+                st.caption(f"{len(hasil_cari)} hasil (maks. {BATAS_HASIL})")
+                st.dataframe(hasil_cari.drop(columns=["id"]), use_container_width=True, hide_index=True)
+            st.markdown("---")
+        
+        # Filter (diterapkan di server)
         col1, col2, col3 = st.columns(3)
         with col1:
             filter_prodi = st.multiselect("Filter Program Studi", 
-                                         options=df['prodi'].unique(),
-                                         default=df['prodi'].unique())
+                                         options=registri.daftar_prodi,
+                                         default=registri.daftar_prodi)
         with col2:
             filter_semester = st.multiselect("Filter Semester",
-                                            options=sorted(df['semester'].unique()),
-                                            default=sorted(df['semester'].unique()))
+                                            options=registri.daftar_semester,
+                                            default=registri.daftar_semester)
         with col3:
             filter_predikat = st.multiselect("Filter Predikat",
-                                            options=df['predikat'].unique(),
-                                            default=df['predikat'].unique())
+                                            options=registri.daftar_predikat,
+                                            default=registri.daftar_predikat)
+        
+        # Semua pilihan terpilih = tanpa filter, agar query tidak perlu klausa in_
+        filter_data = {
+            "prodi": None if set(filter_prodi) == set(registri.daftar_prodi) else filter_prodi,
+            "semester": None if set(filter_semester) == set(registri.daftar_semester) else filter_semester,
+            "predikat": None if set(filter_predikat) == set(registri.daftar_predikat) else filter_predikat,
+        }
         
-        # Apply filter
-        df_filtered = df[
-            (df['prodi'].isin(filter_prodi)) & 
-            (df['semester'].isin(filter_semester)) &
-            (df['predikat'].isin(filter_predikat))
-        ]
+        jumlah_filter = hitung_data(filter_data)
+        st.markdown(f"### 📋 Data Mahasiswa ({jumlah_filter} dari {ringkasan['jumlah']} data)")
         
-        st.markdown(f"### 📋 Data Mahasiswa ({len(df_filtered)} dari {len(df)} data)")
+        # Paginasi server
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            ukuran_halaman = st.selectbox("Baris per halaman", [25, 50, 100, 250], index=1)
+        jumlah_halaman = max(1, math.ceil(jumlah_filter / ukuran_halaman))
+        if st.session_state.get("halaman_rekap", 1) > jumlah_halaman:
+            st.session_state["halaman_rekap"] = jumlah_halaman
+        with col2:
+            halaman = st.number_input(f"Halaman (dari {jumlah_halaman})", min_value=1,
+                                      max_value=jumlah_halaman, step=1, key="halaman_rekap")
         
         # Kolom yang ditampilkan
         columns_display = ['nama', 'nim', 'prodi', 'semester', 'nilai_tugas', 
                           'nilai_uts', 'nilai_uas', 'nilai_akhir', 'nilai_huruf', 'predikat']
         
-        # Tampilkan tabel
-        st.dataframe(
-            df_filtered[columns_display],
+        # Tampilkan tabel (hanya halaman yang terlihat yang diambil)
+        # Kolom 🗑️ untuk memilih beberapa baris yang akan dihapus sekaligus (admin)
+        df_halaman = ambil_halaman_rekap(int(halaman), ukuran_halaman, filter_data)
+        tabel_rekap = st.data_editor(
+            df_halaman[["id"] + columns_display].assign(pilih=False),
+            column_order=["pilih"] + columns_display,
+            column_config={"pilih": st.column_config.CheckboxColumn("🗑️", default=False)},
+            disabled=["id"] + columns_display,
             use_container_width=True,
             hide_index=True
         )
+        id_terpilih = [int(i) for i in tabel_rekap.loc[tabel_rekap["pilih"], "id"]]
         
         # Aksi
         st.markdown("---")
         col1, col2, col3 = st.columns([1, 1, 2])
         
         with col1:
-            # Ekspor ke CSV
-            csv = df_filtered[columns_display].to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 Ekspor ke CSV",
-                data=csv,
-                file_name=f"rekap_nilai_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+            # Ekspor hanya dibuat saat diminta, ditulis per halaman ke berkas sementara
+            format_ekspor = st.selectbox("Format ekspor", format_tersedia())
+            if st.button("📥 Siapkan Ekspor", use_container_width=True, disabled=supabase is None):
+                with st.spinner("Menyiapkan berkas ekspor..."):
+                    try:
+                        berkas_ekspor = ekspor_ke_berkas(supabase, format_ekspor,
+                                                         columns_display, filter_data)
+                    except Exception as e:
+                        st.error(f"Gagal menyiapkan ekspor: {e}")
+                        berkas_ekspor = None
+                if berkas_ekspor is not None:
+                    info_format = FORMAT_EKSPOR[format_ekspor]
+                    # download_button membaca isi berkas saat dipanggil, jadi berkas
+                    # sementara bisa langsung ditutup (dan dihapus) sesudahnya
+                    with berkas_ekspor:
+                        st.download_button(
+                            label=f"💾 Unduh {format_ekspor}",
+                            data=berkas_ekspor,
+                            file_name=f"rekap_nilai_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{info_format.ekstensi}",
+                            mime=info_format.mime,
+                            use_container_width=True
+                        )
         
         with col2:
             if st.button("🔄 Refresh Data", use_container_width=True):
+                if lokal is not None:
+                    lokal.minta_sinkron()
+                elif SINKRON_DELTA:
+                    try:
+                        cache.sinkronkan(sinkronkan_snapshot)
+                    except Exception:
+                        # Fallback ke muat ulang penuh
+                        cache.invalidasi()
+                else:
+                    cache.invalidasi()
+                if berjalan is not None:
+                    berjalan.invalidasi()
                 st.rerun()
         
         # Hapus data (admin only)
@@ -456,9 +1048,91 @@ elif menu == "📊 REKAPITULASI NILAI":
                 st.write("")
                 st.write("")
                 if st.button("🗑️ Hapus Data", type="secondary"):
-                    if hapus_data(id_hapus):
+                    jumlah = hapus_data(id_hapus)
+                    if jumlah:
                         st.success(f"✅ Data ID {id_hapus} berhasil dihapus!")
                         st.rerun()
+                    elif jumlah == 0:
+                        st.warning(f"Data ID {id_hapus} tidak ditemukan atau tidak boleh dihapus.")
+
+            # Baris yang dicentang di tabel
+            st.markdown("**Hapus baris terpilih**")
+            if st.button(f"🗑️ Hapus {len(id_terpilih)} Baris Terpilih", disabled=not id_terpilih):
+                jumlah = hapus_banyak(id_terpilih)
+                if jumlah is not None:
+                    st.success(f"✅ {jumlah} data berhasil dihapus!")
+                    st.rerun()
+
+            # Semua baris yang cocok dengan filter, satu delete di server
+            st.markdown("**Hapus berdasarkan filter**")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                hapus_prodi = st.multiselect("Program Studi", registri.daftar_prodi, key="hapus_prodi")
+            with col2:
+                hapus_semester = st.multiselect("Semester", registri.daftar_semester, key="hapus_semester")
+            with col3:
+                pakai_tanggal = st.checkbox("Filter tanggal input", key="hapus_pakai_tanggal")
+                tanggal_hapus = st.date_input("Tanggal input", key="hapus_tanggal",
+                                              disabled=not pakai_tanggal)
+            filter_hapus = {
+                "prodi": hapus_prodi or None,
+                "semester": hapus_semester or None,
+                "tanggal_input": Rentang(tanggal_hapus.isoformat(),
+                                         (tanggal_hapus + timedelta(days=1)).isoformat())
+                                 if pakai_tanggal else None,
+            }
+            if any(nilai is not None for nilai in filter_hapus.values()):
+                jumlah_cocok = hitung_data(filter_hapus)
+                konfirmasi = st.checkbox(f"Saya yakin menghapus {jumlah_cocok} data yang cocok",
+                                         key="hapus_konfirmasi")
+                if st.button("🗑️ Hapus Sesuai Filter", disabled=not (konfirmasi and jumlah_cocok)):
+                    jumlah = hapus_sesuai_filter(filter_hapus)
+                    if jumlah is not None:
+                        st.success(f"✅ {jumlah} data berhasil dihapus!")
+                        st.rerun()
+            else:
+                st.caption("Pilih minimal satu filter.")
+
+        # Hitung ulang nilai tersimpan (admin only)
+        with st.expander("🧮 Hitung Ulang Nilai (Admin)"):
+            st.info("Hitung ulang nilai akhir, huruf dan predikat semua data sesuai skema "
+                    "penilaian terbaru. Hanya data yang berubah yang ditulis ulang.")
+            uji = st.checkbox("Uji saja (tanpa menyimpan perubahan)", value=True)
+            # Checkpoint job yang terhenti dilanjutkan hanya jika skemanya masih sama;
+            # checkpoint skema lama diabaikan dan tertimpa saat job baru berjalan
+            checkpoint = None if uji else baca_checkpoint()
+            lanjut = False
+            if checkpoint is not None:
+                if checkpoint.sidik_skema != registri.sidik():
+                    st.warning("Checkpoint job sebelumnya dibuat dengan skema penilaian lama "
+                               "dan akan diabaikan; hitung ulang dimulai dari awal.")
+                else:
+                    st.caption(f"Job sebelumnya terhenti di id {checkpoint.id_terakhir} "
+                               f"({checkpoint.diperiksa} data diperiksa).")
+                    lanjut = not st.checkbox("Mulai dari awal (abaikan checkpoint)",
+                                             key="hitung_ulang_dari_awal")
+            if st.button("🧮 Jalankan Hitung Ulang", disabled=supabase is None):
+                status = st.empty()
+
+                def laporkan_halaman(hasil):
+                    status.write(f"⏳ {hasil.diperiksa} data diperiksa, "
+                                 f"{hasil.diubah} berubah ({hasil.durasi:.1f} dtk)")
+
+                try:
+                    hasil = hitung_ulang(supabase, registri, lanjut=lanjut, uji=uji,
+                                         saat_halaman=laporkan_halaman)
+                except Exception as e:
+                    st.error(f"Hitung ulang terhenti: {e}. Jalankan lagi untuk melanjutkan.")
+                else:
+                    aksi = "akan berubah" if uji else "diperbarui"
+                    st.success(f"✅ {hasil.diperiksa} data diperiksa, {hasil.diubah} {aksi} "
+                               f"dalam {hasil.durasi:.1f} dtk.")
+                    if hasil.diubah and not uji:
+                        cache.invalidasi()
+                        if berjalan is not None:
+                            berjalan.invalidasi()
+                        if lokal is not None:
+                            lokal.minta_sinkron(penuh=True)
 
 # ==================== HALAMAN STATISTIK NILAI ====================
 elif menu == "📈 STATISTIK NILAI":
@@ -468,28 +1142,71 @@ elif menu == "📈 STATISTIK NILAI":
     </div>
     """, unsafe_allow_html=True)
     
-    if supabase is None:
+    if supabase is None and lokal is None:
         st.error("⚠️ Koneksi database tidak tersedia. Periksa konfigurasi Supabase.")
         st.stop()
     
-    # Ambil data
-    with st.spinner("Memuat data dari database..."):
-        df = ambil_semua_data()
+    # Tab untuk berbagai statistik; hanya tab yang dipilih yang dibangun
+    tab = st.radio("Tampilan statistik",
+                   ["📊 Per Program Studi", "📅 Per Semester", "🎯 Distribusi Nilai", "📆 Tren Historis"],
+                   horizontal=True, label_visibility="collapsed", key="tab_statistik")
     
-    if df.empty:
-        st.info("📭 Belum ada data mahasiswa. Silakan input data terlebih dahulu.")
+    # TAB 4: Tren Historis, dibaca dari rollup saja (tanpa statistik snapshot)
+    if tab == "📆 Tren Historis":
+        st.subheader("Tren Nilai Lintas Tahun Akademik")
+        
+        with st.spinner("Memuat rollup nilai..."):
+            harian = ambil_rollup()
+            term = rollup_periode(harian)
+        
+        if term.empty:
+            st.info("📭 Belum ada data bertanggal input untuk dianalisis.")
+        else:
+            tren = tren_prodi(term)
+            daftar_periode = tren["periode"].unique()
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Periode Akademik", len(daftar_periode))
+            with col2:
+                st.metric("Periode Pertama", daftar_periode[0])
+            with col3:
+                st.metric("Periode Terakhir", daftar_periode[-1])
+            st.caption(f"Dihitung dari {len(harian):,} baris rollup harian "
+                       f"({int(harian['jumlah'].sum()):,} data nilai)")
+            
+            # Rata-rata per prodi dari periode ke periode
+            tampilkan_grafik("tren_prodi", data_tren_prodi(tren))
+            
+            # Angkatan = tahun masuk, diturunkan dari periode dan semester
+            st.markdown("### 👥 Rata-rata per Angkatan")
+            tampilkan_grafik("tren_angkatan", data_tren_angkatan(tren_angkatan(term)))
+            
+            # Pergeseran sebaran nilai huruf per prodi
+            st.markdown("### 🔤 Pergeseran Sebaran Nilai Huruf")
+            prodi_tren = st.selectbox("Program Studi", sorted(tren["prodi"].unique()), key="prodi_tren")
+            tampilkan_grafik("sebaran_huruf", data_sebaran_huruf(tren, prodi_tren))
+            
+            # Tabel detail
+            st.markdown("### 📋 Detail per Periode")
+            detail_tren = tren.drop(columns="indeks_periode").round(2)
+            detail_tren.columns = ['Periode', 'Program Studi', 'Jumlah Data', 'Rata-rata', 'Std Deviasi',
+                                   '% A', '% B', '% C', '% D', '% E']
+            st.dataframe(detail_tren, use_container_width=True, hide_index=True)
     else:
-        # Tab untuk berbagai statistik
-        tab1, tab2, tab3 = st.tabs(["📊 Per Program Studi", "📅 Per Semester", "🎯 Distribusi Nilai"])
+        # Ambil data
+        with st.spinner("Memuat data dari database..."):
+            stat = ambil_statistik()
+        
+        if stat.kosong:
+            st.info("📭 Belum ada data mahasiswa. Silakan input data terlebih dahulu.")
         
         # TAB 1: Statistik Per Prodi
-        with tab1:
+        elif tab == "📊 Per Program Studi":
             st.subheader("Rata-rata Nilai per Program Studi")
             
             # Hitung rata-rata per prodi
-            avg_prodi = df.groupby('prodi')['nilai_akhir'].mean().reset_index()
-            avg_prodi.columns = ['Program Studi', 'Rata-rata Nilai']
-            avg_prodi = avg_prodi.sort_values('Rata-rata Nilai', ascending=False)
+            avg_prodi = data_rata_prodi(stat)
             
             # Tampilkan dalam card
             cols = st.columns(len(avg_prodi))
@@ -506,89 +1223,48 @@ elif menu == "📈 STATISTIK NILAI":
             st.markdown("---")
             
             # Grafik batang
-            fig = px.bar(avg_prodi, x='Program Studi', y='Rata-rata Nilai',
-                        title='Grafik Rata-rata Nilai per Program Studi',
-                        color='Rata-rata Nilai',
-                        color_continuous_scale='Viridis',
-                        text='Rata-rata Nilai')
-            fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            tampilkan_grafik("rata_prodi", avg_prodi)
             
             # Tabel detail
             st.markdown("### 📋 Detail Statistik per Program Studi")
-            detail_prodi = df.groupby('prodi').agg({
-                'nilai_akhir': ['count', 'mean', 'min', 'max', 'std']
-            }).round(2)
+            detail_prodi = stat.per_prodi.round(2)
             detail_prodi.columns = ['Jumlah Mahasiswa', 'Rata-rata', 'Min', 'Max', 'Std Deviasi']
             st.dataframe(detail_prodi, use_container_width=True)
         
         # TAB 2: Statistik Per Semester
-        with tab2:
+        elif tab == "📅 Per Semester":
             st.subheader("Rata-rata Nilai per Semester")
             
             # Hitung rata-rata per semester
-            avg_semester = df.groupby('semester')['nilai_akhir'].mean().reset_index()
-            avg_semester.columns = ['Semester', 'Rata-rata Nilai']
-            avg_semester = avg_semester.sort_values('Semester')
+            avg_semester = data_tren_semester(stat)
             
             # Grafik garis
-            fig = px.line(avg_semester, x='Semester', y='Rata-rata Nilai',
-                         title='Tren Rata-rata Nilai per Semester',
-                         markers=True,
-                         line_shape='spline')
-            fig.update_traces(line_color='#667eea', line_width=3, 
-                            marker=dict(size=10, color='#764ba2'))
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            tampilkan_grafik("tren_semester", avg_semester)
             
             # Heatmap prodi vs semester
             st.markdown("### 🔥 Heatmap: Program Studi vs Semester")
-            pivot_data = df.pivot_table(values='nilai_akhir', 
-                                       index='prodi', 
-                                       columns='semester', 
-                                       aggfunc='mean')
-            fig = px.imshow(pivot_data, 
-                           labels=dict(x="Semester", y="Program Studi", color="Nilai"),
-                           color_continuous_scale='RdYlGn',
-                           aspect="auto")
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            tampilkan_grafik("heatmap", stat.matriks)
         
         # TAB 3: Distribusi Nilai
-        with tab3:
+        else:
             st.subheader("Distribusi Nilai Huruf")
             
             # Hitung distribusi nilai huruf
-            dist_huruf = df['nilai_huruf'].value_counts().sort_index()
+            dist_huruf = stat.distribusi_huruf
             
             col1, col2 = st.columns(2)
             
             with col1:
                 # Pie chart
-                fig = px.pie(values=dist_huruf.values, 
-                            names=dist_huruf.index,
-                            title='Distribusi Nilai Huruf',
-                            color_discrete_sequence=px.colors.qualitative.Set3)
-                st.plotly_chart(fig, use_container_width=True)
+                tampilkan_grafik("pie_huruf", dist_huruf)
             
             with col2:
                 # Bar chart
-                fig = px.bar(x=dist_huruf.index, y=dist_huruf.values,
-                            title='Jumlah Mahasiswa per Nilai Huruf',
-                            labels={'x': 'Nilai Huruf', 'y': 'Jumlah Mahasiswa'},
-                            color=dist_huruf.values,
-                            color_continuous_scale='Blues')
-                st.plotly_chart(fig, use_container_width=True)
+                tampilkan_grafik("bar_huruf", dist_huruf)
             
             # Histogram nilai akhir
             st.markdown("### 📊 Histogram Distribusi Nilai Akhir")
-            fig = px.histogram(df, x='nilai_akhir', nbins=20,
-                             title='Distribusi Nilai Akhir Mahasiswa',
-                             labels={'nilai_akhir': 'Nilai Akhir', 'count': 'Frekuensi'},
-                             color_discrete_sequence=['#667eea'])
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            tampilkan_grafik("histogram", stat.histogram)
             
             # Statistik deskriptif
             st.markdown("### 📈 Statistik Deskriptif")
@@ -596,13 +1272,108 @@ elif menu == "📈 STATISTIK NILAI":
             
             with col1:
                 st.write("**Nilai Akhir:**")
-                st.dataframe(df['nilai_akhir'].describe().round(2), use_container_width=True)
+                st.dataframe(stat.deskriptif.round(2), use_container_width=True)
             
             with col2:
                 st.write("**Distribusi Predikat:**")
-                dist_predikat = df['predikat'].value_counts()
+                dist_predikat = stat.distribusi_predikat
                 st.dataframe(dist_predikat, use_container_width=True)
 
+# ==================== STATUS PENYIMPANAN LOKAL ====================
+if HALAMAN_DATA and lokal is not None:
+    with st.sidebar.expander("🗄️ Penyimpanan Lokal"):
+        stat_lokal = lokal.status()
+        terakhir = ("-" if stat_lokal["terakhir_sinkron"] is None else
+                    datetime.fromtimestamp(stat_lokal["terakhir_sinkron"]).strftime("%H:%M:%S"))
+        st.caption(
+            f"{'Online' if stat_lokal['online'] else 'Offline'} | Baris lokal: {stat_lokal['baris']}  \n"
+            f"Tertunda: {stat_lokal['tertunda_simpan']} simpan, {stat_lokal['tertunda_ubah']} ubah, "
+            f"{stat_lokal['tertunda_hapus']} hapus  \n"
+            f"Sinkron terakhir: {terakhir} | Gagal: {stat_lokal['gagal']}"
+        )
+        if stat_lokal["galat_terakhir"]:
+            st.warning(f"Sinkronisasi tertunda: {stat_lokal['galat_terakhir']}")
+
+# ==================== STATUS ANTRIAN ====================
+if HALAMAN_DATA and antrian is not None:
+    stat_antrian = antrian.statistik()
+    with st.sidebar.expander("📤 Antrian Simpan", expanded=bool(stat_antrian["ditolak"])):
+        latensi = ("-" if stat_antrian["latensi_terakhir"] is None else
+                   f"{stat_antrian['latensi_terakhir'] * 1000:.0f} ms "
+                   f"(rata-rata {stat_antrian['latensi_rata'] * 1000:.0f} ms)")
+        st.caption(
+            f"Antrian: {stat_antrian['kedalaman']} | Terkirim: {stat_antrian['terkirim']} "
+            f"({stat_antrian['batch']} batch) | Gagal: {stat_antrian['gagal']}  \n"
+            f"Latensi kirim: {latensi}"
+        )
+        if stat_antrian["gagal_beruntun"]:
+            st.warning(f"Pengiriman tertunda, dicoba ulang otomatis: {stat_antrian['galat_terakhir']}")
+        if stat_antrian["ditolak"]:
+            # Baris yang ditolak server tidak dikirim ulang; periksa lalu input ulang lewat form
+            st.error(f"{stat_antrian['ditolak']} data ditolak server dan tidak tersimpan.")
+            st.dataframe(pd.DataFrame(antrian.daftar_gagal())
+                         .reindex(columns=["nama", "nim", "prodi", "semester", "galat"]),
+                         hide_index=True)
+            if st.button("Buang daftar data ditolak", key="buang_antrian_gagal"):
+                antrian.buang_gagal()
+                st.rerun()
+
+# ==================== STATUS KONEKSI ====================
+if HALAMAN_DATA and supabase is not None and KONEKSI_TERKELOLA:
+    with st.sidebar.expander("🔌 Koneksi Supabase"):
+        stat_koneksi = init_koneksi().status()
+        st.caption(
+            f"Request: {stat_koneksi['request']} | Gagal: {stat_koneksi['gagal']}  \n"
+            f"Aktif: {stat_koneksi['aktif']} (puncak {stat_koneksi['puncak_aktif']}) | "
+            f"Ditolak: {stat_koneksi['ditolak_antre'] + stat_koneksi['ditolak_sirkuit']}  \n"
+            f"Sirkuit: {stat_koneksi['sirkuit']} (dibuka {stat_koneksi['sirkuit_dibuka']}x)"
+        )
+        if stat_koneksi["sirkuit"] == STATUS_TERBUKA:
+            st.warning("Supabase gagal berulang kali; request dihentikan sementara.")
+
+# ==================== STATUS CACHE ====================
+if HALAMAN_DATA:
+    with st.sidebar.expander("📦 Cache Data"):
+        stat_cache = cache.statistik()
+        st.caption(
+            f"Hit: {stat_cache['hit']} | Miss: {stat_cache['miss']} | "
+            f"Hit ratio: {stat_cache['hit_ratio']:.0%}  \n"
+            f"Eviksi: {stat_cache['eviksi']} | Kedaluwarsa: {stat_cache['kedaluwarsa']} | "
+            f"Invalidasi: {stat_cache['invalidasi']} | Sinkron: {stat_cache['sinkron']}  \n"
+            f"Entri: {stat_cache['entri']} | Memori: {stat_cache['byte'] / 1024:.1f} KB"
+        )
+        stat_grafik = cache_grafik.statistik()
+        st.caption(
+            f"Grafik - Hit: {stat_grafik['hit']} | Miss: {stat_grafik['miss']} | "
+            f"Eviksi: {stat_grafik['eviksi']} | Entri: {stat_grafik['entri']} | "
+            f"Memori: {stat_grafik['byte'] / 1024:.1f} KB"
+        )
+
+# ==================== PANEL KINERJA ====================
+if PANEL_KINERJA:
+    with st.sidebar.expander("⏱️ Kinerja (Admin)"):
+        ringkasan_latensi = pencatat.ringkasan()
+        if not ringkasan_latensi:
+            st.caption("Belum ada operasi yang tercatat.")
+        else:
+            st.dataframe([
+                {"Operasi": nama, "n": r["jumlah"], "Gagal": r["gagal"],
+                 **{p.upper(): round(r[p] * 1000, 1) for p in ("p50", "p95", "p99")}}
+                for nama, r in ringkasan_latensi.items()
+            ], use_container_width=True, hide_index=True)
+            st.caption("Latensi dalam milidetik")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("JSON", key="ekspor_metrik_json"):
+                st.caption(f"Ditulis ke {pencatat.ekspor(f'{BERKAS_METRIK}.json')}")
+        with col2:
+            if st.button("Prometheus", key="ekspor_metrik_prom"):
+                st.caption(f"Ditulis ke {pencatat.ekspor(f'{BERKAS_METRIK}.prom')}")
+        with col3:
+            if st.button("Reset", key="reset_metrik"):
+                pencatat.reset()
+                st.rerun()
+
 # ==================== FOOTER ====================
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,491 @@
+"""
+Benchmark performa aplikasi nilai mahasiswa
+
+Penggunaan:
+    python benchmark.py penilaian --baris 1000000
+    python benchmark.py memori --baris 1000000
+    python benchmark.py suite --simpan baseline.json
+    python benchmark.py suite --ukuran 1000 100000 --banding baseline.json
+    python benchmark.py startup --ulang 5
+    python benchmark.py koneksi --sesi 1 4 16 --latensi 0.02
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_nilai import (KOLOM_REKAP, KOLOM_SEMUA, KOLOM_STATISTIK, UKURAN_HALAMAN, ambil_data,
+                        ambil_halaman_tampilan, baca_halaman_csv, hitung_baris)
+from penilaian import DAFTAR_PRODI, DAFTAR_SEMESTER, RegistriSkema, muat_registri, nilai_batch
+
+
+def ukur(fungsi: Callable, ulang: int = 3) -> float:
+    """
+    Waktu terbaik (detik) dari beberapa kali pengulangan
+    """
+    terbaik = float("inf")
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        terbaik = min(terbaik, time.perf_counter() - mulai)
+    return terbaik
+
+
+# ==================== PENILAIAN ====================
+def _nilai_baris_per_baris(tugas, uts, uas) -> list:
+    """
+    Cara lama: hitung_nilai_akhir + rantai if/elif konversi_nilai_huruf per baris
+    """
+    hasil = []
+    for t, u, a in zip(tugas.tolist(), uts.tolist(), uas.tolist()):
+        nilai_akhir = (0.3 * t) + (0.3 * u) + (0.4 * a)
+        if nilai_akhir >= 85:
+            huruf, predikat = "A", "Sangat Baik"
+        elif nilai_akhir >= 70:
+            huruf, predikat = "B", "Baik"
+        elif nilai_akhir >= 60:
+            huruf, predikat = "C", "Cukup"
+        elif nilai_akhir >= 50:
+            huruf, predikat = "D", "Kurang"
+        else:
+            huruf, predikat = "E", "Gagal"
+        hasil.append((nilai_akhir, huruf, predikat))
+    return hasil
+
+
+def bench_penilaian(baris: int, seed: int = 42) -> dict:
+    """
+    Membandingkan penilaian baris per baris dengan nilai_batch()
+    """
+    rng = np.random.default_rng(seed)
+    tugas, uts, uas = (np.round(rng.uniform(0, 100, baris), 1) for _ in range(3))
+
+    per_baris = _nilai_baris_per_baris(tugas, uts, uas)
+    batch = nilai_batch(tugas, uts, uas)
+    sama = (
+        np.array_equal(batch["nilai_akhir"].to_numpy(), np.array([h[0] for h in per_baris]))
+        and batch["nilai_huruf"].tolist() == [h[1] for h in per_baris]
+        and batch["predikat"].tolist() == [h[2] for h in per_baris]
+    )
+
+    waktu_per_baris = ukur(lambda: _nilai_baris_per_baris(tugas, uts, uas), ulang=1)
+    waktu_batch = ukur(lambda: nilai_batch(tugas, uts, uas))
+    return {
+        "baris": baris,
+        "per_baris_detik": waktu_per_baris,
+        "batch_detik": waktu_batch,
+        "percepatan": waktu_per_baris / waktu_batch,
+        "hasil_sama": bool(sama),
+    }
+
+
+# ==================== DATA SINTETIS ====================
+# Sebaran realistis: prodi besar/kecil, semester awal lebih ramai (angkatan baru + mengulang)
+PELUANG_PRODI = np.array([0.5, 0.32, 0.18])
+PELUANG_SEMESTER = np.array([0.2, 0.18, 0.16, 0.14, 0.12, 0.09, 0.07, 0.04])
+# Rata-rata dan simpangan baku tugas, UTS, UAS
+SEBARAN_NILAI = [(80.0, 9.0), (68.0, 14.0), (65.0, 15.0)]
+BARIS_PER_IMPOR = 250
+
+
+def data_sintetis(baris: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Tabel nilai_mahasiswa sintetis dengan tipe seperti hasil JSON (teks, float64).
+    Baris dimasukkan per kelompok impor (satu tanggal_input per BARIS_PER_IMPOR baris),
+    seperti rekap kelas yang diimpor sekaligus.
+    """
+    rng = np.random.default_rng(seed)
+    tugas, uts, uas = (np.clip(np.round(rng.normal(rata, sb, baris), 1), 0, 100)
+                       for rata, sb in SEBARAN_NILAI)
+    hasil = nilai_batch(tugas, uts, uas)
+    nomor = np.arange(baris)
+    jumlah_impor = -(-baris // BARIS_PER_IMPOR)
+    waktu_impor = (np.datetime64("2025-01-06T08:00:00")
+                   + np.sort(rng.integers(0, 365 * 24 * 3600, jumlah_impor)).astype("timedelta64[s]"))
+    return pd.DataFrame({
+        "id": nomor + 1,
+        "nama": [f"Mahasiswa {i}" for i in nomor],
+        "nim": [str(2020000000 + i) for i in nomor],
+        "prodi": np.array(DAFTAR_PRODI, dtype=object)[
+            rng.choice(len(DAFTAR_PRODI), baris, p=PELUANG_PRODI)],
+        "semester": np.array(DAFTAR_SEMESTER)[
+            rng.choice(len(DAFTAR_SEMESTER), baris, p=PELUANG_SEMESTER)],
+        "nilai_tugas": tugas,
+        "nilai_uts": uts,
+        "nilai_uas": uas,
+        "nilai_akhir": hasil["nilai_akhir"].round(2),
+        "nilai_huruf": hasil["nilai_huruf"].astype(object),
+        "predikat": hasil["predikat"].astype(object),
+        "tanggal_input": np.datetime_as_string(waktu_impor[nomor // BARIS_PER_IMPOR]).astype(object),
+    })
+
+
+# ==================== MEMORI SNAPSHOT ====================
+
+
+def bench_memori(baris: int, seed: int = 42) -> dict:
+    """
+    Membandingkan memori snapshot dari list of dict (cara lama) dengan loader ringkas
+    yang mem-parse respons CSV per halaman langsung ke kolom bertipe sempit
+    """
+    sumber = data_sintetis(baris, seed)
+    lama, ringkas = [], []
+    waktu_lama = waktu_ringkas = 0.0
+    for awal in range(0, baris, UKURAN_HALAMAN):
+        halaman = sumber.iloc[awal:awal + UKURAN_HALAMAN]
+        records = halaman.to_dict("records")
+        teks = halaman.to_csv(index=False)
+
+        mulai = time.perf_counter()
+        lama.append(pd.DataFrame.from_records(records, columns=KOLOM_SEMUA))
+        waktu_lama += time.perf_counter() - mulai
+
+        mulai = time.perf_counter()
+        ringkas.append(baca_halaman_csv(teks, KOLOM_SEMUA))
+        waktu_ringkas += time.perf_counter() - mulai
+
+    df_lama = pd.concat(lama, ignore_index=True)
+    df_ringkas = pd.concat(ringkas, ignore_index=True)
+
+    def byte(df: pd.DataFrame) -> int:
+        return int(df.memory_usage(index=True, deep=True).sum())
+
+    byte_lama, byte_ringkas = byte(df_lama), byte(df_ringkas)
+    # Proyeksi yang di-cache untuk halaman STATISTIK/ringkasan
+    stat_lama, stat_ringkas = byte(df_lama[KOLOM_STATISTIK]), byte(df_ringkas[KOLOM_STATISTIK])
+    sama = (
+        np.allclose(df_ringkas["nilai_akhir"].to_numpy(dtype=float),
+                    df_lama["nilai_akhir"].to_numpy(dtype=float), atol=1e-4)
+        and all((df_ringkas[k].astype(object) == df_lama[k].astype(object)).all()
+                for k in ["nim", "prodi", "semester", "nilai_huruf", "predikat"])
+    )
+    return {
+        "baris": baris,
+        "byte_per_baris_lama": byte_lama / baris,
+        "byte_per_baris_ringkas": byte_ringkas / baris,
+        "penghematan": byte_lama / byte_ringkas,
+        "byte_per_baris_statistik_lama": stat_lama / baris,
+        "byte_per_baris_statistik_ringkas": stat_ringkas / baris,
+        "penghematan_statistik": stat_lama / stat_ringkas,
+        "muat_lama_detik": waktu_lama,
+        "muat_ringkas_detik": waktu_ringkas,
+        "hasil_sama": bool(sama),
+    }
+
+
+# ==================== SUITE ====================
+UKURAN_SUITE = [1_000, 100_000, 1_000_000]
+FILTER_REKAP = {"prodi": ["SI"], "semester": [1, 2], "predikat": None}
+AMBANG_REGRESI = 1.25
+# Selisih di bawah ini dianggap derau pengukuran, bukan regresi
+SELISIH_MIN_DETIK = 0.002
+
+
+def bench_suite(baris: int, seed: int = 42,
+                registri: Optional[RegistriSkema] = None) -> Dict[str, float]:
+    """
+    Waktu terbaik (detik) jalur utama aplikasi terhadap Supabase tiruan berisi `baris` data:
+    penilaian, filter/paging REKAPITULASI, agregasi STATISTIK, ekspor CSV dan grafik
+    """
+    from ekspor_nilai import tulis_csv
+    from grafik_nilai import PEMBANGUN_GRAFIK, masukan_grafik
+    from statistik import (ringkasan_dari_server, statistik_dari_dataframe,
+                           statistik_dari_server)
+    from supabase_tiruan import SupabaseTiruan
+
+    registri = registri or muat_registri()
+    sumber = data_sintetis(baris, seed)
+    client = SupabaseTiruan()
+    client.muat(sumber)
+    # Tabel besar cukup diukur sekali per operasi
+    ulang = 3 if baris <= 100_000 else 1
+
+    hasil: Dict[str, float] = {}
+    hasil["penilaian_batch"] = ukur(lambda: nilai_batch(
+        sumber["nilai_tugas"], sumber["nilai_uts"], sumber["nilai_uas"]), ulang)
+    hasil["penilaian_registri"] = ukur(lambda: registri.nilai_batch(
+        sumber["nilai_tugas"], sumber["nilai_uts"], sumber["nilai_uas"],
+        sumber["prodi"], sumber["semester"]), ulang)
+
+    jumlah = hitung_baris(client, filter_data=FILTER_REKAP)
+    halaman_akhir = max(1, -(-jumlah // 50))
+    hasil["rekap_hitung"] = ukur(lambda: hitung_baris(client, filter_data=FILTER_REKAP), ulang)
+    hasil["rekap_halaman_awal"] = ukur(lambda: ambil_halaman_tampilan(
+        client, 1, 50, KOLOM_REKAP, FILTER_REKAP), ulang)
+    hasil["rekap_halaman_akhir"] = ukur(lambda: ambil_halaman_tampilan(
+        client, halaman_akhir, 50, KOLOM_REKAP, FILTER_REKAP), ulang)
+    hasil["rekap_ringkasan_server"] = ukur(
+        lambda: ringkasan_dari_server(client, FILTER_REKAP), ulang)
+
+    snapshot = ambil_data(client, KOLOM_STATISTIK, ringkas=True)
+    hasil["muat_snapshot_statistik"] = ukur(
+        lambda: ambil_data(client, KOLOM_STATISTIK, ringkas=True), ulang)
+    hasil["statistik_dataframe"] = ukur(lambda: statistik_dari_dataframe(snapshot), ulang)
+    hasil["statistik_server"] = ukur(lambda: statistik_dari_server(client), ulang)
+
+    hasil["ekspor_csv"] = ukur(lambda: tulis_csv(client, io.BytesIO(), KOLOM_SEMUA), ulang)
+
+    masukan = masukan_grafik(statistik_dari_dataframe(snapshot))
+    hasil["grafik_semua"] = ukur(
+        lambda: [PEMBANGUN_GRAFIK[nama](data).to_json() for nama, data in masukan.items()], ulang)
+    return hasil
+
+
+def jalankan_suite(ukuran: List[int], seed: int = 42) -> dict:
+    """
+    Suite untuk beberapa ukuran tabel, beserta lingkungan agar baseline bisa dibandingkan
+    """
+    registri = muat_registri()
+    return {
+        "dibuat": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "lingkungan": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "mesin": platform.machine(),
+            "seed": seed,
+        },
+        "hasil": {str(baris): bench_suite(baris, seed, registri) for baris in ukuran},
+    }
+
+
+def bandingkan(lama: dict, baru: dict, ambang: float = AMBANG_REGRESI) -> List[dict]:
+    """
+    Rasio waktu baru/lama untuk setiap (ukuran, operasi) yang ada di kedua baseline.
+    Regresi = rasio di atas ambang dan selisih di atas SELISIH_MIN_DETIK.
+    """
+    hasil = []
+    for baris, operasi in baru["hasil"].items():
+        for nama, detik in operasi.items():
+            detik_lama = lama.get("hasil", {}).get(baris, {}).get(nama)
+            if detik_lama is None:
+                continue
+            rasio = detik / detik_lama if detik_lama else float("inf")
+            hasil.append({
+                "baris": int(baris),
+                "operasi": nama,
+                "lama": detik_lama,
+                "baru": detik,
+                "rasio": rasio,
+                "regresi": rasio > ambang and detik - detik_lama > SELISIH_MIN_DETIK,
+            })
+    return hasil
+
+
+def main_suite(args) -> int:
+    laporan = jalankan_suite(args.ukuran)
+    for baris, operasi in laporan["hasil"].items():
+        print(f"--- {baris} baris ---")
+        for nama, detik in operasi.items():
+            print(f"{nama:>32}: {detik * 1000:10.2f} ms")
+
+    if args.simpan:
+        with open(args.simpan, "w", encoding="utf-8") as f:
+            json.dump(laporan, f, indent=2)
+        print(f"Baseline ditulis ke {args.simpan}")
+
+    if not args.banding:
+        return 0
+    with open(args.banding, encoding="utf-8") as f:
+        lama = json.load(f)
+    perbandingan = bandingkan(lama, laporan, args.ambang)
+    print(f"--- dibandingkan dengan {args.banding} ({lama.get('dibuat', '-')}) ---")
+    for p in perbandingan:
+        tanda = "  REGRESI" if p["regresi"] else ""
+        print(f"{p['baris']:>9} {p['operasi']:>28}: {p['lama'] * 1000:9.2f} -> "
+              f"{p['baru'] * 1000:9.2f} ms (x{p['rasio']:.2f}){tanda}")
+    # Kode keluar 1 jika ada regresi, agar bisa dipakai di CI
+    return 1 if any(p["regresi"] for p in perbandingan) else 0
+
+
+# ==================== STARTUP ====================
+MODUL_BERAT = ["pandas", "numpy", "plotly.express", "supabase", "postgrest", "pyarrow"]
+
+# Dijalankan di interpreter baru agar setiap pengukuran benar-benar cold start
+SKRIP_STARTUP = """
+import json, sys, time
+mulai = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+streamlit_detik = time.perf_counter() - mulai
+
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+mulai = time.perf_counter()
+at.run()
+home_detik = time.perf_counter() - mulai
+modul_home = [m for m in json.loads(sys.argv[2]) if m in sys.modules]
+
+mulai = time.perf_counter()
+at.sidebar.radio[0].set_value(sys.argv[3]).run()
+data_detik = time.perf_counter() - mulai
+print(json.dumps({"streamlit_detik": streamlit_detik, "home_detik": home_detik,
+                  "data_pertama_detik": data_detik, "modul_home": modul_home}))
+"""
+
+
+def bench_startup(ulang: int = 5, halaman_data: str = "📊 REKAPITULASI NILAI") -> dict:
+    """
+    Cold start aplikasi di interpreter baru: impor streamlit, run pertama halaman HOME,
+    lalu pertama kali membuka halaman data (memuat modul berat dan layanan).
+    Tanpa secrets koneksi Supabase gagal cepat, jadi yang terukur hanya biaya impor dan inisialisasi.
+    """
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    hasil = []
+    for _ in range(ulang):
+        keluaran = subprocess.run(
+            [sys.executable, "-c", SKRIP_STARTUP, app, json.dumps(MODUL_BERAT), halaman_data],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(app))
+        hasil.append(json.loads(keluaran.stdout.strip().splitlines()[-1]))
+    return {
+        "ulang": ulang,
+        "impor_streamlit_detik": statistics.median(h["streamlit_detik"] for h in hasil),
+        "home_detik": statistics.median(h["home_detik"] for h in hasil),
+        "halaman_data_pertama_detik": statistics.median(h["data_pertama_detik"] for h in hasil),
+        "modul_berat_di_home": ", ".join(hasil[-1]["modul_home"]) or "-",
+    }
+
+
+# ==================== KONEKSI ====================
+SESI_KONEKSI = [1, 2, 4, 8, 16]
+# Key berformat JWT (tanpa tanda tangan valid) agar create_client mau dibuat terhadap server tiruan
+KEY_TIRUAN = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.tiruan"
+
+
+def _beban_koneksi(client, sesi: int, permintaan: int) -> dict:
+    """
+    sesi thread berbagi satu client (seperti sesi Streamlit berbagi cache_resource),
+    masing-masing mengirim permintaan select berurutan
+    """
+    durasi: List[float] = []
+    gagal = [0]
+    lock = threading.Lock()
+
+    def jalan() -> None:
+        for _ in range(permintaan):
+            mulai = time.perf_counter()
+            try:
+                client.table("nilai_mahasiswa").select("id,nim,nilai_akhir").limit(10).execute()
+            except Exception:
+                with lock:
+                    gagal[0] += 1
+                continue
+            with lock:
+                durasi.append(time.perf_counter() - mulai)
+
+    thread = [threading.Thread(target=jalan) for _ in range(sesi)]
+    mulai = time.perf_counter()
+    for t in thread:
+        t.start()
+    for t in thread:
+        t.join()
+    total = time.perf_counter() - mulai
+    return {
+        "req_per_detik": len(durasi) / total,
+        "p50_ms": float(np.percentile(durasi, 50)) * 1000 if durasi else float("nan"),
+        "p95_ms": float(np.percentile(durasi, 95)) * 1000 if durasi else float("nan"),
+        "gagal": gagal[0],
+    }
+
+
+def bench_koneksi(sesi: Optional[List[int]] = None, permintaan: int = 50,
+                  latensi: float = 0.02) -> dict:
+    """
+    Uji beban lapisan koneksi terhadap server PostgREST tiruan lokal: throughput dan latensi
+    saat jumlah sesi bersamaan naik, untuk client bawaan, client terkelola yang dipaksa
+    serial (maks_bersamaan=1) dan client terkelola default; lalu perilaku pemutus sirkuit
+    saat server mengembalikan 503.
+    """
+    from supabase import create_client
+
+    from koneksi_supabase import KonfigurasiKoneksi, KoneksiSupabase
+    from server_tiruan import ServerTiruan
+
+    hasil: Dict[str, object] = {"latensi_server_ms": latensi * 1000, "permintaan_per_sesi": permintaan}
+    with ServerTiruan(latensi) as server:
+        varian = {
+            "bawaan": lambda: (create_client(server.url, KEY_TIRUAN), None),
+            "serial": lambda: (lambda k: (k.buat_client(server.url, KEY_TIRUAN), k))(
+                KoneksiSupabase(KonfigurasiKoneksi(maks_bersamaan=1))),
+            "terkelola": lambda: (lambda k: (k.buat_client(server.url, KEY_TIRUAN), k))(
+                KoneksiSupabase()),
+        }
+        for nama, buat in varian.items():
+            client, koneksi = buat()
+            for n in sesi or SESI_KONEKSI:
+                koneksi_awal = server.jumlah_koneksi
+                beban = _beban_koneksi(client, n, permintaan)
+                for kunci, nilai in beban.items():
+                    hasil[f"{nama}_sesi_{n}_{kunci}"] = nilai
+                hasil[f"{nama}_sesi_{n}_koneksi_baru"] = server.jumlah_koneksi - koneksi_awal
+            if koneksi is not None:
+                koneksi.tutup()
+
+        # Pemutus sirkuit: setelah ambang kegagalan, request ditolak tanpa menyentuh server
+        koneksi = KoneksiSupabase(KonfigurasiKoneksi(ambang_gagal=5, jeda_pemutus=60))
+        client = koneksi.buat_client(server.url, KEY_TIRUAN)
+        server.gagal = True
+        request_awal = server.jumlah_request
+        mulai = time.perf_counter()
+        beban = _beban_koneksi(client, 1, permintaan)
+        hasil["sirkuit_request_gagal"] = beban["gagal"]
+        hasil["sirkuit_sampai_server"] = server.jumlah_request - request_awal
+        hasil["sirkuit_durasi_detik"] = time.perf_counter() - mulai
+        hasil["sirkuit_status"] = koneksi.status()["sirkuit"]
+        koneksi.tutup()
+    return hasil
+
+
+BENCHMARK = {
+    "penilaian": bench_penilaian,
+    "memori": bench_memori,
+    "suite": bench_suite,
+    "startup": bench_startup,
+    "koneksi": bench_koneksi,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark aplikasi nilai mahasiswa")
+    parser.add_argument("nama", choices=sorted(BENCHMARK), help="Benchmark yang dijalankan")
+    parser.add_argument("--baris", type=int, default=1_000_000, help="Jumlah baris data sintetis")
+    parser.add_argument("--ukuran", type=int, nargs="+", default=UKURAN_SUITE,
+                        help="Ukuran tabel untuk suite")
+    parser.add_argument("--simpan", help="Tulis hasil suite ke berkas baseline JSON")
+    parser.add_argument("--banding", help="Bandingkan hasil suite dengan baseline JSON")
+    parser.add_argument("--ambang", type=float, default=AMBANG_REGRESI,
+                        help="Rasio waktu baru/lama yang dianggap regresi")
+    parser.add_argument("--ulang", type=int, default=5, help="Jumlah cold start untuk startup")
+    parser.add_argument("--sesi", type=int, nargs="+", default=SESI_KONEKSI,
+                        help="Jumlah sesi bersamaan untuk koneksi")
+    parser.add_argument("--permintaan", type=int, default=50,
+                        help="Request per sesi untuk koneksi")
+    parser.add_argument("--latensi", type=float, default=0.02,
+                        help="Latensi server tiruan (detik) untuk koneksi")
+    args = parser.parse_args(argv)
+
+    if args.nama == "suite":
+        return main_suite(args)
+
+    if args.nama == "startup":
+        hasil = bench_startup(args.ulang)
+    elif args.nama == "koneksi":
+        hasil = bench_koneksi(args.sesi, args.permintaan, args.latensi)
+    else:
+        hasil = BENCHMARK[args.nama](args.baris)
+    for kunci, nilai in hasil.items():
+        print(f"{kunci:>32}: {nilai:.4f}" if isinstance(nilai, float) else f"{kunci:>32}: {nilai}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
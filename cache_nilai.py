@@ -0,0 +1,245 @@
+"""
+Cache snapshot tabel nilai_mahasiswa yang dipakai bersama oleh semua sesi
+Mendukung TTL, batas memori (LRU), invalidasi, dan patch langsung saat insert/hapus
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from data_nilai import ringkas_dataframe
+
+TTL_DEFAULT = 300.0
+MAKS_BYTE_DEFAULT = 256 * 1024 * 1024
+
+# Sinkron delta tidak melihat perubahan in-place (mis. hitung ulang nilai),
+# jadi snapshot tetap dimuat ulang penuh setelah umur ini
+UMUR_PENUH_DEFAULT = 3600.0
+
+
+def _ukuran_dataframe(df: pd.DataFrame) -> int:
+    """
+    Perkiraan ukuran DataFrame di memori (byte)
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _id_terbesar(df: pd.DataFrame) -> Optional[int]:
+    return int(df["id"].max()) if "id" in df.columns and len(df) else None
+
+
+class _Entri:
+    __slots__ = ("df", "waktu", "waktu_penuh", "ukuran", "id_server")
+
+    def __init__(self, df: pd.DataFrame, waktu_penuh: Optional[float] = None,
+                 id_server: Optional[int] = None):
+        self.df = df
+        self.waktu = time.monotonic()
+        self.waktu_penuh = self.waktu if waktu_penuh is None else waktu_penuh
+        self.ukuran = _ukuran_dataframe(df)
+        # Id terbesar yang ditarik dari server (kursor sinkron delta); baris hasil patch
+        # insert tidak memajukannya. Muat penuh: id terbesar snapshot.
+        self.id_server = _id_terbesar(df) if id_server is None and waktu_penuh is None else id_server
+
+
+# penyegar(kolom, df_lama, id_server) -> (df_baru, id_server_baru)
+Penyegar = Callable[[List[str], pd.DataFrame, Optional[int]], Tuple[pd.DataFrame, Optional[int]]]
+
+
+class CacheNilai:
+    """
+    Cache proses untuk snapshot nilai_mahasiswa, satu entri per proyeksi kolom.
+    DataFrame yang dikembalikan dipakai bersama antar sesi, jangan dimodifikasi in-place.
+    """
+
+    def __init__(self, ttl: float = TTL_DEFAULT, maks_byte: int = MAKS_BYTE_DEFAULT,
+                 umur_penuh: float = UMUR_PENUH_DEFAULT):
+        self.ttl = ttl
+        self.maks_byte = maks_byte
+        self.umur_penuh = umur_penuh
+        self._entri: "OrderedDict[Tuple[str, ...], _Entri]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._lock_muat: Dict[Tuple[str, ...], threading.Lock] = {}
+        self.hit = 0
+        self.miss = 0
+        self.eviksi = 0
+        self.kedaluwarsa = 0
+        self.invalidasi_count = 0
+        self.sinkron = 0
+
+    # ==================== BACA ====================
+    def _segar(self, entri: _Entri) -> bool:
+        return time.monotonic() - entri.waktu <= self.ttl
+
+    def ambil(self, kolom: Sequence[str],
+              pemuat: Callable[[List[str]], pd.DataFrame],
+              penyegar: Optional[Penyegar] = None) -> pd.DataFrame:
+        """
+        Ambil snapshot dari cache, atau muat lewat pemuat(kolom) jika belum ada.
+        Jika entri kedaluwarsa dan penyegar(kolom, df_lama, id_server) diberikan, snapshot lama
+        diperbarui secara inkremental alih-alih dimuat ulang penuh, selama muat penuh
+        terakhirnya belum lebih tua dari umur_penuh.
+        Sesi yang meminta proyeksi yang sama secara bersamaan hanya memicu satu kali muat.
+        """
+        kunci = tuple(kolom)
+        with self._lock:
+            entri = self._entri.get(kunci)
+            if entri is not None and self._segar(entri):
+                self._entri.move_to_end(kunci)
+                self.hit += 1
+                return entri.df
+            lock_muat = self._lock_muat.setdefault(kunci, threading.Lock())
+
+        with lock_muat:
+            # Sesi lain mungkin sudah selesai memuat selagi kita menunggu
+            with self._lock:
+                entri = self._entri.get(kunci)
+                if entri is not None and self._segar(entri):
+                    self._entri.move_to_end(kunci)
+                    self.hit += 1
+                    return entri.df
+                self.miss += 1
+                if entri is not None:
+                    self.kedaluwarsa += 1
+
+            if (entri is not None and penyegar is not None
+                    and time.monotonic() - entri.waktu_penuh <= self.umur_penuh):
+                df, id_server = penyegar(list(kolom), entri.df, entri.id_server)
+                with self._lock:
+                    self.sinkron += 1
+                self.simpan(kunci, df, entri.waktu_penuh, id_server)
+            else:
+                df = pemuat(list(kolom))
+                self.simpan(kunci, df)
+            return df
+
+    def tersedia(self, kolom: Sequence[str], delta: bool = False) -> bool:
+        """
+        True jika snapshot proyeksi kolom bisa dibaca tanpa muat penuh: entri masih segar, atau
+        (delta=True) kedaluwarsa tetapi masih bisa disegarkan lewat sinkron delta
+        """
+        with self._lock:
+            entri = self._entri.get(tuple(kolom))
+            if entri is None:
+                return False
+            return self._segar(entri) or (
+                delta and time.monotonic() - entri.waktu_penuh <= self.umur_penuh)
+
+    def sinkronkan(self, penyegar: Penyegar) -> None:
+        """
+        Perbarui semua entri secara inkremental lewat penyegar(kolom, df_lama, id_server)
+        """
+        with self._lock:
+            daftar = [(k, self._lock_muat.setdefault(k, threading.Lock()))
+                      for k in self._entri]
+        for kunci, lock_muat in daftar:
+            with lock_muat:
+                with self._lock:
+                    entri = self._entri.get(kunci)
+                if entri is None:
+                    continue
+                df, id_server = penyegar(list(kunci), entri.df, entri.id_server)
+                with self._lock:
+                    self.sinkron += 1
+                self.simpan(kunci, df, entri.waktu_penuh, id_server)
+
+    # ==================== TULIS ====================
+    def simpan(self, kolom: Sequence[str], df: pd.DataFrame,
+               waktu_penuh: Optional[float] = None, id_server: Optional[int] = None) -> None:
+        """
+        Simpan snapshot untuk proyeksi kolom tertentu lalu terapkan batas memori.
+        waktu_penuh dan id_server diteruskan jika df hasil sinkron delta, bukan muat penuh.
+        """
+        with self._lock:
+            self._entri[tuple(kolom)] = _Entri(df, waktu_penuh, id_server)
+            self._entri.move_to_end(tuple(kolom))
+            self._terapkan_batas()
+
+    def _terapkan_batas(self) -> None:
+        total = sum(e.ukuran for e in self._entri.values())
+        # Entri terbaru selalu dipertahankan walaupun melebihi batas
+        while total > self.maks_byte and len(self._entri) > 1:
+            _, entri = self._entri.popitem(last=False)
+            total -= entri.ukuran
+            self.eviksi += 1
+
+    def _ganti_df(self, kunci: Tuple[str, ...], entri: _Entri, df: pd.DataFrame) -> None:
+        """
+        Ganti isi entri hasil patch tanpa mengubah umur TTL-nya
+        """
+        patch = _Entri(df, entri.waktu_penuh, entri.id_server)
+        patch.waktu = entri.waktu
+        self._entri[kunci] = patch
+
+    def invalidasi(self) -> None:
+        """
+        Kosongkan seluruh cache, snapshot dimuat ulang pada permintaan berikutnya
+        """
+        with self._lock:
+            self._entri.clear()
+            self.invalidasi_count += 1
+
+    def tambah_baris(self, baris: Iterable[dict]) -> None:
+        """
+        Patch cache dengan baris yang baru disimpan (hasil insert berisi id).
+        Id yang sudah ada di snapshot (mis. sudah ditarik sinkron delta) dilewati.
+        """
+        baris = list(baris)
+        if not baris:
+            return
+        if any("id" not in b for b in baris):
+            self.invalidasi()
+            return
+        with self._lock:
+            id_baris = {b["id"] for b in baris}
+            for kunci, entri in list(self._entri.items()):
+                sisa = baris
+                if not entri.df.empty and "id" in entri.df.columns:
+                    ada = set(entri.df["id"][entri.df["id"].isin(id_baris)].tolist())
+                    sisa = [b for b in baris if b["id"] not in ada]
+                if not sisa:
+                    continue
+                # Tipe disamakan dengan snapshot ringkas agar concat tidak jatuh ke object
+                baru = ringkas_dataframe(pd.DataFrame.from_records(sisa, columns=list(kunci)))
+                if entri.df.empty:
+                    df = baru
+                else:
+                    df = pd.concat([entri.df, baru], ignore_index=True)
+                self._ganti_df(kunci, entri, df)
+            self._terapkan_batas()
+
+    def hapus_baris(self, id_data: Iterable[int]) -> None:
+        """
+        Patch cache dengan membuang baris yang sudah dihapus dari database
+        """
+        id_data = set(id_data)
+        if not id_data:
+            return
+        with self._lock:
+            for kunci, entri in list(self._entri.items()):
+                if entri.df.empty or "id" not in entri.df.columns:
+                    continue
+                df = entri.df[~entri.df["id"].isin(id_data)].reset_index(drop=True)
+                self._ganti_df(kunci, entri, df)
+
+    # ==================== STATISTIK ====================
+    def statistik(self) -> dict:
+        """
+        Counter cache untuk ditampilkan/monitoring
+        """
+        with self._lock:
+            total = self.hit + self.miss
+            return {
+                "hit": self.hit,
+                "miss": self.miss,
+                "hit_ratio": (self.hit / total) if total else 0.0,
+                "eviksi": self.eviksi,
+                "kedaluwarsa": self.kedaluwarsa,
+                "invalidasi": self.invalidasi_count,
+                "sinkron": self.sinkron,
+                "entri": len(self._entri),
+                "byte": sum(e.ukuran for e in self._entri.values()),
+            }
@@ -0,0 +1,535 @@
+"""
+Lapisan akses data tabel nilai_mahasiswa
+Pengambilan data bertahap (keyset pagination pada kolom id) dengan proyeksi kolom
+"""
+
+import io
+import os
+import time
+import tomllib
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, TypeVar, Union
+
+import pandas as pd
+from postgrest.types import ReturnMethod
+
+from koneksi_supabase import KoneksiSupabase, SirkuitTerbuka
+from penilaian import DAFTAR_PREDIKAT, DAFTAR_PRODI, HURUF
+
+TABEL_NILAI = "nilai_mahasiswa"
+
+# Supabase membatasi jumlah baris per request (default max-rows = 1000)
+UKURAN_HALAMAN = 1000
+
+MAKS_PERCOBAAN = 3
+JEDA_AWAL = 1.0
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Rentang:
+    """
+    Filter rentang setengah terbuka awal <= kolom < akhir (mis. tanggal_input satu hari)
+    """
+    awal: object
+    akhir: object
+
+
+# Filter kolom -> daftar nilai yang diizinkan (klausa in_) atau Rentang, None berarti tanpa filter
+FilterData = Dict[str, Optional[Union[Sequence, Rentang]]]
+
+# ==================== PROYEKSI KOLOM ====================
+KOLOM_SEMUA = [
+    "id", "nama", "nim", "prodi", "semester",
+    "nilai_tugas", "nilai_uts", "nilai_uas",
+    "nilai_akhir", "nilai_huruf", "predikat", "tanggal_input",
+]
+
+# Halaman REKAPITULASI: kolom tabel + id untuk hapus data
+KOLOM_REKAP = [
+    "id", "nama", "nim", "prodi", "semester",
+    "nilai_tugas", "nilai_uts", "nilai_uas",
+    "nilai_akhir", "nilai_huruf", "predikat",
+]
+
+# Halaman STATISTIK tidak pernah membutuhkan nama/nim
+KOLOM_STATISTIK = ["id", "prodi", "semester", "nilai_akhir", "nilai_huruf", "predikat"]
+
+
+def _normalisasi_kolom(kolom: Optional[Sequence[str]]) -> List[str]:
+    """
+    Pastikan kolom id selalu ikut diambil karena dipakai sebagai cursor
+    """
+    kolom = list(kolom) if kolom else list(KOLOM_SEMUA)
+    if "id" not in kolom:
+        kolom.insert(0, "id")
+    return kolom
+
+
+# ==================== KONEKSI TANPA STREAMLIT ====================
+LOKASI_SECRETS = [".streamlit/secrets.toml", "secrets.toml"]
+
+
+def buat_client():
+    """
+    Membuat client Supabase untuk skrip/CLI tanpa Streamlit.
+    Kredensial dibaca dari environment (atau .env), lalu dari secrets.toml
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY")
+    for lokasi in LOKASI_SECRETS:
+        if url and key:
+            break
+        if os.path.exists(lokasi):
+            with open(lokasi, "rb") as f:
+                secrets = tomllib.load(f)
+            url = url or secrets.get("SUPABASE_URL")
+            key = key or secrets.get("SUPABASE_KEY")
+
+    if not url or not key:
+        raise RuntimeError("SUPABASE_URL dan SUPABASE_KEY belum diset (environment, .env, atau secrets.toml)")
+    return KoneksiSupabase().buat_client(url, key)
+
+
+# ==================== RETRY ====================
+def jalankan_dengan_retry(fungsi: Callable[[], T],
+                          maks_percobaan: int = MAKS_PERCOBAAN,
+                          jeda_awal: float = JEDA_AWAL) -> Tuple[T, int]:
+    """
+    Menjalankan fungsi, diulang dengan backoff eksponensial jika gagal.
+    Sirkuit terbuka tidak diulang: server sudah dianggap gagal, jadi langsung diteruskan.
+    Returns: (hasil, jumlah_percobaan). Exception percobaan terakhir diteruskan.
+    """
+    for percobaan in range(1, maks_percobaan + 1):
+        try:
+            return fungsi(), percobaan
+        except SirkuitTerbuka:
+            raise
+        except Exception:
+            if percobaan == maks_percobaan:
+                raise
+            time.sleep(jeda_awal * (2 ** (percobaan - 1)))
+
+
+# ==================== SKEMA SQLITE ====================
+# Tiruan lokal tabel nilai_mahasiswa, dipakai sebagai pengganti server untuk pengujian
+SKEMA_SQLITE = f"""
+CREATE TABLE IF NOT EXISTS {TABEL_NILAI} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nama TEXT,
+    nim TEXT,
+    prodi TEXT,
+    semester INTEGER,
+    nilai_tugas REAL,
+    nilai_uts REAL,
+    nilai_uas REAL,
+    nilai_akhir REAL,
+    nilai_huruf TEXT,
+    predikat TEXT,
+    tanggal_input TEXT
+)
+"""
+
+
+def buat_tabel_sqlite(conn) -> None:
+    """
+    Membuat tabel nilai_mahasiswa di koneksi SQLite jika belum ada
+    """
+    conn.execute(SKEMA_SQLITE)
+    conn.commit()
+
+
+# ==================== SNAPSHOT RINGKAS ====================
+# Kolom berkardinalitas rendah disimpan sebagai kategori dengan himpunan tetap
+# agar halaman-halaman yang digabung tetap berupa kategori (tidak jatuh ke object)
+KATEGORI_RINGKAS = {
+    "prodi": DAFTAR_PRODI,
+    "nilai_huruf": sorted(HURUF),
+    "predikat": DAFTAR_PREDIKAT,
+}
+KOLOM_FLOAT32 = ["nilai_tugas", "nilai_uts", "nilai_uas", "nilai_akhir"]
+KOLOM_TEKS = ["nama", "nim", "tanggal_input"]
+
+
+def tipe_teks() -> str:
+    """
+    String berbasis Arrow jika pyarrow (opsional) terpasang
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return "string"
+    return "string[pyarrow]"
+
+
+def ringkas_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mengubah tipe kolom snapshot ke bentuk ringkas: kategori untuk prodi/nilai_huruf/predikat,
+    int8 untuk semester, float32 untuk nilai dan string Arrow untuk teks.
+    Nilai kategori di luar daftar tetap dipertahankan sebagai kategori tambahan.
+    Kolom yang sudah bertipe ringkas tidak disalin ulang.
+    """
+    ubah = {}
+    for kolom, kategori in KATEGORI_RINGKAS.items():
+        if kolom not in df.columns:
+            continue
+        nilai = df[kolom]
+        if isinstance(nilai.dtype, pd.CategoricalDtype):
+            if list(nilai.cat.categories) == kategori:
+                continue
+            ada = nilai.cat.categories.tolist()
+        else:
+            ada = nilai.dropna().unique().tolist()
+        lain = sorted(set(ada) - set(kategori))
+        ubah[kolom] = pd.Categorical(nilai, categories=kategori + lain)
+    if "semester" in df.columns and df["semester"].dtype != "int8":
+        semester = pd.to_numeric(df["semester"], errors="coerce")
+        ubah["semester"] = semester.astype("int8" if semester.notna().all() else "Int8")
+    for kolom in KOLOM_FLOAT32:
+        if kolom in df.columns and df[kolom].dtype != "float32":
+            ubah[kolom] = pd.to_numeric(df[kolom], errors="coerce").astype("float32")
+    teks = tipe_teks()
+    for kolom in KOLOM_TEKS:
+        if kolom in df.columns and df[kolom].dtype != teks:
+            ubah[kolom] = df[kolom].astype(teks)
+    return df.assign(**ubah) if ubah else df
+
+
+def baca_halaman_csv(data, kolom: Sequence[str]) -> pd.DataFrame:
+    """
+    Parse satu halaman respons CSV PostgREST langsung ke kolom bertipe ringkas.
+    Respons yang sudah berupa list of dict (client tanpa dukungan CSV) tetap diterima.
+    """
+    kolom = list(kolom)
+    if isinstance(data, list):
+        return ringkas_dataframe(pd.DataFrame.from_records(data, columns=kolom))
+    if not data:
+        return ringkas_dataframe(pd.DataFrame(columns=kolom))
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if tipe_teks() == "string[pyarrow]":
+        df = _baca_csv_arrow(data)
+    else:
+        tipe = {k: "string" for k in KOLOM_TEKS}
+        tipe.update({k: "category" for k in KATEGORI_RINGKAS})
+        tipe.update({k: "float32" for k in KOLOM_FLOAT32})
+        # Hanya sel kosong yang dianggap NULL (nama seperti "NA" tetap teks)
+        df = pd.read_csv(io.BytesIO(data), dtype={k: v for k, v in tipe.items() if k in kolom},
+                         keep_default_na=False, na_values=[""])
+    return ringkas_dataframe(df.reindex(columns=kolom))
+
+
+def _baca_csv_arrow(data: bytes) -> pd.DataFrame:
+    """
+    Parser CSV pyarrow: teks langsung menjadi kolom Arrow, kategori menjadi dictionary
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    tipe = {"id": pa.int64(), "semester": pa.int8()}
+    tipe.update({k: pa.string() for k in KOLOM_TEKS})
+    tipe.update({k: pa.dictionary(pa.int32(), pa.string()) for k in KATEGORI_RINGKAS})
+    tipe.update({k: pa.float32() for k in KOLOM_FLOAT32})
+    opsi = pa_csv.ConvertOptions(column_types=tipe, null_values=[""],
+                                 strings_can_be_null=True)
+    tabel = pa_csv.read_csv(io.BytesIO(data), convert_options=opsi)
+    return tabel.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+
+
+# ==================== FILTER ====================
+def terapkan_filter(query, filter_data: Optional[FilterData] = None):
+    """
+    Menerapkan filter sebagai klausa in_ (atau gte/lt untuk Rentang) di query Supabase
+    """
+    for kolom, nilai in (filter_data or {}).items():
+        if isinstance(nilai, Rentang):
+            query = query.gte(kolom, nilai.awal).lt(kolom, nilai.akhir)
+        elif nilai is not None:
+            query = query.in_(kolom, list(nilai))
+    return query
+
+
+def filter_kosong(filter_data: Optional[FilterData] = None) -> bool:
+    """
+    True jika ada filter dengan daftar nilai kosong (pasti tidak ada baris yang cocok)
+    """
+    return any(nilai is not None and not isinstance(nilai, Rentang) and len(nilai) == 0
+               for nilai in (filter_data or {}).values())
+
+
+# ==================== PENGAMBILAN BERTAHAP ====================
+def _query_halaman(client, kolom: List[str], id_terakhir: int, ukuran_halaman: int,
+                   sampai_id: Optional[int] = None,
+                   filter_data: Optional[FilterData] = None):
+    """
+    Query satu halaman keyset: id > id_terakhir, urut id, maksimal ukuran_halaman baris
+    """
+    query = (
+        client.table(TABEL_NILAI)
+        .select(",".join(kolom))
+        .gt("id", id_terakhir)
+    )
+    if sampai_id is not None:
+        query = query.lte("id", sampai_id)
+    query = terapkan_filter(query, filter_data)
+    return query.order("id").limit(ukuran_halaman)
+
+
+def iter_halaman(client, kolom: Optional[Sequence[str]] = None,
+                 ukuran_halaman: int = UKURAN_HALAMAN,
+                 setelah_id: int = 0,
+                 sampai_id: Optional[int] = None,
+                 filter_data: Optional[FilterData] = None) -> Iterator[List[dict]]:
+    """
+    Generator halaman data (list of dict) dengan keyset cursor pada id.
+    Setiap request hanya mengambil baris dengan id > id terakhir halaman sebelumnya,
+    sehingga biaya per halaman tetap konstan berapa pun ukuran tabel.
+    """
+    kolom = _normalisasi_kolom(kolom)
+    id_terakhir = setelah_id
+    if filter_kosong(filter_data):
+        return
+
+    while True:
+        query = _query_halaman(client, kolom, id_terakhir, ukuran_halaman, sampai_id, filter_data)
+        response = query.execute()
+        baris = response.data or []
+        if not baris:
+            return
+
+        yield baris
+
+        if len(baris) < ukuran_halaman:
+            return
+        id_terakhir = baris[-1]["id"]
+
+
+def iter_dataframe_ringkas(client, kolom: Optional[Sequence[str]] = None,
+                           ukuran_halaman: int = UKURAN_HALAMAN,
+                           setelah_id: int = 0,
+                           filter_data: Optional[FilterData] = None) -> Iterator[pd.DataFrame]:
+    """
+    Seperti iter_dataframe, tetapi setiap halaman diminta sebagai CSV (Accept: text/csv)
+    dan langsung di-parse ke kolom bertipe ringkas tanpa list of dict perantara
+    """
+    kolom = _normalisasi_kolom(kolom)
+    id_terakhir = setelah_id
+    if filter_kosong(filter_data):
+        return
+
+    while True:
+        query = _query_halaman(client, kolom, id_terakhir, ukuran_halaman, filter_data=filter_data)
+        df = baca_halaman_csv(query.csv().execute().data, kolom)
+        if df.empty:
+            return
+
+        yield df
+
+        if len(df) < ukuran_halaman:
+            return
+        id_terakhir = int(df["id"].iloc[-1])
+
+
+def iter_dataframe(client, kolom: Optional[Sequence[str]] = None,
+                   ukuran_halaman: int = UKURAN_HALAMAN,
+                   setelah_id: int = 0,
+                   filter_data: Optional[FilterData] = None,
+                   ringkas: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Generator DataFrame per halaman, untuk ekspor/statistik tanpa memuat seluruh tabel.
+    ringkas=True menghasilkan kolom bertipe ringkas (lihat ringkas_dataframe).
+    """
+    kolom = _normalisasi_kolom(kolom)
+    if ringkas:
+        yield from iter_dataframe_ringkas(client, kolom, ukuran_halaman, setelah_id, filter_data)
+        return
+    for baris in iter_halaman(client, kolom, ukuran_halaman, setelah_id,
+                              filter_data=filter_data):
+        yield pd.DataFrame.from_records(baris, columns=kolom)
+
+
+def ambil_data(client, kolom: Optional[Sequence[str]] = None,
+               ukuran_halaman: int = UKURAN_HALAMAN,
+               filter_data: Optional[FilterData] = None,
+               ringkas: bool = False) -> pd.DataFrame:
+    """
+    Mengambil data halaman demi halaman lalu menggabungkannya menjadi satu DataFrame
+    """
+    chunks = list(iter_dataframe(client, kolom, ukuran_halaman, filter_data=filter_data,
+                                 ringkas=ringkas))
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+# ==================== HALAMAN TAMPILAN ====================
+def hitung_baris(client, sampai_id: Optional[int] = None,
+                 filter_data: Optional[FilterData] = None) -> int:
+    """
+    Menghitung jumlah baris di server (opsional hanya id <= sampai_id dan/atau sesuai filter)
+    tanpa mengambil datanya
+    """
+    if filter_kosong(filter_data):
+        return 0
+    query = client.table(TABEL_NILAI).select("id", count="exact", head=True)
+    if sampai_id is not None:
+        query = query.lte("id", sampai_id)
+    query = terapkan_filter(query, filter_data)
+    return query.execute().count or 0
+
+
+def ambil_halaman_tampilan(client, halaman: int, ukuran_halaman: int,
+                           kolom: Optional[Sequence[str]] = None,
+                           filter_data: Optional[FilterData] = None) -> pd.DataFrame:
+    """
+    Mengambil satu halaman tabel (halaman dimulai dari 1) yang sudah difilter di server
+    """
+    kolom = _normalisasi_kolom(kolom)
+    if filter_kosong(filter_data):
+        return pd.DataFrame(columns=kolom)
+    awal = (halaman - 1) * ukuran_halaman
+    query = terapkan_filter(client.table(TABEL_NILAI).select(",".join(kolom)), filter_data)
+    response = query.order("id").range(awal, awal + ukuran_halaman - 1).execute()
+    return pd.DataFrame.from_records(response.data or [], columns=kolom)
+
+
+# ==================== SINKRONISASI DELTA ====================
+
+def ambil_id_server(client, sampai_id: Optional[int] = None,
+                    ukuran_halaman: int = UKURAN_HALAMAN) -> Set[int]:
+    """
+    Mengambil himpunan id yang ada di server (hanya kolom id)
+    """
+    id_server = set()
+    for baris in iter_halaman(client, ["id"], ukuran_halaman, sampai_id=sampai_id):
+        id_server.update(b["id"] for b in baris)
+    return id_server
+
+
+def sinkron_delta(client, df: pd.DataFrame, kolom: Optional[Sequence[str]] = None,
+                  ukuran_halaman: int = UKURAN_HALAMAN,
+                  ringkas: bool = False,
+                  id_server: Optional[int] = None) -> Tuple[pd.DataFrame, int, int, Optional[int]]:
+    """
+    Memperbarui snapshot lokal secara inkremental:
+    - baris baru diambil dengan id > id_server, id terbesar yang terakhir ditarik dari server
+      (default: id terbesar di snapshot). Baris hasil patch insert proses ini bisa melompati
+      id milik penulis lain, jadi tidak boleh memajukan kursor ini.
+    - baris yang dihapus dicocokkan lewat diff himpunan id, hanya jika jumlah baris
+      di server sampai id_server berbeda dengan snapshot
+    Returns: (df_baru, jumlah_baris_baru, jumlah_baris_dihapus, id_server_baru)
+    """
+    kolom = _normalisasi_kolom(kolom)
+    if df.empty or "id" not in df.columns:
+        df_baru = ambil_data(client, kolom, ukuran_halaman, ringkas=ringkas)
+        return df_baru, len(df_baru), 0, (int(df_baru["id"].max()) if len(df_baru) else None)
+
+    id_terakhir = int(df["id"].max()) if id_server is None else int(id_server)
+
+    # Rekonsiliasi hapus: cek jumlah dulu, diff id hanya bila ada selisih.
+    # Baris hasil patch di atas kursor belum pernah ditarik, jadi tidak ikut dibandingkan.
+    dihapus = 0
+    sudah_ditarik = df["id"] <= id_terakhir
+    if hitung_baris(client, sampai_id=id_terakhir) != int(sudah_ditarik.sum()):
+        id_ada = ambil_id_server(client, sampai_id=id_terakhir, ukuran_halaman=ukuran_halaman)
+        masih_ada = ~sudah_ditarik | df["id"].isin(id_ada)
+        dihapus = int((~masih_ada).sum())
+        if dihapus:
+            df = df[masih_ada].reset_index(drop=True)
+
+    # Baris baru
+    chunks = list(iter_dataframe(client, kolom, ukuran_halaman, setelah_id=id_terakhir,
+                                 ringkas=ringkas))
+    baru = sum(len(c) for c in chunks)
+    if baru:
+        id_baru = pd.concat([c["id"] for c in chunks], ignore_index=True)
+        id_ditarik = int(id_baru.max())
+        # Baris hasil patch diganti versi server; patch di bawah kursor baru yang tidak
+        # dikembalikan server sudah dihapus
+        lama = df["id"].isin(id_baru) | (df["id"] <= id_ditarik) & (df["id"] > id_terakhir)
+        df = pd.concat([df[~lama]] + chunks, ignore_index=True)
+        if not df["id"].is_monotonic_increasing:
+            df = df.sort_values("id", kind="stable").reset_index(drop=True)
+        id_terakhir = id_ditarik
+
+    return df, baru, dihapus, id_terakhir
+
+
+# ==================== HAPUS BATCH ====================
+def ambil_id(client, filter_data: Optional[FilterData] = None,
+             ukuran_halaman: int = UKURAN_HALAMAN) -> List[int]:
+    """
+    Daftar id yang cocok dengan filter (hanya kolom id yang diambil)
+    """
+    return [b["id"] for baris in iter_halaman(client, ["id"], ukuran_halaman,
+                                               filter_data=filter_data)
+            for b in baris]
+
+
+def rentang_id(id_data: Sequence[int]) -> List[Tuple[int, int]]:
+    """
+    Mengelompokkan id menjadi rentang berurutan [awal, akhir]
+    """
+    rentang: List[Tuple[int, int]] = []
+    for i in sorted(set(int(i) for i in id_data)):
+        if rentang and i == rentang[-1][1] + 1:
+            rentang[-1] = (rentang[-1][0], i)
+        else:
+            rentang.append((i, i))
+    return rentang
+
+
+def hapus_id(client, id_data: Sequence[int],
+             ukuran_batch: int = UKURAN_HALAMAN,
+             min_rentang: int = 50,
+             maks_percobaan: int = MAKS_PERCOBAAN) -> int:
+    """
+    Menghapus banyak id sekaligus: rentang id berurutan yang panjang dihapus dengan satu
+    delete gte/lte, sisanya digabung dalam delete in_ per batch.
+    Returns: jumlah baris yang benar-benar dihapus server (count exact), tanpa id yang
+    sudah tidak ada atau ditolak RLS
+    """
+    def hapus(query) -> int:
+        response, _ = jalankan_dengan_retry(query.execute, maks_percobaan)
+        return response.count or 0
+
+    dihapus = 0
+    sisa: List[int] = []
+    for awal, akhir in rentang_id(id_data):
+        if akhir - awal + 1 >= min_rentang:
+            dihapus += hapus(client.table(TABEL_NILAI)
+                             .delete(count="exact", returning=ReturnMethod.minimal)
+                             .gte("id", awal).lte("id", akhir))
+        else:
+            sisa.extend(range(awal, akhir + 1))
+    for mulai in range(0, len(sisa), ukuran_batch):
+        batch = sisa[mulai:mulai + ukuran_batch]
+        dihapus += hapus(client.table(TABEL_NILAI)
+                         .delete(count="exact", returning=ReturnMethod.minimal)
+                         .in_("id", batch))
+    return dihapus
+
+
+def hapus_dengan_filter(client, filter_data: FilterData,
+                        ukuran_halaman: int = UKURAN_HALAMAN) -> List[int]:
+    """
+    Menghapus semua baris yang cocok dengan filter dalam satu request delete.
+    Id dikumpulkan dulu (untuk patch cache) dan delete dibatasi id <= id terbesar,
+    sehingga baris yang masuk setelahnya tidak ikut terhapus.
+    Returns: daftar id yang dihapus
+    """
+    if not any(nilai is not None for nilai in filter_data.values()):
+        raise ValueError("Hapus berdasarkan filter membutuhkan minimal satu filter")
+    id_data = ambil_id(client, filter_data, ukuran_halaman)
+    if not id_data:
+        return []
+    jalankan_dengan_retry(
+        lambda: terapkan_filter(client.table(TABEL_NILAI).delete(returning=ReturnMethod.minimal),
+                                filter_data).lte("id", max(id_data)).execute())
+    return id_data
@@ -0,0 +1,131 @@
+"""
+Ekspor data nilai mahasiswa secara streaming
+Data diambil per halaman (keyset) dan langsung ditulis ke berkas sementara,
+sehingga memori tetap datar berapa pun ukuran tabel
+"""
+
+import gzip
+import io
+import tempfile
+from dataclasses import dataclass
+from typing import IO, Dict, List, Optional, Sequence
+
+from data_nilai import UKURAN_HALAMAN, FilterData, iter_dataframe
+
+
+@dataclass(frozen=True)
+class FormatEkspor:
+    ekstensi: str
+    mime: str
+
+
+FORMAT_EKSPOR: Dict[str, FormatEkspor] = {
+    "CSV": FormatEkspor("csv", "text/csv"),
+    "CSV (gzip)": FormatEkspor("csv.gz", "application/gzip"),
+    "Parquet": FormatEkspor("parquet", "application/vnd.apache.parquet"),
+}
+
+# Tipe kolom tetap (dtype pandas nullable) agar setiap row group Parquet punya skema
+# yang sama, termasuk halaman yang kolomnya kosong atau seluruhnya null
+TIPE_PARQUET = {
+    "id": "Int64",
+    "nama": "string",
+    "nim": "string",
+    "prodi": "string",
+    "semester": "Int64",
+    "nilai_tugas": "float64",
+    "nilai_uts": "float64",
+    "nilai_uas": "float64",
+    "nilai_akhir": "float64",
+    "nilai_huruf": "string",
+    "predikat": "string",
+    "tanggal_input": "string",
+}
+
+
+def parquet_tersedia() -> bool:
+    """
+    Ekspor Parquet membutuhkan pyarrow (opsional)
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def format_tersedia() -> List[str]:
+    return [nama for nama in FORMAT_EKSPOR if nama != "Parquet" or parquet_tersedia()]
+
+
+# ==================== PENULIS ====================
+def tulis_csv(client, tujuan: IO[bytes], kolom: Sequence[str],
+              filter_data: Optional[FilterData] = None,
+              kompres: bool = False,
+              ukuran_halaman: int = UKURAN_HALAMAN) -> int:
+    """
+    Menulis CSV halaman demi halaman ke file biner, opsional dikompres gzip.
+    Returns: jumlah baris yang ditulis
+    """
+    kolom = list(kolom)
+    jumlah = 0
+    biner = gzip.GzipFile(fileobj=tujuan, mode="wb") if kompres else tujuan
+    teks = io.TextIOWrapper(biner, encoding="utf-8", newline="")
+    try:
+        for chunk in iter_dataframe(client, kolom, ukuran_halaman, filter_data=filter_data):
+            chunk[kolom].to_csv(teks, header=(jumlah == 0), index=False)
+            jumlah += len(chunk)
+        if jumlah == 0:
+            teks.write(",".join(kolom) + "\n")
+        teks.flush()
+    finally:
+        # Lepas wrapper tanpa menutup file tujuan milik pemanggil
+        teks.detach()
+        if kompres:
+            biner.close()
+    return jumlah
+
+
+def tulis_parquet(client, tujuan: IO[bytes], kolom: Sequence[str],
+                  filter_data: Optional[FilterData] = None,
+                  ukuran_halaman: int = UKURAN_HALAMAN) -> int:
+    """
+    Menulis Parquet dengan satu row group per halaman data.
+    Returns: jumlah baris yang ditulis
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    kolom = list(kolom)
+    tipe_arrow = {"Int64": pa.int64(), "float64": pa.float64(), "string": pa.string()}
+    tipe = {k: TIPE_PARQUET[k] for k in kolom}
+    skema = pa.schema([(k, tipe_arrow[t]) for k, t in tipe.items()])
+    jumlah = 0
+    with pq.ParquetWriter(tujuan, skema) as penulis:
+        for chunk in iter_dataframe(client, kolom, ukuran_halaman, filter_data=filter_data):
+            # Cast eksplisit: semester null membuat kolom jadi float/object di pandas
+            penulis.write_table(pa.Table.from_pandas(chunk[kolom].astype(tipe), schema=skema,
+                                                     preserve_index=False))
+            jumlah += len(chunk)
+    return jumlah
+
+
+def ekspor_ke_berkas(client, nama_format: str, kolom: Sequence[str],
+                     filter_data: Optional[FilterData] = None) -> IO[bytes]:
+    """
+    Membuat berkas ekspor sementara (di disk) dan mengembalikannya dalam posisi awal.
+    Pemanggil wajib menutup berkas (mis. dengan blok with) setelah isinya dipakai.
+    """
+    # Tanpa buffer Python (FileIO) agar bisa langsung diberikan ke st.download_button;
+    # penulis CSV/gzip/Parquet sudah mem-buffer sendiri
+    berkas = tempfile.TemporaryFile(buffering=0)
+    try:
+        if nama_format == "Parquet":
+            tulis_parquet(client, berkas, kolom, filter_data)
+        else:
+            tulis_csv(client, berkas, kolom, filter_data, kompres=nama_format == "CSV (gzip)")
+    except BaseException:
+        berkas.close()
+        raise
+    berkas.seek(0)
+    return berkas
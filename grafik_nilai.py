@@ -0,0 +1,259 @@
+"""
+Pembangun grafik Plotly halaman STATISTIK dengan memoisasi
+Setiap grafik dikunci dengan sidik isi data agregat masukannya; JSON grafik disimpan
+di cache LRU sehingga rerun dengan data yang sama tidak membangun ulang figure Plotly
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+import pandas as pd
+
+MAKS_ENTRI_DEFAULT = 64
+
+
+def sidik_data(data) -> str:
+    """
+    Sidik isi DataFrame/Series (nilai, index, nama kolom dan tipe) untuk kunci cache
+    """
+    h = hashlib.sha1()
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        h.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        kolom = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+        h.update(repr((kolom, list(data.index.names), str(data.dtypes))).encode())
+    else:
+        h.update(repr(data).encode())
+    return h.hexdigest()
+
+
+# ==================== PEMBANGUN GRAFIK ====================
+def _px():
+    """
+    plotly.express dimuat saat grafik pertama dibangun, bukan saat modul diimpor
+    """
+    import plotly.express as px
+    return px
+
+
+def grafik_rata_prodi(avg_prodi: pd.DataFrame):
+    px = _px()
+    fig = px.bar(avg_prodi, x='Program Studi', y='Rata-rata Nilai',
+                 title='Grafik Rata-rata Nilai per Program Studi',
+                 color='Rata-rata Nilai',
+                 color_continuous_scale='Viridis',
+                 text='Rata-rata Nilai')
+    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    fig.update_layout(height=500)
+    return fig
+
+
+def grafik_tren_semester(avg_semester: pd.DataFrame):
+    px = _px()
+    fig = px.line(avg_semester, x='Semester', y='Rata-rata Nilai',
+                  title='Tren Rata-rata Nilai per Semester',
+                  markers=True,
+                  line_shape='spline')
+    fig.update_traces(line_color='#667eea', line_width=3,
+                      marker=dict(size=10, color='#764ba2'))
+    fig.update_layout(height=500)
+    return fig
+
+
+def grafik_heatmap(matriks: pd.DataFrame):
+    px = _px()
+    fig = px.imshow(matriks,
+                    labels=dict(x="Semester", y="Program Studi", color="Nilai"),
+                    color_continuous_scale='RdYlGn',
+                    aspect="auto")
+    fig.update_layout(height=400)
+    return fig
+
+
+def grafik_pie_huruf(dist_huruf: pd.Series):
+    px = _px()
+    return px.pie(values=dist_huruf.values,
+                  names=dist_huruf.index,
+                  title='Distribusi Nilai Huruf',
+                  color_discrete_sequence=px.colors.qualitative.Set3)
+
+
+def grafik_bar_huruf(dist_huruf: pd.Series):
+    px = _px()
+    return px.bar(x=dist_huruf.index, y=dist_huruf.values,
+                  title='Jumlah Mahasiswa per Nilai Huruf',
+                  labels={'x': 'Nilai Huruf', 'y': 'Jumlah Mahasiswa'},
+                  color=dist_huruf.values,
+                  color_continuous_scale='Blues')
+
+
+def grafik_histogram(histogram: pd.DataFrame):
+    px = _px()
+    fig = px.bar(x=(histogram['batas_bawah'] + histogram['batas_atas']) / 2,
+                 y=histogram['jumlah'],
+                 title='Distribusi Nilai Akhir Mahasiswa',
+                 labels={'x': 'Nilai Akhir', 'y': 'Frekuensi'},
+                 color_discrete_sequence=['#667eea'])
+    fig.update_layout(height=400, bargap=0)
+    return fig
+
+
+def grafik_tren_prodi(tren: pd.DataFrame):
+    px = _px()
+    fig = px.line(tren, x='Periode', y='Rata-rata Nilai', color='Program Studi',
+                  title='Tren Rata-rata Nilai per Program Studi',
+                  markers=True, hover_data=['Jumlah Data'])
+    fig.update_layout(height=450)
+    return fig
+
+
+def grafik_tren_angkatan(tren: pd.DataFrame):
+    px = _px()
+    fig = px.line(tren, x='Periode', y='Rata-rata Nilai', color='Angkatan',
+                  title='Rata-rata Nilai Angkatan dari Periode ke Periode',
+                  markers=True, hover_data=['Jumlah Data'])
+    fig.update_layout(height=450)
+    return fig
+
+
+def grafik_sebaran_huruf(sebaran: pd.DataFrame):
+    px = _px()
+    fig = px.bar(sebaran, x='Periode', y='Persentase', color='Nilai Huruf',
+                 title='Pergeseran Sebaran Nilai Huruf',
+                 category_orders={'Nilai Huruf': ['A', 'B', 'C', 'D', 'E']},
+                 color_discrete_sequence=px.colors.sequential.RdBu_r)
+    fig.update_layout(height=450, barmode='stack', yaxis_range=[0, 100])
+    return fig
+
+
+# ==================== DATA MASUKAN ====================
+def data_rata_prodi(stat) -> pd.DataFrame:
+    """
+    Rata-rata per prodi (urut tertinggi) dari StatistikNilai, masukan grafik rata_prodi
+    """
+    avg_prodi = stat.per_prodi['mean'].reset_index()
+    avg_prodi.columns = ['Program Studi', 'Rata-rata Nilai']
+    return avg_prodi.sort_values('Rata-rata Nilai', ascending=False)
+
+
+def data_tren_semester(stat) -> pd.DataFrame:
+    """
+    Rata-rata per semester (urut semester), masukan grafik tren_semester
+    """
+    avg_semester = stat.per_semester.reset_index()
+    avg_semester.columns = ['Semester', 'Rata-rata Nilai']
+    return avg_semester.sort_values('Semester')
+
+
+def data_tren_prodi(tren) -> pd.DataFrame:
+    """
+    Rata-rata per periode x prodi dari rollup_nilai.tren_prodi, masukan grafik tren_prodi
+    """
+    data = tren[['periode', 'prodi', 'rata_rata', 'jumlah']]
+    data.columns = ['Periode', 'Program Studi', 'Rata-rata Nilai', 'Jumlah Data']
+    return data.reset_index(drop=True)
+
+
+def data_tren_angkatan(tren) -> pd.DataFrame:
+    """
+    Rata-rata per periode x angkatan dari rollup_nilai.tren_angkatan, masukan grafik tren_angkatan
+    """
+    data = tren[['periode', 'angkatan', 'rata_rata', 'jumlah']].copy()
+    data['angkatan'] = data['angkatan'].astype(str)
+    data.columns = ['Periode', 'Angkatan', 'Rata-rata Nilai', 'Jumlah Data']
+    return data.reset_index(drop=True)
+
+
+def data_sebaran_huruf(tren, prodi: str) -> pd.DataFrame:
+    """
+    Proporsi nilai huruf per periode untuk satu prodi (format panjang), masukan grafik sebaran_huruf
+    """
+    data = tren[tren['prodi'] == prodi].melt(id_vars=['indeks_periode', 'periode'],
+                                             value_vars=['A', 'B', 'C', 'D', 'E'],
+                                             var_name='Nilai Huruf', value_name='Persentase')
+    data = data.sort_values(['indeks_periode', 'Nilai Huruf']).drop(columns='indeks_periode')
+    return data.rename(columns={'periode': 'Periode'}).reset_index(drop=True)
+
+
+def masukan_grafik(stat) -> Dict[str, object]:
+    """
+    Data agregat untuk setiap grafik di PEMBANGUN_GRAFIK
+    """
+    return {
+        "rata_prodi": data_rata_prodi(stat),
+        "tren_semester": data_tren_semester(stat),
+        "heatmap": stat.matriks,
+        "pie_huruf": stat.distribusi_huruf,
+        "bar_huruf": stat.distribusi_huruf,
+        "histogram": stat.histogram,
+    }
+
+
+PEMBANGUN_GRAFIK: Dict[str, Callable] = {
+    "rata_prodi": grafik_rata_prodi,
+    "tren_semester": grafik_tren_semester,
+    "heatmap": grafik_heatmap,
+    "pie_huruf": grafik_pie_huruf,
+    "bar_huruf": grafik_bar_huruf,
+    "histogram": grafik_histogram,
+    "tren_prodi": grafik_tren_prodi,
+    "tren_angkatan": grafik_tren_angkatan,
+    "sebaran_huruf": grafik_sebaran_huruf,
+}
+
+
+# ==================== CACHE ====================
+class CacheGrafik:
+    """
+    Cache proses JSON grafik per (nama grafik, sidik data), dibatasi jumlah entri (LRU).
+    Yang dikembalikan dict spesifikasi baru setiap panggilan, aman dipakai antar sesi.
+    """
+
+    def __init__(self, maks_entri: int = MAKS_ENTRI_DEFAULT):
+        self.maks_entri = maks_entri
+        self._entri: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+        self.eviksi = 0
+
+    def ambil(self, nama: str, data) -> dict:
+        """
+        Spesifikasi grafik `nama` untuk data agregat; dibangun hanya jika belum ada di cache
+        """
+        kunci = (nama, sidik_data(data))
+        with self._lock:
+            spesifikasi = self._entri.get(kunci)
+            if spesifikasi is not None:
+                self._entri.move_to_end(kunci)
+                self.hit += 1
+                return json.loads(spesifikasi)
+            self.miss += 1
+
+        # Dibangun di luar lock; dua sesi yang bersamaan paling buruk membangun dua kali
+        spesifikasi = PEMBANGUN_GRAFIK[nama](data).to_json()
+        with self._lock:
+            self._entri[kunci] = spesifikasi
+            self._entri.move_to_end(kunci)
+            while len(self._entri) > self.maks_entri:
+                self._entri.popitem(last=False)
+                self.eviksi += 1
+        return json.loads(spesifikasi)
+
+    def invalidasi(self) -> None:
+        with self._lock:
+            self._entri.clear()
+
+    def statistik(self) -> dict:
+        with self._lock:
+            total = self.hit + self.miss
+            return {
+                "hit": self.hit,
+                "miss": self.miss,
+                "hit_ratio": self.hit / total if total else 0.0,
+                "eviksi": self.eviksi,
+                "entri": len(self._entri),
+                "byte": sum(len(s) for s in self._entri.values()),
+            }
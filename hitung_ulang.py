@@ -0,0 +1,232 @@
+"""
+Hitung ulang kolom turunan (nilai_akhir, nilai_huruf, predikat) pada baris tersimpan
+Dipakai setelah skema penilaian berubah: tabel dibaca per halaman, hanya kolom turunan
+baris yang nilainya berubah yang ditulis kembali lewat RPC hitung_ulang_nilai per batch,
+dan progres disimpan ke berkas checkpoint sehingga job bisa dilanjutkan.
+
+Penulisan tidak pernah menyisipkan baris: baris yang dihapus selama job berjalan tetap
+terhapus, dan baris yang kolom inputnya diubah sesudah dibaca dilewati oleh RPC.
+
+Penggunaan:
+    python hitung_ulang.py                # hitung ulang dengan skema_penilaian.toml
+    python hitung_ulang.py --lanjut       # lanjutkan dari checkpoint terakhir
+    python hitung_ulang.py --uji          # hanya hitung perubahan, tanpa menulis/membaca checkpoint
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+
+from data_nilai import (KOLOM_SEMUA, MAKS_PERCOBAAN, TABEL_NILAI, UKURAN_HALAMAN,
+                        buat_client, iter_dataframe, jalankan_dengan_retry)
+from penilaian import BERKAS_SKEMA, RegistriSkema, muat_registri
+
+BERKAS_CHECKPOINT = ".hitung_ulang.json"
+UKURAN_BATCH_TULIS = 1000
+
+RPC_HITUNG_ULANG = "hitung_ulang_nilai"
+# Kolom yang dikirim ke RPC: id, kolom input (pembanding) dan kolom turunan
+KOLOM_INPUT = ["prodi", "semester", "nilai_tugas", "nilai_uts", "nilai_uas"]
+KOLOM_TURUNAN = ["nilai_akhir", "nilai_huruf", "predikat"]
+# PostgREST: fungsi tidak ditemukan (migrasi belum dijalankan)
+GALAT_RPC_TIDAK_ADA = "PGRST202"
+
+
+@dataclass
+class HasilHitungUlang:
+    """
+    Progres job hitung ulang, juga isi berkas checkpoint
+    """
+    sidik_skema: str = ""
+    id_terakhir: int = 0
+    diperiksa: int = 0
+    diubah: int = 0
+    halaman: int = 0
+    durasi: float = 0.0
+
+
+# ==================== CHECKPOINT ====================
+def baca_checkpoint(berkas: str = BERKAS_CHECKPOINT) -> Optional[HasilHitungUlang]:
+    if not os.path.exists(berkas):
+        return None
+    with open(berkas, encoding="utf-8") as f:
+        return HasilHitungUlang(**json.load(f))
+
+
+def tulis_checkpoint(hasil: HasilHitungUlang, berkas: str = BERKAS_CHECKPOINT) -> None:
+    """
+    Ditulis ke berkas sementara lalu di-rename agar checkpoint tidak pernah setengah jadi
+    """
+    sementara = berkas + ".tmp"
+    with open(sementara, "w", encoding="utf-8") as f:
+        json.dump(asdict(hasil), f)
+    os.replace(sementara, berkas)
+
+
+# ==================== HITUNG ====================
+def baris_berubah(df: pd.DataFrame, registri: RegistriSkema) -> pd.DataFrame:
+    """
+    Hitung ulang satu halaman secara batch, kembalikan hanya baris yang kolom
+    turunannya berbeda (sudah berisi nilai baru)
+    """
+    if df.empty:
+        return df
+    baru = registri.nilai_batch(df["nilai_tugas"], df["nilai_uts"], df["nilai_uas"],
+                                df["prodi"], df["semester"])
+    akhir_baru = baru["nilai_akhir"].round(2).to_numpy()
+    huruf_baru = baru["nilai_huruf"].astype(object).to_numpy()
+    predikat_baru = baru["predikat"].astype(object).to_numpy()
+
+    akhir_lama = pd.to_numeric(df["nilai_akhir"], errors="coerce").to_numpy(dtype=float)
+    berubah = (
+        ~np.isclose(akhir_baru, akhir_lama, rtol=0, atol=1e-6, equal_nan=True)
+        | (huruf_baru != df["nilai_huruf"].to_numpy(dtype=object))
+        | (predikat_baru != df["predikat"].to_numpy(dtype=object))
+    )
+    return df[berubah].assign(
+        nilai_akhir=akhir_baru[berubah],
+        nilai_huruf=huruf_baru[berubah],
+        predikat=predikat_baru[berubah],
+    )
+
+
+def _ke_json(df: pd.DataFrame) -> List[dict]:
+    """
+    Baris siap dikirim; NaN diganti None agar valid sebagai JSON
+    """
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _perbarui_per_nilai(client, batch: List[dict], maks_percobaan: int) -> None:
+    """
+    Cadangan tanpa RPC: satu update().in_("id") per kombinasi nilai turunan yang sama.
+    Hanya kolom turunan yang ditulis, tetapi tanpa pembanding kolom input.
+    """
+    kelompok = {}
+    for baris in batch:
+        kelompok.setdefault(tuple(baris[k] for k in KOLOM_TURUNAN), []).append(baris["id"])
+    for nilai, id_data in kelompok.items():
+        jalankan_dengan_retry(
+            lambda: client.table(TABEL_NILAI)
+            .update(dict(zip(KOLOM_TURUNAN, nilai)), returning=ReturnMethod.minimal)
+            .in_("id", id_data)
+            .execute(),
+            maks_percobaan)
+
+
+def tulis_perubahan(client, df: pd.DataFrame,
+                    ukuran_batch: int = UKURAN_BATCH_TULIS,
+                    maks_percobaan: int = MAKS_PERCOBAAN) -> None:
+    """
+    Perbarui kolom turunan baris berubah per batch (satu request RPC per batch, dengan retry).
+    Jika RPC belum dimigrasikan, jatuh ke update per kombinasi nilai.
+    """
+    def kirim(batch: List[dict]) -> None:
+        try:
+            client.rpc(RPC_HITUNG_ULANG, {"p_baris": batch}).execute()
+        except APIError as e:
+            if e.code != GALAT_RPC_TIDAK_ADA:
+                raise
+            _perbarui_per_nilai(client, batch, maks_percobaan)
+
+    baris = _ke_json(df[["id"] + KOLOM_INPUT + KOLOM_TURUNAN])
+    for awal in range(0, len(baris), ukuran_batch):
+        batch = baris[awal:awal + ukuran_batch]
+        jalankan_dengan_retry(lambda: kirim(batch), maks_percobaan)
+
+
+def hitung_ulang(client, registri: RegistriSkema,
+                 lanjut: bool = False,
+                 uji: bool = False,
+                 ukuran_halaman: int = UKURAN_HALAMAN,
+                 ukuran_batch: int = UKURAN_BATCH_TULIS,
+                 berkas_checkpoint: Optional[str] = BERKAS_CHECKPOINT,
+                 saat_halaman: Optional[Callable[[HasilHitungUlang], None]] = None
+                 ) -> HasilHitungUlang:
+    """
+    Jalankan job hitung ulang. Penulisan halaman ke-k berjalan di thread terpisah
+    selagi halaman ke-k+1 dibaca; checkpoint hanya maju setelah tulisan halaman selesai.
+    Mode uji selalu memeriksa seluruh tabel dan tidak menyentuh checkpoint job sungguhan.
+    """
+    sidik = registri.sidik()
+    hasil = HasilHitungUlang(sidik_skema=sidik)
+    if uji:
+        berkas_checkpoint = None
+    if lanjut and berkas_checkpoint:
+        checkpoint = baca_checkpoint(berkas_checkpoint)
+        if checkpoint is not None:
+            if checkpoint.sidik_skema != sidik:
+                raise ValueError("Checkpoint dibuat dengan skema penilaian yang berbeda; "
+                                 "jalankan tanpa --lanjut untuk mulai dari awal")
+            hasil = checkpoint
+
+    mulai = time.perf_counter() - hasil.durasi
+
+    def selesaikan(tulisan: Optional[Future], id_terakhir: int,
+                   diperiksa: int, diubah: int) -> None:
+        if tulisan is not None:
+            tulisan.result()
+        hasil.id_terakhir = id_terakhir
+        hasil.diperiksa += diperiksa
+        hasil.diubah += diubah
+        hasil.halaman += 1
+        hasil.durasi = time.perf_counter() - mulai
+        if berkas_checkpoint:
+            tulis_checkpoint(hasil, berkas_checkpoint)
+        if saat_halaman:
+            saat_halaman(hasil)
+
+    with ThreadPoolExecutor(max_workers=1) as penulis:
+        tertunda = None
+        for df in iter_dataframe(client, KOLOM_SEMUA, ukuran_halaman,
+                                 setelah_id=hasil.id_terakhir):
+            ubah = baris_berubah(df, registri)
+            tulisan = None
+            if len(ubah) and not uji:
+                tulisan = penulis.submit(tulis_perubahan, client, ubah, ukuran_batch)
+            if tertunda is not None:
+                selesaikan(*tertunda)
+            tertunda = (tulisan, int(df["id"].iloc[-1]), len(df), len(ubah))
+        if tertunda is not None:
+            selesaikan(*tertunda)
+
+    if berkas_checkpoint and os.path.exists(berkas_checkpoint):
+        os.remove(berkas_checkpoint)
+    return hasil
+
+
+# ==================== CLI ====================
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hitung ulang nilai tersimpan sesuai skema penilaian")
+    parser.add_argument("--skema", default=BERKAS_SKEMA, help="Berkas skema penilaian (TOML)")
+    parser.add_argument("--lanjut", action="store_true", help="Lanjutkan dari checkpoint terakhir")
+    parser.add_argument("--uji", action="store_true", help="Hanya hitung perubahan, tanpa menulis")
+    parser.add_argument("--halaman", type=int, default=UKURAN_HALAMAN, help="Baris per halaman baca")
+    parser.add_argument("--batch", type=int, default=UKURAN_BATCH_TULIS, help="Baris per upsert")
+    parser.add_argument("--checkpoint", default=BERKAS_CHECKPOINT, help="Berkas checkpoint")
+    args = parser.parse_args(argv)
+
+    def cetak_progres(hasil: HasilHitungUlang) -> None:
+        print(f"Halaman {hasil.halaman}: id <= {hasil.id_terakhir}, "
+              f"{hasil.diperiksa} diperiksa, {hasil.diubah} berubah, {hasil.durasi:.1f} dtk")
+
+    hasil = hitung_ulang(buat_client(), muat_registri(args.skema), args.lanjut, args.uji,
+                         args.halaman, args.batch, args.checkpoint, cetak_progres)
+    aksi = "akan diubah" if args.uji else "diperbarui"
+    print(f"Selesai: {hasil.diperiksa} baris diperiksa, {hasil.diubah} {aksi} "
+          f"dalam {hasil.durasi:.1f} dtk")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Impor nilai mahasiswa secara massal dari berkas CSV/Excel
+Validasi sama dengan form INPUT NILAI, insert per batch dengan retry.
+Semua baris satu impor berbagi tanggal_input yang sama; nilai itu dipakai sebagai penanda
+agar retry tidak menggandakan batch yang ternyata sudah masuk sebelum koneksi putus.
+Impor sengaja tidak memeriksa NIM + semester ganda terhadap data tersimpan (hanya form
+INPUT NILAI yang menawarkan pembaruan); setiap baris valid ditambahkan sebagai baris baru.
+
+Penggunaan headless:
+    python impor_nilai.py rekap_kelas.csv --batch 500
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from postgrest.types import ReturnMethod
+
+from data_nilai import (JEDA_AWAL, MAKS_PERCOBAAN, TABEL_NILAI, buat_client,
+                        jalankan_dengan_retry)
+from penilaian import (DAFTAR_PRODI, DAFTAR_SEMESTER, NILAI_MAKS, NILAI_MIN,
+                       BERKAS_SKEMA, RegistriSkema, muat_registri)
+
+KOLOM_IMPOR = ["nama", "nim", "prodi", "semester", "nilai_tugas", "nilai_uts", "nilai_uas"]
+KOLOM_NILAI = ["nilai_tugas", "nilai_uts", "nilai_uas"]
+
+UKURAN_BATCH = 500
+UKURAN_CHUNK = 5000
+
+
+@dataclass
+class LaporanBatch:
+    """
+    Laporan satu batch insert
+    """
+    nomor: int
+    jumlah: int
+    percobaan: int
+    durasi: float
+    berhasil: bool
+    pesan: str = ""
+
+
+@dataclass
+class HasilImpor:
+    """
+    Ringkasan hasil impor
+    """
+    tersimpan: int = 0
+    ditolak: int = 0
+    gagal: int = 0
+    kesalahan: List[dict] = field(default_factory=list)
+    batch: List[LaporanBatch] = field(default_factory=list)
+
+
+# ==================== BACA BERKAS ====================
+def baca_berkas(sumber, nama_berkas: str,
+                ukuran_chunk: int = UKURAN_CHUNK) -> Iterator[pd.DataFrame]:
+    """
+    Membaca berkas per chunk. CSV dibaca bertahap, Excel dibaca sekaligus lalu dipotong
+    """
+    tipe_teks = {"nama": str, "nim": str, "prodi": str}
+    if nama_berkas.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(sumber, dtype=tipe_teks)
+        for awal in range(0, len(df), ukuran_chunk):
+            yield df.iloc[awal:awal + ukuran_chunk]
+    else:
+        yield from pd.read_csv(sumber, chunksize=ukuran_chunk, dtype=tipe_teks,
+                               skipinitialspace=True)
+
+
+# ==================== VALIDASI ====================
+def validasi(df: pd.DataFrame, offset: int = 0,
+             daftar_prodi: Sequence[str] = DAFTAR_PRODI) -> Tuple[pd.DataFrame, List[dict]]:
+    """
+    Validasi chunk dengan aturan yang sama seperti form input (prodi dari registri skema).
+    Returns: (baris_valid, daftar_kesalahan) dengan nomor baris sesuai berkas (header = baris 1)
+    """
+    df = df.rename(columns=lambda k: str(k).strip().lower())
+    hilang = [k for k in KOLOM_IMPOR if k not in df.columns]
+    if hilang:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(hilang)}")
+
+    df = df[KOLOM_IMPOR].copy()
+    df["nama"] = df["nama"].fillna("").astype(str).str.strip()
+    df["nim"] = df["nim"].fillna("").astype(str).str.strip()
+    df["prodi"] = df["prodi"].fillna("").astype(str).str.strip()
+    df["semester"] = pd.to_numeric(df["semester"], errors="coerce")
+    for kolom in KOLOM_NILAI:
+        df[kolom] = pd.to_numeric(df[kolom], errors="coerce").astype(float)
+
+    nilai = df[KOLOM_NILAI]
+    # Urutan sama dengan urutan pengecekan di form, alasan pertama yang dilaporkan
+    aturan = [
+        ((df["nama"] == "") | (df["nim"] == ""), "Nama dan NIM wajib diisi"),
+        (~df["prodi"].isin(daftar_prodi), "Program studi tidak valid"),
+        (~df["semester"].isin(DAFTAR_SEMESTER), "Semester harus 1-8"),
+        ((nilai.isna() | (nilai < NILAI_MIN) | (nilai > NILAI_MAKS)).any(axis=1),
+         "Nilai harus berupa angka 0-100"),
+        ((nilai == 0).all(axis=1), "Minimal satu nilai harus diisi"),
+    ]
+    alasan = pd.Series(
+        np.select([kondisi.to_numpy() for kondisi, _ in aturan],
+                  [pesan for _, pesan in aturan], default=""),
+        index=df.index)
+
+    ditolak = alasan != ""
+    nomor_baris = offset + np.arange(len(df)) + 2
+    kesalahan = [
+        {"baris": int(n), "nim": nim, "alasan": a}
+        for n, nim, a in zip(nomor_baris[ditolak.to_numpy()],
+                             df.loc[ditolak, "nim"], alasan[ditolak])
+    ]
+
+    valid = df[~ditolak].copy()
+    valid["semester"] = valid["semester"].astype(int)
+    return valid, kesalahan
+
+
+def siapkan_baris(df: pd.DataFrame, tanggal_input: str,
+                  registri: RegistriSkema) -> List[dict]:
+    """
+    Menghitung nilai akhir, huruf dan predikat sesuai skema prodi/semester
+    lalu menyusun baris siap insert
+    """
+    if df.empty:
+        return []
+    hasil = registri.nilai_batch(df["nilai_tugas"], df["nilai_uts"], df["nilai_uas"],
+                                 df["prodi"], df["semester"])
+
+    df = df.assign(
+        nilai_akhir=hasil["nilai_akhir"].round(2),
+        nilai_huruf=hasil["nilai_huruf"],
+        predikat=hasil["predikat"],
+        tanggal_input=tanggal_input,
+    )
+    return df.to_dict("records")
+
+
+# ==================== INSERT BATCH ====================
+def hitung_penanda(client, tanggal_input: str) -> int:
+    """
+    Menghitung baris di server yang disimpan oleh impor dengan penanda tanggal_input ini
+    """
+    return client.table(TABEL_NILAI).select("id", count="exact", head=True) \
+        .eq("tanggal_input", tanggal_input).execute().count or 0
+
+
+def sisipkan_batch(client, baris: List[dict], nomor: int,
+                   maks_percobaan: int = MAKS_PERCOBAAN,
+                   jeda_awal: float = JEDA_AWAL,
+                   sudah_tersimpan: Optional[Callable[[], bool]] = None) -> LaporanBatch:
+    """
+    Insert satu batch dalam satu request, diulang dengan backoff eksponensial jika gagal.
+    Insert satu request bersifat atomik; sebelum mengulang, sudah_tersimpan() ditanya dulu
+    apakah percobaan sebelumnya ternyata sudah masuk (mis. timeout setelah commit)
+    sehingga batch tidak disisipkan dua kali.
+    """
+    mulai = time.perf_counter()
+    percobaan_ke = 0
+
+    def kirim():
+        nonlocal percobaan_ke
+        percobaan_ke += 1
+        if percobaan_ke > 1 and sudah_tersimpan is not None and sudah_tersimpan():
+            return None
+        return client.table(TABEL_NILAI).insert(baris, returning=ReturnMethod.minimal).execute()
+
+    try:
+        _, percobaan = jalankan_dengan_retry(kirim, maks_percobaan, jeda_awal)
+    except Exception as e:
+        try:
+            if sudah_tersimpan is not None and sudah_tersimpan():
+                return LaporanBatch(nomor, len(baris), percobaan_ke,
+                                    time.perf_counter() - mulai, True)
+        except Exception:
+            pass
+        return LaporanBatch(nomor, len(baris), maks_percobaan,
+                            time.perf_counter() - mulai, False, str(e))
+    return LaporanBatch(nomor, len(baris), percobaan, time.perf_counter() - mulai, True)
+
+
+def impor(client, sumber, nama_berkas: str,
+          ukuran_batch: int = UKURAN_BATCH,
+          ukuran_chunk: int = UKURAN_CHUNK,
+          maks_percobaan: int = MAKS_PERCOBAAN,
+          registri: Optional[RegistriSkema] = None,
+          saat_batch: Optional[Callable[[LaporanBatch, HasilImpor], None]] = None
+          ) -> HasilImpor:
+    """
+    Impor berkas secara streaming: baca per chunk, validasi, hitung nilai, insert per batch.
+    saat_batch(laporan, hasil) dipanggil setelah setiap batch untuk laporan progres.
+    """
+    registri = registri or muat_registri()
+    hasil = HasilImpor()
+    tanggal_input = datetime.now().isoformat()
+    antrian: List[dict] = []
+    offset = 0
+    # Jumlah baris berpenanda tanggal_input yang diketahui sudah ada di server
+    tercatat = 0
+
+    def kirim(baris: List[dict]) -> None:
+        nonlocal tercatat
+        laporan = sisipkan_batch(
+            client, baris, len(hasil.batch) + 1, maks_percobaan,
+            sudah_tersimpan=lambda: hitung_penanda(client, tanggal_input) > tercatat)
+        hasil.batch.append(laporan)
+        if laporan.berhasil:
+            hasil.tersimpan += laporan.jumlah
+            tercatat += laporan.jumlah
+        else:
+            hasil.gagal += laporan.jumlah
+            try:
+                tercatat = hitung_penanda(client, tanggal_input)
+            except Exception:
+                pass
+        if saat_batch:
+            saat_batch(laporan, hasil)
+
+    for chunk in baca_berkas(sumber, nama_berkas, ukuran_chunk):
+        valid, kesalahan = validasi(chunk, offset, registri.daftar_prodi)
+        offset += len(chunk)
+        hasil.ditolak += len(kesalahan)
+        hasil.kesalahan.extend(kesalahan)
+
+        antrian.extend(siapkan_baris(valid, tanggal_input, registri))
+        while len(antrian) >= ukuran_batch:
+            kirim(antrian[:ukuran_batch])
+            antrian = antrian[ukuran_batch:]
+
+    if antrian:
+        kirim(antrian)
+    return hasil
+
+
+# ==================== CLI ====================
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Impor massal nilai mahasiswa ke Supabase")
+    parser.add_argument("berkas", help="Berkas CSV/Excel dengan kolom: " + ", ".join(KOLOM_IMPOR))
+    parser.add_argument("--batch", type=int, default=UKURAN_BATCH, help="Jumlah baris per insert")
+    parser.add_argument("--chunk", type=int, default=UKURAN_CHUNK, help="Jumlah baris per baca berkas")
+    parser.add_argument("--percobaan", type=int, default=MAKS_PERCOBAAN, help="Maksimal percobaan per batch")
+    parser.add_argument("--skema", default=BERKAS_SKEMA, help="Berkas skema penilaian (TOML)")
+    parser.add_argument("--kesalahan", help="Simpan baris yang ditolak ke berkas CSV ini")
+    args = parser.parse_args(argv)
+
+    def cetak_progres(laporan: LaporanBatch, hasil: HasilImpor) -> None:
+        status = "OK" if laporan.berhasil else f"GAGAL ({laporan.pesan})"
+        print(f"Batch {laporan.nomor}: {laporan.jumlah} baris, percobaan {laporan.percobaan}, "
+              f"{laporan.durasi:.2f} dtk - {status} | total tersimpan {hasil.tersimpan}")
+
+    client = buat_client()
+    with open(args.berkas, "rb") as f:
+        hasil = impor(client, f, args.berkas, args.batch, args.chunk, args.percobaan,
+                      registri=muat_registri(args.skema), saat_batch=cetak_progres)
+
+    print(f"Selesai: {hasil.tersimpan} tersimpan, {hasil.ditolak} ditolak, {hasil.gagal} gagal")
+    if hasil.kesalahan and args.kesalahan:
+        pd.DataFrame(hasil.kesalahan).to_csv(args.kesalahan, index=False)
+        print(f"Baris yang ditolak disimpan di {args.kesalahan}")
+    return 1 if hasil.gagal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""
+Indeks pencarian mahasiswa di memori, dibangun dari snapshot (id, nama, nim, prodi, semester)
+- hash (nim, semester) -> id untuk cek duplikat O(1) saat input
+- array terurut NIM dan nama (huruf kecil) untuk pencarian awalan lewat binary search,
+  O(log n + k) per ketikan tanpa memindai tabel
+Baris yang ditambahkan ke snapshot dimasukkan secara inkremental; snapshot yang berubah
+dengan cara lain (hapus, muat ulang) membangun ulang indeks.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+KOLOM_INDEKS = ["id", "nama", "nim", "prodi", "semester"]
+BATAS_HASIL = 50
+# Baris tambahan dicari linear sampai jumlahnya melewati batas ini, lalu digabung ke array terurut
+BATAS_TAMBAHAN = 1024
+# Karakter tertinggi di BMP, batas atas rentang awalan
+_AKHIR_AWALAN = "\uffff"
+
+
+def normalisasi(teks) -> str:
+    return "" if teks is None or teks is pd.NA else str(teks).strip().lower()
+
+
+def _semester(nilai) -> int:
+    try:
+        return int(nilai)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _rentang_awalan(kunci: np.ndarray, awalan: str) -> Tuple[int, int]:
+    kiri = int(np.searchsorted(kunci, awalan, side="left"))
+    kanan = int(np.searchsorted(kunci, awalan + _AKHIR_AWALAN, side="left"))
+    return kiri, kanan
+
+
+class IndeksNim:
+    """
+    Indeks proses yang dipakai bersama semua sesi; selaraskan(df) dipanggil dengan snapshot
+    terbaru sebelum mencari (murah jika snapshot tidak berubah)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sumber: Optional[pd.DataFrame] = None
+        self._jumlah = 0
+        self._id_pertama: Optional[int] = None
+        self._id_terakhir: Optional[int] = None
+
+        self._kunci: Dict[Tuple[str, int], int] = {}
+        kosong = np.empty(0, dtype=object)
+        self._nim, self._id_nim = kosong, np.empty(0, dtype=np.int64)
+        self._nama, self._id_nama = kosong, np.empty(0, dtype=np.int64)
+        self._tambahan: List[Tuple[int, str, str]] = []
+
+        self.bangun_ulang = 0
+        self.inkremental = 0
+
+    # ==================== PEMBANGUNAN ====================
+    @staticmethod
+    def _kolom(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[int]]:
+        ids = df["id"].to_numpy(dtype=np.int64)
+        nim = np.array([normalisasi(v) for v in df["nim"].tolist()], dtype=object)
+        nama = np.array([normalisasi(v) for v in df["nama"].tolist()], dtype=object)
+        semester = [_semester(v) for v in df["semester"].tolist()]
+        return ids, nim, nama, semester
+
+    def _bangun(self, df: pd.DataFrame) -> None:
+        ids, nim, nama, semester = self._kolom(df)
+        self._kunci = dict(zip(zip(nim.tolist(), semester), ids.tolist()))
+        urut = np.argsort(nim, kind="stable")
+        self._nim, self._id_nim = nim[urut], ids[urut]
+        urut = np.argsort(nama, kind="stable")
+        self._nama, self._id_nama = nama[urut], ids[urut]
+        self._tambahan = []
+        self.bangun_ulang += 1
+
+    def _tambah(self, df: pd.DataFrame) -> None:
+        ids, nim, nama, semester = self._kolom(df)
+        self._kunci.update(zip(zip(nim.tolist(), semester), ids.tolist()))
+        self._tambahan.extend(zip(ids.tolist(), nim.tolist(), nama.tolist()))
+        if len(self._tambahan) > BATAS_TAMBAHAN:
+            id_baru, nim_baru, nama_baru = (np.array(k, dtype=d) for k, d in zip(
+                zip(*self._tambahan), (np.int64, object, object)))
+            for atribut, kunci_baru in (("nim", nim_baru), ("nama", nama_baru)):
+                kunci = np.concatenate([getattr(self, f"_{atribut}"), kunci_baru])
+                id_kunci = np.concatenate([getattr(self, f"_id_{atribut}"), id_baru])
+                urut = np.argsort(kunci, kind="stable")
+                setattr(self, f"_{atribut}", kunci[urut])
+                setattr(self, f"_id_{atribut}", id_kunci[urut])
+            self._tambahan = []
+        self.inkremental += 1
+
+    def selaraskan(self, df: pd.DataFrame) -> "IndeksNim":
+        """
+        Samakan indeks dengan snapshot. Snapshot urut id dan baris baru selalu di akhir,
+        jadi jika baris ke-n lama masih sama, hanya baris setelahnya yang perlu ditambahkan.
+        """
+        with self._lock:
+            if df is self._sumber:
+                return self
+            n = self._jumlah
+            if df.empty or not set(KOLOM_INDEKS) <= set(df.columns):
+                self._bangun(pd.DataFrame(columns=KOLOM_INDEKS))
+            elif (self._sumber is not None and 0 < n < len(df)
+                    and int(df["id"].iloc[0]) == self._id_pertama
+                    and int(df["id"].iloc[n - 1]) == self._id_terakhir):
+                self._tambah(df.iloc[n:])
+            else:
+                self._bangun(df)
+            self._sumber = df
+            self._jumlah = len(df)
+            self._id_pertama = int(df["id"].iloc[0]) if len(df) else None
+            self._id_terakhir = int(df["id"].iloc[-1]) if len(df) else None
+        return self
+
+    # ==================== PENCARIAN ====================
+    def cari_duplikat(self, nim: str, semester: int) -> Optional[int]:
+        """
+        Id baris yang sudah memakai kombinasi nim + semester, None jika belum ada
+        """
+        with self._lock:
+            return self._kunci.get((normalisasi(nim), _semester(semester)))
+
+    def cari(self, teks: str, batas: int = BATAS_HASIL) -> List[int]:
+        """
+        Id baris dengan awalan NIM atau nama yang cocok (tanpa membedakan huruf besar/kecil),
+        kecocokan NIM lebih dulu
+        """
+        awalan = normalisasi(teks)
+        if not awalan:
+            return []
+        hasil: Dict[int, None] = {}
+        with self._lock:
+            for kunci, id_kunci in ((self._nim, self._id_nim), (self._nama, self._id_nama)):
+                kiri, kanan = _rentang_awalan(kunci, awalan)
+                hasil.update(dict.fromkeys(id_kunci[kiri:min(kanan, kiri + batas)].tolist()))
+            for id_baris, nim, nama in self._tambahan:
+                if nim.startswith(awalan) or nama.startswith(awalan):
+                    hasil[id_baris] = None
+        return list(hasil)[:batas]
+
+    def statistik(self) -> dict:
+        with self._lock:
+            return {
+                "entri": len(self._kunci),
+                "baris": self._jumlah,
+                "tambahan": len(self._tambahan),
+                "bangun_ulang": self.bangun_ulang,
+                "inkremental": self.inkremental,
+            }
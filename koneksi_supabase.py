@@ -0,0 +1,242 @@
+"""
+Lapisan koneksi HTTP untuk client Supabase
+Satu httpx.Client per proses dengan pool koneksi keep-alive, timeout per request, batas
+request bersamaan dan pemutus sirkuit (circuit breaker). Semua aturan dipasang sebagai
+transport httpx sehingga setiap query postgrest melewatinya tanpa mengubah kode pemanggil.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, fields
+from typing import Any, Callable, Optional
+
+import httpx
+
+STATUS_TERTUTUP = "tertutup"
+STATUS_TERBUKA = "terbuka"
+STATUS_SETENGAH_TERBUKA = "setengah_terbuka"
+
+
+class SirkuitTerbuka(RuntimeError):
+    """
+    Request ditolak tanpa dikirim karena server sedang dianggap gagal
+    """
+
+
+@dataclass
+class KonfigurasiKoneksi:
+    maks_koneksi: int = 20           # koneksi TCP terbuka per proses
+    maks_keepalive: int = 20         # koneksi idle yang dipertahankan (>= maks_bersamaan)
+    keepalive_detik: float = 30.0    # umur koneksi idle sebelum ditutup
+    timeout_sambung: float = 5.0
+    timeout_baca: float = 30.0
+    timeout_antre: float = 10.0      # menunggu slot request bersamaan / koneksi pool
+    maks_bersamaan: int = 16         # request yang boleh berjalan bersamaan
+    http2: bool = True
+    ambang_gagal: int = 5            # kegagalan beruntun sebelum sirkuit dibuka
+    jeda_pemutus: float = 30.0       # lama sirkuit terbuka sebelum satu request uji
+
+    @classmethod
+    def dari_konfigurasi(cls, baca: Callable[[str, Any], Any]) -> "KonfigurasiKoneksi":
+        """
+        Nilai dibaca lewat baca(nama, default) dengan nama KONEKSI_<FIELD>, mis. KONEKSI_MAKS_BERSAMAAN
+        """
+        return cls(**{f.name: baca(f"KONEKSI_{f.name.upper()}", f.default) for f in fields(cls)})
+
+
+class PemutusSirkuit:
+    """
+    Setelah ambang_gagal kegagalan beruntun, request ditolak langsung selama jeda detik;
+    sesudahnya satu request uji dilewatkan dan hasilnya menutup atau membuka lagi sirkuit
+    """
+
+    def __init__(self, ambang_gagal: int, jeda: float):
+        self.ambang_gagal = ambang_gagal
+        self.jeda = jeda
+        self.status = STATUS_TERTUTUP
+        self.gagal_beruntun = 0
+        self.dibuka = 0
+        self._waktu_buka = 0.0
+        self._uji_berjalan = False
+        self._lock = threading.Lock()
+
+    def izinkan(self) -> None:
+        with self._lock:
+            if self.status == STATUS_TERBUKA:
+                sisa = self.jeda - (time.monotonic() - self._waktu_buka)
+                if sisa > 0:
+                    raise SirkuitTerbuka(f"Koneksi Supabase dihentikan sementara ({sisa:.0f} dtk lagi)")
+                self.status = STATUS_SETENGAH_TERBUKA
+            if self.status == STATUS_SETENGAH_TERBUKA:
+                if self._uji_berjalan:
+                    raise SirkuitTerbuka("Koneksi Supabase sedang diuji ulang")
+                self._uji_berjalan = True
+
+    def berhasil(self) -> None:
+        with self._lock:
+            self.status = STATUS_TERTUTUP
+            self.gagal_beruntun = 0
+            self._uji_berjalan = False
+
+    def gagal(self) -> None:
+        with self._lock:
+            self.gagal_beruntun += 1
+            self._uji_berjalan = False
+            if self.status == STATUS_SETENGAH_TERBUKA or self.gagal_beruntun >= self.ambang_gagal:
+                if self.status != STATUS_TERBUKA:
+                    self.dibuka += 1
+                self.status = STATUS_TERBUKA
+                self._waktu_buka = time.monotonic()
+
+    def batal(self) -> None:
+        """
+        Request tidak menghasilkan keputusan (mis. antrean lokal penuh), slot uji dilepas
+        """
+        with self._lock:
+            self._uji_berjalan = False
+
+
+class _AliranBerslot(httpx.SyncByteStream):
+    """
+    Body respons yang melepas slot request bersamaan saat selesai dibaca/ditutup
+    """
+
+    def __init__(self, aliran: httpx.SyncByteStream, lepas: Callable[[], None]):
+        self._aliran = aliran
+        self._lepas = lepas
+
+    def __iter__(self):
+        yield from self._aliran
+
+    def close(self) -> None:
+        try:
+            self._aliran.close()
+        finally:
+            self._lepas()
+
+
+class TransportTerkelola(httpx.BaseTransport):
+    """
+    Transport httpx dengan batas request bersamaan dan pemutus sirkuit di atas pool
+    koneksi keep-alive. Kesalahan jaringan dan respons 5xx dihitung sebagai kegagalan.
+    """
+
+    def __init__(self, konfigurasi: KonfigurasiKoneksi,
+                 dasar: Optional[httpx.BaseTransport] = None):
+        self.konfigurasi = konfigurasi
+        self.dasar = dasar or httpx.HTTPTransport(
+            http2=konfigurasi.http2,
+            limits=httpx.Limits(max_connections=konfigurasi.maks_koneksi,
+                                max_keepalive_connections=konfigurasi.maks_keepalive,
+                                keepalive_expiry=konfigurasi.keepalive_detik))
+        self.pemutus = PemutusSirkuit(konfigurasi.ambang_gagal, konfigurasi.jeda_pemutus)
+        self._slot = threading.BoundedSemaphore(konfigurasi.maks_bersamaan)
+        self._lock = threading.Lock()
+        self.request = 0
+        self.gagal = 0
+        self.ditolak_antre = 0
+        self.ditolak_sirkuit = 0
+        self.aktif = 0
+        self.puncak_aktif = 0
+
+    def _ubah_aktif(self, selisih: int) -> None:
+        with self._lock:
+            self.aktif += selisih
+            self.puncak_aktif = max(self.puncak_aktif, self.aktif)
+
+    def _pelepas(self) -> Callable[[], None]:
+        dilepas = threading.Event()
+
+        def lepas() -> None:
+            if not dilepas.is_set():
+                dilepas.set()
+                self._ubah_aktif(-1)
+                self._slot.release()
+        return lepas
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self._slot.acquire(timeout=self.konfigurasi.timeout_antre):
+            with self._lock:
+                self.ditolak_antre += 1
+            raise httpx.PoolTimeout("Terlalu banyak request Supabase bersamaan", request=request)
+        self._ubah_aktif(1)
+        lepas = self._pelepas()
+        try:
+            self.pemutus.izinkan()
+        except SirkuitTerbuka:
+            with self._lock:
+                self.ditolak_sirkuit += 1
+            lepas()
+            raise
+
+        with self._lock:
+            self.request += 1
+        try:
+            response = self.dasar.handle_request(request)
+        except httpx.PoolTimeout:
+            self.pemutus.batal()
+            lepas()
+            raise
+        except Exception:
+            with self._lock:
+                self.gagal += 1
+            self.pemutus.gagal()
+            lepas()
+            raise
+
+        if response.status_code >= 500:
+            with self._lock:
+                self.gagal += 1
+            self.pemutus.gagal()
+        else:
+            self.pemutus.berhasil()
+        # Slot baru dilepas setelah body selesai dibaca, bukan saat header tiba
+        return httpx.Response(status_code=response.status_code, headers=response.headers,
+                              stream=_AliranBerslot(response.stream, lepas),
+                              extensions=response.extensions)
+
+    def close(self) -> None:
+        self.dasar.close()
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "request": self.request,
+                "gagal": self.gagal,
+                "ditolak_antre": self.ditolak_antre,
+                "ditolak_sirkuit": self.ditolak_sirkuit,
+                "aktif": self.aktif,
+                "puncak_aktif": self.puncak_aktif,
+                "sirkuit": self.pemutus.status,
+                "sirkuit_dibuka": self.pemutus.dibuka,
+            }
+
+
+class KoneksiSupabase:
+    """
+    httpx.Client bersama (satu per proses) dan pembuat client Supabase di atasnya
+    """
+
+    def __init__(self, konfigurasi: Optional[KonfigurasiKoneksi] = None,
+                 dasar: Optional[httpx.BaseTransport] = None):
+        self.konfigurasi = konfigurasi or KonfigurasiKoneksi()
+        self.transport = TransportTerkelola(self.konfigurasi, dasar)
+        self.http = httpx.Client(
+            transport=self.transport,
+            timeout=httpx.Timeout(self.konfigurasi.timeout_baca,
+                                  connect=self.konfigurasi.timeout_sambung,
+                                  pool=self.konfigurasi.timeout_antre),
+            follow_redirects=True,
+        )
+
+    def buat_client(self, url: str, key: str):
+        from supabase import ClientOptions, create_client
+
+        return create_client(url, key, options=ClientOptions(
+            httpx_client=self.http, postgrest_client_timeout=self.konfigurasi.timeout_baca))
+
+    def status(self) -> dict:
+        return self.transport.status()
+
+    def tutup(self) -> None:
+        self.http.close()
@@ -0,0 +1,243 @@
+"""
+Laporan rekap nilai per program studi tanpa Streamlit
+Data dimuat sekali, rekap prodi x semester dihitung dalam satu groupby, lalu grafik
+setiap prodi dibangun dan ditulis (HTML statis atau PNG) secara paralel di process pool.
+Setiap prodi mendapat satu folder bundel: index.html, rekap.csv dan berkas grafik.
+
+Penggunaan headless:
+    python laporan_prodi.py --keluaran laporan
+    python laporan_prodi.py --csv ekspor_nilai.csv --format png --proses 4
+"""
+
+import argparse
+import html
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+import pandas as pd
+
+from data_nilai import KOLOM_STATISTIK, ambil_data, buat_client, ringkas_dataframe
+from grafik_nilai import PEMBANGUN_GRAFIK, masukan_grafik
+from statistik import StatistikNilai, rekap_prodi_semester, statistik_dari_dataframe
+
+FORMAT_LAPORAN = ["html", "png"]
+# Grafik yang bermakna untuk satu prodi (rata-rata antar prodi dan heatmap untuk fakultas)
+GRAFIK_PRODI = ["tren_semester", "pie_huruf", "bar_huruf", "histogram"]
+KOLOM_REKAP_LAPORAN = {
+    "count": "Jumlah", "mean": "Rata-rata", "min": "Min", "max": "Max", "std": "Std Deviasi",
+}
+
+
+@dataclass
+class TugasLaporan:
+    """
+    Masukan satu bundel prodi; hanya data agregat yang dikirim ke proses pekerja
+    """
+    prodi: str
+    rekap: pd.DataFrame
+    stat: StatistikNilai
+    folder: str
+    format: str = "html"
+    offline: bool = False
+
+
+@dataclass
+class HasilLaporan:
+    prodi: str
+    folder: str
+    berkas: List[str] = field(default_factory=list)
+    durasi: float = 0.0
+
+
+def png_tersedia() -> bool:
+    """
+    Ekspor PNG membutuhkan kaleido (opsional)
+    """
+    try:
+        import kaleido  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def nama_folder(prodi: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in str(prodi)) or "prodi"
+
+
+def _tabel_rekap(rekap: pd.DataFrame) -> pd.DataFrame:
+    return rekap.rename(columns=KOLOM_REKAP_LAPORAN).round(2)
+
+
+# ==================== PERSIAPAN ====================
+def siapkan_tugas(df: pd.DataFrame, keluaran: str, format_laporan: str = "html",
+                  prodi: Optional[Sequence[str]] = None,
+                  offline: bool = False) -> List[TugasLaporan]:
+    """
+    Rekap prodi x semester untuk seluruh fakultas sekaligus, lalu dipotong per prodi
+    bersama StatistikNilai masing-masing prodi
+    """
+    if prodi is not None:
+        df = df[df["prodi"].isin(list(prodi))]
+    rekap = rekap_prodi_semester(df)
+    tugas = []
+    for nama, grup in df.groupby("prodi", observed=True):
+        nama = str(nama)
+        tugas.append(TugasLaporan(
+            prodi=nama,
+            rekap=rekap.xs(nama, level="prodi"),
+            stat=statistik_dari_dataframe(grup),
+            folder=os.path.join(keluaran, nama_folder(nama)),
+            format=format_laporan,
+            offline=offline,
+        ))
+    return tugas
+
+
+# ==================== PENULISAN BUNDEL ====================
+def tulis_bundel(tugas: TugasLaporan) -> HasilLaporan:
+    """
+    Bangun grafik satu prodi dan tulis bundelnya (dijalankan di proses pekerja)
+    """
+    mulai = time.perf_counter()
+    os.makedirs(tugas.folder, exist_ok=True)
+    hasil = HasilLaporan(tugas.prodi, tugas.folder)
+
+    def tulis(nama: str, isi: str) -> None:
+        path = os.path.join(tugas.folder, nama)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(isi)
+        hasil.berkas.append(path)
+
+    tabel = _tabel_rekap(tugas.rekap)
+    tabel.to_csv(os.path.join(tugas.folder, "rekap.csv"))
+    hasil.berkas.append(os.path.join(tugas.folder, "rekap.csv"))
+
+    masukan = masukan_grafik(tugas.stat)
+    bagian = []
+    for i, nama in enumerate(GRAFIK_PRODI):
+        fig = PEMBANGUN_GRAFIK[nama](masukan[nama])
+        if tugas.format == "png":
+            path = os.path.join(tugas.folder, f"{nama}.png")
+            fig.write_image(path, width=1000, height=fig.layout.height or 500)
+            hasil.berkas.append(path)
+            bagian.append(f'<img src="{nama}.png" alt="{nama}" style="max-width:100%">')
+        else:
+            # plotly.js cukup dimuat sekali per halaman
+            plotlyjs = ("directory" if tugas.offline else "cdn") if i == 0 else False
+            bagian.append(fig.to_html(full_html=False, include_plotlyjs=plotlyjs))
+
+    if tugas.format == "html" and tugas.offline:
+        from plotly.offline import get_plotlyjs
+        tulis("plotly.min.js", get_plotlyjs())
+
+    judul = html.escape(f"Rekap Nilai Program Studi {tugas.prodi}")
+    d = tugas.stat.deskriptif
+    tulis("index.html", f"""<!DOCTYPE html>
+<html lang="id">
+<head><meta charset="utf-8"><title>{judul}</title></head>
+<body style="font-family: sans-serif; margin: 2rem;">
+<h1>{judul}</h1>
+<p>Jumlah mahasiswa: {tugas.stat.jumlah} | Rata-rata: {d['mean']:.2f} |
+Max: {d['max']:.2f} | Min: {d['min']:.2f}</p>
+<h2>Rekap per Semester</h2>
+{tabel.to_html()}
+<h2>Grafik</h2>
+{''.join(bagian)}
+<p style="color: #6c757d;">Dibuat {time.strftime('%Y-%m-%d %H:%M:%S')}</p>
+</body>
+</html>
+""")
+    hasil.durasi = time.perf_counter() - mulai
+    return hasil
+
+
+def tulis_indeks(keluaran: str, hasil: List[HasilLaporan], rekap: pd.DataFrame) -> str:
+    """
+    Halaman indeks fakultas: tautan ke setiap bundel dan rekap seluruh prodi x semester
+    """
+    tautan = "".join(
+        f'<li><a href="{html.escape(os.path.relpath(h.folder, keluaran))}/index.html">'
+        f"{html.escape(h.prodi)}</a></li>" for h in hasil)
+    path = os.path.join(keluaran, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="id">
+<head><meta charset="utf-8"><title>Rekap Nilai Fakultas</title></head>
+<body style="font-family: sans-serif; margin: 2rem;">
+<h1>Rekap Nilai Fakultas</h1>
+<ul>{tautan}</ul>
+{_tabel_rekap(rekap).to_html()}
+</body>
+</html>
+""")
+    return path
+
+
+def buat_laporan(df: pd.DataFrame, keluaran: str, format_laporan: str = "html",
+                 proses: Optional[int] = None,
+                 prodi: Optional[Sequence[str]] = None,
+                 offline: bool = False) -> List[HasilLaporan]:
+    """
+    Tulis bundel setiap prodi; proses=1 menjalankan semuanya di proses ini
+    """
+    if format_laporan == "png" and not png_tersedia():
+        raise RuntimeError("Format PNG membutuhkan paket kaleido (pip install kaleido)")
+    os.makedirs(keluaran, exist_ok=True)
+    tugas = siapkan_tugas(df, keluaran, format_laporan, prodi, offline)
+    if proses == 1 or len(tugas) <= 1:
+        hasil = [tulis_bundel(t) for t in tugas]
+    else:
+        with ProcessPoolExecutor(max_workers=proses) as pool:
+            hasil = list(pool.map(tulis_bundel, tugas))
+    tulis_indeks(keluaran, hasil, pd.concat({t.prodi: t.rekap for t in tugas},
+                                            names=["prodi"]) if tugas else pd.DataFrame())
+    return hasil
+
+
+# ==================== CLI ====================
+def muat_data(berkas_csv: Optional[str] = None) -> pd.DataFrame:
+    """
+    Kolom statistik dari berkas CSV (mis. hasil ekspor) atau langsung dari Supabase
+    """
+    if berkas_csv:
+        df = pd.read_csv(berkas_csv, usecols=lambda k: k in KOLOM_STATISTIK)
+        return ringkas_dataframe(df)
+    return ambil_data(buat_client(), KOLOM_STATISTIK, ringkas=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Laporan rekap nilai per program studi")
+    parser.add_argument("--keluaran", default="laporan", help="Folder tujuan bundel laporan")
+    parser.add_argument("--format", choices=FORMAT_LAPORAN, default="html",
+                        help="Format grafik (png membutuhkan kaleido)")
+    parser.add_argument("--csv", help="Baca data dari berkas CSV alih-alih Supabase")
+    parser.add_argument("--prodi", nargs="+", help="Hanya prodi tertentu")
+    parser.add_argument("--proses", type=int, default=None,
+                        help="Jumlah proses pekerja (default: jumlah CPU)")
+    parser.add_argument("--offline", action="store_true",
+                        help="Sertakan plotly.js di setiap bundel HTML (tanpa CDN)")
+    args = parser.parse_args(argv)
+    if args.format == "png" and not png_tersedia():
+        print("Format PNG membutuhkan paket kaleido (pip install kaleido)")
+        return 2
+
+    mulai = time.perf_counter()
+    df = muat_data(args.csv)
+    print(f"Data dimuat: {len(df)} baris ({time.perf_counter() - mulai:.2f} dtk)")
+    if df.empty:
+        print("Tidak ada data.")
+        return 1
+
+    hasil = buat_laporan(df, args.keluaran, args.format, args.proses, args.prodi, args.offline)
+    for h in hasil:
+        print(f"{h.prodi}: {len(h.berkas)} berkas di {h.folder} ({h.durasi:.2f} dtk)")
+    print(f"Selesai: {len(hasil)} prodi dalam {time.perf_counter() - mulai:.2f} dtk")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
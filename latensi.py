@@ -0,0 +1,154 @@
+"""
+Pencatat latensi per operasi (fetch Supabase, simpan, hapus, agregasi, grafik)
+Setiap operasi menyimpan durasi terakhir di ring buffer berukuran tetap sehingga
+biaya pencatatan O(1) dan memori datar; persentil p50/p95/p99 dihitung saat dibaca.
+Hasil bisa diekspor ke berkas lokal sebagai JSON atau teks eksposisi Prometheus.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+UKURAN_BUFFER_DEFAULT = 1024
+PERSENTIL = (50, 95, 99)
+PREFIKS_PROMETHEUS = "nilai_mahasiswa_operasi"
+
+
+class _Operasi:
+    """
+    Ring buffer durasi satu operasi plus total kumulatif sejak proses dimulai
+    """
+
+    def __init__(self, ukuran_buffer: int):
+        self.durasi: deque = deque(maxlen=ukuran_buffer)
+        self.jumlah = 0
+        self.total = 0.0
+        self.gagal = 0
+
+
+class PencatatLatensi:
+    """
+    Registri latensi per nama operasi, aman dipakai bersama oleh semua sesi (thread)
+    """
+
+    def __init__(self, ukuran_buffer: int = UKURAN_BUFFER_DEFAULT):
+        self.ukuran_buffer = ukuran_buffer
+        self._operasi: Dict[str, _Operasi] = {}
+        self._lock = threading.Lock()
+
+    # ==================== PENCATATAN ====================
+    def catat(self, nama: str, detik: float, gagal: bool = False) -> None:
+        with self._lock:
+            operasi = self._operasi.get(nama)
+            if operasi is None:
+                operasi = self._operasi[nama] = _Operasi(self.ukuran_buffer)
+            operasi.durasi.append(detik)
+            operasi.jumlah += 1
+            operasi.total += detik
+            operasi.gagal += gagal
+
+    @contextmanager
+    def ukur(self, nama: str) -> Iterator[None]:
+        """
+        Context manager pengukur satu blok; exception tetap diteruskan dan dicatat sebagai gagal
+        """
+        mulai = time.perf_counter()
+        gagal = True
+        try:
+            yield
+            gagal = False
+        finally:
+            self.catat(nama, time.perf_counter() - mulai, gagal)
+
+    def bungkus(self, nama: Optional[str] = None) -> Callable[[Callable], Callable]:
+        """
+        Dekorator pengukur fungsi, nama operasi default = nama fungsi
+        """
+        def dekorator(fungsi: Callable) -> Callable:
+            nama_operasi = nama or fungsi.__name__
+
+            @functools.wraps(fungsi)
+            def terukur(*args, **kwargs):
+                with self.ukur(nama_operasi):
+                    return fungsi(*args, **kwargs)
+            return terukur
+        return dekorator
+
+    def reset(self) -> None:
+        with self._lock:
+            self._operasi.clear()
+
+    # ==================== RINGKASAN ====================
+    def ringkasan(self) -> Dict[str, dict]:
+        """
+        Per operasi: jumlah, gagal, rata-rata kumulatif, serta p50/p95/p99 dan maks dari
+        isi ring buffer (detik)
+        """
+        # numpy baru dimuat saat ringkasan dibaca, pencatatan sendiri tidak membutuhkannya
+        import numpy as np
+
+        with self._lock:
+            salinan = {nama: (np.fromiter(op.durasi, dtype=np.float64, count=len(op.durasi)),
+                              op.jumlah, op.total, op.gagal)
+                       for nama, op in self._operasi.items()}
+
+        hasil = {}
+        for nama, (durasi, jumlah, total, gagal) in sorted(salinan.items()):
+            persentil = np.percentile(durasi, PERSENTIL) if len(durasi) else [None] * len(PERSENTIL)
+            hasil[nama] = {
+                "jumlah": jumlah,
+                "gagal": gagal,
+                "total": total,
+                "rata_rata": total / jumlah if jumlah else None,
+                **{f"p{p}": None if nilai is None else float(nilai)
+                   for p, nilai in zip(PERSENTIL, persentil)},
+                "maks": float(durasi.max()) if len(durasi) else None,
+                "sampel": len(durasi),
+            }
+        return hasil
+
+    # ==================== EKSPOR ====================
+    def ke_json(self) -> str:
+        return json.dumps({"dibuat": time.time(), "satuan": "detik",
+                           "operasi": self.ringkasan()}, indent=2)
+
+    def ke_prometheus(self, prefiks: str = PREFIKS_PROMETHEUS) -> str:
+        """
+        Teks eksposisi Prometheus: summary per operasi (quantile dari ring buffer,
+        _sum/_count kumulatif) dan counter kegagalan
+        """
+        ringkasan = self.ringkasan()
+        baris = [f"# HELP {prefiks}_detik Latensi operasi aplikasi nilai mahasiswa",
+                 f"# TYPE {prefiks}_detik summary"]
+        for nama, r in ringkasan.items():
+            label = f'operasi="{nama}"'
+            for p in PERSENTIL:
+                if r[f"p{p}"] is not None:
+                    baris.append(f'{prefiks}_detik{{{label},quantile="{p / 100:g}"}} {r[f"p{p}"]:.6g}')
+            baris.append(f"{prefiks}_detik_sum{{{label}}} {r['total']:.6g}")
+            baris.append(f"{prefiks}_detik_count{{{label}}} {r['jumlah']}")
+        baris += [f"# HELP {prefiks}_gagal_total Jumlah operasi yang berakhir dengan exception",
+                  f"# TYPE {prefiks}_gagal_total counter"]
+        for nama, r in ringkasan.items():
+            baris.append(f'{prefiks}_gagal_total{{operasi="{nama}"}} {r["gagal"]}')
+        return "\n".join(baris) + "\n"
+
+    def ekspor(self, berkas: str) -> str:
+        """
+        Tulis ringkasan ke berkas lokal; format Prometheus untuk .prom/.txt, selain itu JSON.
+        Ditulis ke berkas sementara lalu diganti atomik agar pembaca (mis. node_exporter
+        textfile collector) tidak melihat berkas setengah jadi.
+        Returns: path berkas
+        """
+        isi = (self.ke_prometheus() if berkas.endswith((".prom", ".txt"))
+               else self.ke_json())
+        sementara = f"{berkas}.tmp"
+        with open(sementara, "w", encoding="utf-8") as f:
+            f.write(isi)
+        os.replace(sementara, berkas)
+        return berkas
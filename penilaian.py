@@ -0,0 +1,274 @@
+"""
+Aturan penilaian mahasiswa: bobot nilai akhir dan konversi ke nilai huruf
+Perhitungan dilakukan per batch (NumPy/pandas), fungsi skalar hanya pembungkus
+Skema per prodi/semester dibaca dari skema_penilaian.toml (lihat RegistriSkema)
+"""
+
+import hashlib
+import os
+import tomllib
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DAFTAR_PRODI = ["SI", "TI", "Teknosi"]
+DAFTAR_SEMESTER = list(range(1, 9))
+
+NILAI_MIN = 0.0
+NILAI_MAKS = 100.0
+
+# Bobot tugas, UTS, UAS
+BOBOT_TUGAS = 0.3
+BOBOT_UTS = 0.3
+BOBOT_UAS = 0.4
+
+# Batas bawah tiap huruf (urut naik), huruf ke-i berlaku untuk AMBANG[i-1] <= nilai < AMBANG[i]
+AMBANG_HURUF = np.array([50.0, 60.0, 70.0, 85.0])
+HURUF = np.array(["E", "D", "C", "B", "A"], dtype=object)
+PREDIKAT = np.array(["Gagal", "Kurang", "Cukup", "Baik", "Sangat Baik"], dtype=object)
+DAFTAR_PREDIKAT = list(PREDIKAT[::-1])
+
+
+# ==================== BATCH ====================
+def hitung_nilai_akhir_batch(tugas, uts, uas) -> np.ndarray:
+    """
+    Menghitung nilai akhir untuk array/Series nilai sekaligus
+    """
+    tugas = np.asarray(tugas, dtype=np.float64)
+    uts = np.asarray(uts, dtype=np.float64)
+    uas = np.asarray(uas, dtype=np.float64)
+    return (BOBOT_TUGAS * tugas) + (BOBOT_UTS * uts) + (BOBOT_UAS * uas)
+
+
+def indeks_huruf(nilai_akhir) -> np.ndarray:
+    """
+    Posisi huruf (0 = E ... 4 = A) lewat searchsorted pada tabel ambang.
+    NaN diperlakukan seperti nilai di bawah semua ambang (E), sama dengan versi if/elif.
+    """
+    nilai_akhir = np.asarray(nilai_akhir, dtype=np.float64)
+    indeks = np.searchsorted(AMBANG_HURUF, nilai_akhir, side="right")
+    return np.where(np.isnan(nilai_akhir), 0, indeks)
+
+
+def konversi_nilai_huruf_batch(nilai_akhir) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Konversi array nilai akhir ke huruf dan predikat
+    Returns: (array_huruf, array_predikat)
+    """
+    indeks = indeks_huruf(nilai_akhir)
+    return HURUF[indeks], PREDIKAT[indeks]
+
+
+def nilai_batch(tugas, uts, uas) -> pd.DataFrame:
+    """
+    Nilai akhir, huruf dan predikat (kategori) untuk satu kohort dalam satu kali jalan.
+    Index mengikuti input jika input berupa Series.
+    """
+    nilai_akhir = hitung_nilai_akhir_batch(tugas, uts, uas)
+    indeks = indeks_huruf(nilai_akhir)
+    index = tugas.index if isinstance(tugas, pd.Series) else None
+    # Kategori dibangun dari kode indeks, tanpa membuat jutaan objek string
+    return pd.DataFrame({
+        "nilai_akhir": nilai_akhir,
+        "nilai_huruf": pd.Categorical.from_codes(indeks, categories=HURUF),
+        "predikat": pd.Categorical.from_codes(indeks, categories=PREDIKAT),
+    }, index=index)
+
+
+# ==================== SKALAR ====================
+def hitung_nilai_akhir(tugas: float, uts: float, uas: float) -> float:
+    """
+    Menghitung nilai akhir berdasarkan bobot:
+    - Tugas: 30%
+    - UTS: 30%
+    - UAS: 40%
+    """
+    return float(hitung_nilai_akhir_batch(tugas, uts, uas))
+
+
+def konversi_nilai_huruf(nilai_akhir: float) -> tuple:
+    """
+    Konversi nilai angka ke huruf dan predikat
+    Returns: (huruf, predikat)
+    """
+    indeks = int(indeks_huruf(nilai_akhir))
+    return (HURUF[indeks], PREDIKAT[indeks])
+
+
+# ==================== SKEMA PENILAIAN ====================
+# Relatif terhadap modul, bukan direktori kerja, agar CLI bisa dijalankan dari mana saja
+BERKAS_SKEMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "skema_penilaian.toml")
+URUTAN_HURUF_AMBANG = ["D", "C", "B", "A"]
+
+
+@dataclass(frozen=True)
+class SkemaPenilaian:
+    """
+    Skema terkompilasi: vektor bobot (tugas, uts, uas) dan ambang huruf urut naik (D, C, B, A)
+    """
+    nama: str
+    bobot: np.ndarray
+    ambang: np.ndarray
+
+
+SKEMA_DEFAULT = SkemaPenilaian(
+    "default", np.array([BOBOT_TUGAS, BOBOT_UTS, BOBOT_UAS]), AMBANG_HURUF)
+
+
+def kompilasi_skema(nama: str, konfigurasi: dict) -> SkemaPenilaian:
+    """
+    Mengubah konfigurasi {bobot = {...}, ambang = {...}} menjadi SkemaPenilaian
+    """
+    bobot = konfigurasi.get("bobot", {})
+    ambang = konfigurasi.get("ambang", {})
+    vektor_bobot = np.array([
+        float(bobot.get("tugas", BOBOT_TUGAS)),
+        float(bobot.get("uts", BOBOT_UTS)),
+        float(bobot.get("uas", BOBOT_UAS)),
+    ])
+    vektor_ambang = np.array([
+        float(ambang.get(h, AMBANG_HURUF[i])) for i, h in enumerate(URUTAN_HURUF_AMBANG)
+    ])
+
+    if not np.isclose(vektor_bobot.sum(), 1.0):
+        raise ValueError(f"Skema '{nama}': total bobot harus 1, bukan {vektor_bobot.sum():g}")
+    if not np.all(np.diff(vektor_ambang) > 0):
+        raise ValueError(f"Skema '{nama}': ambang harus berurutan A > B > C > D")
+    return SkemaPenilaian(nama, vektor_bobot, vektor_ambang)
+
+
+def _kode_prodi(prodi, daftar_prodi: Sequence[str] = DAFTAR_PRODI) -> np.ndarray:
+    """
+    Posisi prodi di daftar_prodi, len(daftar_prodi) untuk prodi tidak dikenal.
+    Kolom kategori cukup dipetakan lewat kodenya tanpa membandingkan string per baris.
+    """
+    tidak_dikenal = len(daftar_prodi)
+    if isinstance(prodi, pd.Series) and isinstance(prodi.dtype, pd.CategoricalDtype):
+        peta = np.array([daftar_prodi.index(k) if k in daftar_prodi else tidak_dikenal
+                         for k in prodi.cat.categories] + [tidak_dikenal], dtype=np.intp)
+        return peta[prodi.cat.codes.to_numpy()]
+
+    prodi = np.asarray(prodi)
+    kode = np.full(len(prodi), tidak_dikenal, dtype=np.intp)
+    for i, nama in enumerate(daftar_prodi):
+        kode[prodi == nama] = i
+    return kode
+
+
+class RegistriSkema:
+    """
+    Registri skema penilaian per prodi dan semester.
+    Semua skema dikompilasi sekali menjadi matriks bobot (S x 3), matriks ambang (S x 4)
+    dan tabel (prodi x semester) -> indeks skema, sehingga penilaian batch campuran
+    prodi/semester cukup satu operasi vektor tanpa lookup per baris.
+    Daftar prodi, semester dan predikat di sini juga menjadi pilihan form dan filter aplikasi.
+    """
+
+    def __init__(self, aturan: Optional[List[dict]] = None,
+                 default: SkemaPenilaian = SKEMA_DEFAULT,
+                 daftar_prodi: Optional[Sequence[str]] = None):
+        self.skema: List[SkemaPenilaian] = [default]
+        self.daftar_prodi: List[str] = list(daftar_prodi or DAFTAR_PRODI)
+        self.daftar_semester: List[int] = list(DAFTAR_SEMESTER)
+        self.daftar_predikat: List[str] = list(DAFTAR_PREDIKAT)
+        if len(set(self.daftar_prodi)) != len(self.daftar_prodi):
+            raise ValueError(f"Daftar prodi tidak boleh berisi duplikat: {self.daftar_prodi}")
+        # Baris terakhir untuk prodi di luar daftar_prodi, kolom 0 untuk semester tidak dikenal
+        self._tabel = np.zeros((len(self.daftar_prodi) + 1, max(DAFTAR_SEMESTER) + 1), dtype=np.intp)
+
+        # Aturan diterapkan berurutan, aturan belakangan menimpa yang sebelumnya
+        for i, konfigurasi in enumerate(aturan or []):
+            nama = konfigurasi.get("nama", f"skema-{i + 1}")
+            self.skema.append(kompilasi_skema(nama, konfigurasi))
+            prodi = konfigurasi.get("prodi", self.daftar_prodi)
+            semester = konfigurasi.get("semester", DAFTAR_SEMESTER)
+            prodi = [prodi] if isinstance(prodi, str) else prodi
+            semester = [semester] if isinstance(semester, int) else semester
+            # Salah ketik di konfigurasi tidak boleh diam-diam jatuh ke skema default
+            prodi_asing = [p for p in prodi if p not in self.daftar_prodi]
+            if prodi_asing:
+                raise ValueError(f"Skema '{nama}': prodi tidak dikenal {prodi_asing}, "
+                                 f"pilihan: {self.daftar_prodi}")
+            semester_asing = [s for s in semester if s not in DAFTAR_SEMESTER]
+            if semester_asing:
+                raise ValueError(f"Skema '{nama}': semester tidak dikenal {semester_asing}, "
+                                 f"pilihan: {DAFTAR_SEMESTER}")
+            baris = [self.daftar_prodi.index(p) for p in prodi]
+            kolom = list(semester)
+            self._tabel[np.ix_(baris, kolom)] = len(self.skema) - 1
+
+        self._bobot = np.stack([s.bobot for s in self.skema])
+        self._ambang = np.stack([s.ambang for s in self.skema])
+
+    def indeks_skema(self, prodi, semester) -> np.ndarray:
+        """
+        Indeks skema untuk tiap baris (array prodi dan semester)
+        """
+        kode_prodi = _kode_prodi(prodi, self.daftar_prodi)
+        semester = pd.to_numeric(pd.Series(np.asarray(semester)), errors="coerce").to_numpy()
+        kode_semester = np.where(np.isin(semester, DAFTAR_SEMESTER), semester, 0).astype(np.intp)
+        return self._tabel[kode_prodi, kode_semester]
+
+    def sidik(self) -> str:
+        """
+        Sidik jari isi registri (daftar prodi, bobot, ambang, tabel pemetaan) untuk mendeteksi
+        perubahan skema
+        """
+        h = hashlib.sha1("\0".join(self.daftar_prodi).encode())
+        for larik in (self._bobot, self._ambang, self._tabel):
+            h.update(np.ascontiguousarray(larik).tobytes())
+        return h.hexdigest()
+
+    def skema_untuk(self, prodi: str, semester: int) -> SkemaPenilaian:
+        return self.skema[int(self.indeks_skema([prodi], [semester])[0])]
+
+    def nilai_batch(self, tugas, uts, uas, prodi, semester) -> pd.DataFrame:
+        """
+        Nilai akhir, huruf dan predikat untuk batch campuran prodi/semester
+        """
+        idx = self.indeks_skema(prodi, semester)
+        bobot = self._bobot[idx]
+        tugas = np.asarray(tugas, dtype=np.float64)
+        uts = np.asarray(uts, dtype=np.float64)
+        uas = np.asarray(uas, dtype=np.float64)
+        nilai_akhir = (bobot[:, 0] * tugas) + (bobot[:, 1] * uts) + (bobot[:, 2] * uas)
+
+        # Jumlah ambang yang terlampaui = indeks huruf; NaN tidak melampaui apa pun (E)
+        ambang = self._ambang[idx]
+        indeks = np.zeros(len(nilai_akhir), dtype=np.intp)
+        for k in range(ambang.shape[1]):
+            indeks += nilai_akhir >= ambang[:, k]
+
+        index = prodi.index if isinstance(prodi, pd.Series) else None
+        return pd.DataFrame({
+            "nilai_akhir": nilai_akhir,
+            "nilai_huruf": pd.Categorical.from_codes(indeks, categories=HURUF),
+            "predikat": pd.Categorical.from_codes(indeks, categories=PREDIKAT),
+        }, index=index)
+
+    def nilai(self, tugas: float, uts: float, uas: float,
+              prodi: str, semester: int) -> Tuple[float, str, str]:
+        """
+        Versi skalar untuk form input
+        Returns: (nilai_akhir, huruf, predikat)
+        """
+        hasil = self.nilai_batch([tugas], [uts], [uas], [prodi], [semester]).iloc[0]
+        return float(hasil["nilai_akhir"]), hasil["nilai_huruf"], hasil["predikat"]
+
+
+def muat_registri(berkas: str = BERKAS_SKEMA) -> RegistriSkema:
+    """
+    Memuat registri dari berkas TOML; tanpa berkas bawaan hanya skema default yang berlaku.
+    Berkas lain yang diminta secara eksplisit wajib ada. Kunci `prodi` di tingkat atas
+    menggantikan DAFTAR_PRODI.
+    """
+    if not os.path.exists(berkas):
+        if os.path.abspath(berkas) != BERKAS_SKEMA:
+            raise FileNotFoundError(f"Berkas skema penilaian tidak ditemukan: {berkas}")
+        return RegistriSkema()
+    with open(berkas, "rb") as f:
+        konfigurasi = tomllib.load(f)
+    default = kompilasi_skema("default", konfigurasi.get("default", {}))
+    return RegistriSkema(konfigurasi.get("skema", []), default, konfigurasi.get("prodi"))
@@ -0,0 +1,493 @@
+"""
+Penyimpanan lokal tabel nilai_mahasiswa di SQLite dengan sinkronisasi ke Supabase
+Baca, statistik dan tulis dilayani dari berkas lokal; worker latar belakang mengirim
+perubahan tertunda ke Supabase dan menarik perubahan dari server. Aplikasi tetap bisa
+dipakai (dan diuji) tanpa jaringan.
+
+Baris yang belum terkirim memakai id negatif sampai server memberi id aslinya. Id sementara
+diambil dari penghitung menurun di tabel meta sehingga tidak pernah dipakai ulang, juga
+setelah barisnya dihapus selagi dikirim.
+
+Tarik inkremental melanjutkan dari kursor id_tarik di tabel meta yang hanya dimajukan oleh
+baris hasil tarik. Baris kiriman sendiri (id server lebih besar) tidak memajukannya, sehingga
+baris penulis lain dengan id di bawahnya tetap tertarik pada putaran berikutnya.
+
+Insert tertunda yang gagal bisa saja sudah di-commit server (timeout sesudah commit), jadi
+sebelum dikirim ulang baris tertunda dicocokkan dulu dengan server lewat (nim, tanggal_input)
+seperti antrian_simpan.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from antrian_simpan import kunci_baris
+from cache_nilai import UMUR_PENUH_DEFAULT
+from data_nilai import (KOLOM_SEMUA, TABEL_NILAI, UKURAN_HALAMAN, FilterData, Rentang,
+                        ambil_id_server, buat_tabel_sqlite, filter_kosong, hitung_baris,
+                        iter_halaman, ringkas_dataframe)
+from indeks_nim import normalisasi
+from rollup_nilai import pasang_rollup_sqlite, rollup_dari_sqlite
+from statistik import StatistikNilai, statistik_dari_sqlite
+
+BERKAS_LOKAL = "nilai_lokal.db"
+INTERVAL_SINKRON = 30.0
+
+INDEKS_LOKAL = [
+    f"CREATE INDEX IF NOT EXISTS idx_{TABEL_NILAI}_prodi ON {TABEL_NILAI} (prodi, semester)",
+    f"CREATE INDEX IF NOT EXISTS idx_{TABEL_NILAI}_semester ON {TABEL_NILAI} (semester)",
+    f"CREATE INDEX IF NOT EXISTS idx_{TABEL_NILAI}_nim ON {TABEL_NILAI} (nim)",
+    f"CREATE INDEX IF NOT EXISTS idx_{TABEL_NILAI}_nim_semester ON {TABEL_NILAI} (nim, semester)",
+    # Cek duplikat memakai NIM ternormalisasi seperti IndeksNim (tanpa spasi, huruf kecil)
+    f"CREATE INDEX IF NOT EXISTS idx_{TABEL_NILAI}_nim_norm_semester "
+    f"ON {TABEL_NILAI} (lower(trim(nim)), semester)",
+    f"CREATE INDEX IF NOT EXISTS idx_{TABEL_NILAI}_nama ON {TABEL_NILAI} (lower(nama))",
+    "CREATE TABLE IF NOT EXISTS hapus_tertunda (id INTEGER PRIMARY KEY)",
+    # versi naik setiap perubahan agar perubahan selama upsert berjalan tidak ikut ditandai terkirim
+    "CREATE TABLE IF NOT EXISTS ubah_tertunda (id INTEGER PRIMARY KEY, versi INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS meta (kunci TEXT PRIMARY KEY, nilai INTEGER NOT NULL)",
+    # Berkas lama tanpa penghitung: mulai di bawah id sementara yang masih ada
+    f"INSERT OR IGNORE INTO meta (kunci, nilai) "
+    f"SELECT 'id_sementara', MIN(COALESCE(MIN(id), 0), 0) FROM {TABEL_NILAI}",
+    # Berkas lama tanpa kursor: tarik berikutnya mulai dari awal
+    "INSERT OR IGNORE INTO meta (kunci, nilai) VALUES ('id_tarik', 0)",
+]
+
+
+def klausa_filter(filter_data: Optional[FilterData] = None) -> Tuple[str, list]:
+    """
+    Filter kolom -> daftar nilai sebagai klausa WHERE SQLite
+    Returns: (sql, parameter), sql kosong jika tanpa filter
+    """
+    bagian, params = [], []
+    for kolom, nilai in (filter_data or {}).items():
+        if nilai is None:
+            continue
+        if kolom not in KOLOM_SEMUA:
+            raise ValueError(f"Kolom filter tidak dikenal: {kolom}")
+        if isinstance(nilai, Rentang):
+            bagian.append(f"{kolom} >= ? AND {kolom} < ?")
+            params.extend([nilai.awal, nilai.akhir])
+            continue
+        nilai = list(nilai)
+        if not nilai:
+            return " WHERE 0", []
+        bagian.append(f"{kolom} IN ({','.join('?' * len(nilai))})")
+        params.extend(v.item() if hasattr(v, "item") else v for v in nilai)
+    return (" WHERE " + " AND ".join(bagian) if bagian else ""), params
+
+
+class PenyimpananLokal:
+    """
+    Penyimpanan SQLite lokal dengan sinkronisasi dua arah ke Supabase (client opsional).
+    Penulisan memakai satu koneksi terkunci, pembacaan memakai koneksi per thread (WAL).
+    """
+
+    def __init__(self, berkas: str = BERKAS_LOKAL, client=None,
+                 interval: float = INTERVAL_SINKRON,
+                 umur_penuh: float = UMUR_PENUH_DEFAULT,
+                 ukuran_halaman: int = UKURAN_HALAMAN):
+        self.berkas = berkas
+        self.client = client
+        self.interval = interval
+        self.umur_penuh = umur_penuh
+        self.ukuran_halaman = ukuran_halaman
+
+        self._tulis = sqlite3.connect(berkas, check_same_thread=False)
+        self._tulis.execute("PRAGMA journal_mode=WAL")
+        buat_tabel_sqlite(self._tulis)
+        for sql in INDEKS_LOKAL:
+            self._tulis.execute(sql)
+        self._tulis.commit()
+        pasang_rollup_sqlite(self._tulis)
+        self._lock = threading.Lock()
+        self._lock_sinkron = threading.Lock()
+        self._lokal = threading.local()
+
+        self._picu = threading.Event()
+        self._berhenti = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._minta_penuh = False
+        self.waktu_penuh = 0.0
+        self.terakhir_sinkron: Optional[float] = None
+        self.sinkron = 0
+        self.gagal = 0
+        self.galat_terakhir = ""
+
+        # Baris tertunda dari proses sebelumnya mungkin sudah terkirim sebelum proses berhenti
+        self._perlu_cek = bool(self._tulis.execute(
+            f"SELECT 1 FROM {TABEL_NILAI} WHERE id < 0 LIMIT 1").fetchone())
+
+    def _baca(self) -> sqlite3.Connection:
+        conn = getattr(self._lokal, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.berkas, check_same_thread=False)
+            self._lokal.conn = conn
+        return conn
+
+    # ==================== TULIS ====================
+    def simpan(self, baris: Sequence[dict]) -> List[dict]:
+        """
+        Simpan baris secara lokal dengan id sementara (negatif), dikirim saat sinkronisasi
+        Returns: baris tersimpan beserta id sementaranya
+        """
+        hasil = []
+        with self._lock, self._tulis:
+            id_min = self._tulis.execute(
+                "SELECT nilai FROM meta WHERE kunci = 'id_sementara'").fetchone()[0]
+            for i, data in enumerate(baris, start=1):
+                data = {k: v for k, v in data.items() if k in KOLOM_SEMUA and k != "id"}
+                data["id"] = id_min - i
+                self._tulis.execute(
+                    f"INSERT INTO {TABEL_NILAI} ({','.join(data)}) "
+                    f"VALUES ({','.join('?' * len(data))})", list(data.values()))
+                hasil.append(data)
+            self._tulis.execute("UPDATE meta SET nilai = ? WHERE kunci = 'id_sementara'",
+                                (id_min - len(hasil),))
+        self._picu.set()
+        return hasil
+
+    def perbarui(self, id_data: int, data: dict) -> bool:
+        """
+        Timpa kolom baris yang sudah ada (id tetap). Baris yang sudah ada di server dicatat
+        untuk di-upsert saat sinkronisasi; baris tertunda cukup diubah karena belum terkirim
+        Returns: False jika baris tidak ditemukan
+        """
+        id_data = int(id_data)
+        data = {k: v for k, v in data.items() if k in KOLOM_SEMUA and k != "id"}
+        with self._lock, self._tulis:
+            ada = self._tulis.execute(
+                f"UPDATE {TABEL_NILAI} SET {','.join(f'{k} = ?' for k in data)} WHERE id = ?",
+                list(data.values()) + [id_data]).rowcount
+            if ada and id_data > 0:
+                self._tulis.execute(
+                    "INSERT INTO ubah_tertunda (id, versi) VALUES (?, 1) "
+                    "ON CONFLICT (id) DO UPDATE SET versi = versi + 1", (id_data,))
+        self._picu.set()
+        return bool(ada)
+
+    def hapus(self, id_data: Sequence[int]) -> int:
+        """
+        Hapus baris lokal; id yang sudah ada di server dicatat untuk dihapus saat sinkronisasi.
+        Id dihapus per batch ukuran_halaman (seperti delete in_ ke server) agar jumlah parameter
+        tidak melewati batas variabel SQLite, semuanya dalam satu transaksi.
+        Returns: jumlah baris lokal yang terhapus
+        """
+        id_data = [int(i) for i in id_data]
+        if not id_data:
+            return 0
+        jumlah = 0
+        with self._lock, self._tulis:
+            for awal in range(0, len(id_data), self.ukuran_halaman):
+                batch = id_data[awal:awal + self.ukuran_halaman]
+                jumlah += self._tulis.execute(
+                    f"DELETE FROM {TABEL_NILAI} WHERE id IN ({','.join('?' * len(batch))})",
+                    batch).rowcount
+            self._tulis.executemany("INSERT OR IGNORE INTO hapus_tertunda (id) VALUES (?)",
+                                    [(i,) for i in id_data if i > 0])
+        self._picu.set()
+        return jumlah
+
+    # ==================== BACA ====================
+    def ambil(self, kolom: Optional[Sequence[str]] = None,
+              filter_data: Optional[FilterData] = None) -> pd.DataFrame:
+        kolom = list(kolom or KOLOM_SEMUA)
+        where, params = klausa_filter(filter_data)
+        df = pd.read_sql_query(
+            f"SELECT {','.join(kolom)} FROM {TABEL_NILAI}{where} ORDER BY id < 0, ABS(id)",
+            self._baca(), params=params)
+        return ringkas_dataframe(df)
+
+    def cari_id(self, filter_data: Optional[FilterData] = None) -> List[int]:
+        where, params = klausa_filter(filter_data)
+        return [i for (i,) in self._baca().execute(
+            f"SELECT id FROM {TABEL_NILAI}{where}", params)]
+
+    def hitung(self, filter_data: Optional[FilterData] = None) -> int:
+        where, params = klausa_filter(filter_data)
+        return self._baca().execute(f"SELECT COUNT(*) FROM {TABEL_NILAI}{where}",
+                                    params).fetchone()[0]
+
+    def halaman(self, halaman: int, ukuran_halaman: int,
+                kolom: Optional[Sequence[str]] = None,
+                filter_data: Optional[FilterData] = None) -> pd.DataFrame:
+        """
+        Satu halaman tampilan (halaman dimulai dari 1); baris tertunda tampil paling akhir
+        """
+        kolom = list(kolom or KOLOM_SEMUA)
+        if filter_kosong(filter_data):
+            return pd.DataFrame(columns=kolom)
+        where, params = klausa_filter(filter_data)
+        return pd.read_sql_query(
+            f"SELECT {','.join(kolom)} FROM {TABEL_NILAI}{where} "
+            f"ORDER BY id < 0, ABS(id) LIMIT ? OFFSET ?",
+            self._baca(), params=params + [ukuran_halaman, (halaman - 1) * ukuran_halaman])
+
+    def cari_duplikat(self, nim: str, semester: int) -> Optional[int]:
+        """
+        Id baris dengan nim + semester yang sama (lewat indeks), None jika belum ada
+        """
+        baris = self._baca().execute(
+            f"SELECT id FROM {TABEL_NILAI} WHERE lower(trim(nim)) = ? AND semester = ? LIMIT 1",
+            (normalisasi(nim), int(semester))).fetchone()
+        return baris[0] if baris else None
+
+    def cari_teks(self, teks: str, kolom: Optional[Sequence[str]] = None,
+                  batas: int = 50) -> pd.DataFrame:
+        """
+        Baris dengan awalan NIM atau nama yang cocok; perbandingan rentang awalan
+        dilayani indeks nim dan lower(nama), bukan LIKE yang memindai tabel
+        """
+        kolom = list(kolom or KOLOM_SEMUA)
+        awalan = str(teks).strip()
+        if not awalan:
+            return pd.DataFrame(columns=kolom)
+        kecil = awalan.lower()
+        return pd.read_sql_query(
+            f"SELECT {','.join(kolom)} FROM {TABEL_NILAI} "
+            f"WHERE (nim >= ? AND nim < ?) OR (lower(nama) >= ? AND lower(nama) < ?) "
+            f"ORDER BY nim LIMIT ?",
+            self._baca(), params=[awalan, awalan + "\uffff", kecil, kecil + "\uffff", batas])
+
+    def statistik(self) -> StatistikNilai:
+        return statistik_dari_sqlite(self._baca(), TABEL_NILAI)
+
+    def ringkasan(self, filter_data: Optional[FilterData] = None) -> dict:
+        where, params = klausa_filter(filter_data)
+        jumlah, rata_rata, maks, minimum = self._baca().execute(
+            f"SELECT COUNT(*), AVG(nilai_akhir), MAX(nilai_akhir), MIN(nilai_akhir) "
+            f"FROM {TABEL_NILAI}{where}", params).fetchone()
+        return {"jumlah": jumlah, "rata_rata": rata_rata, "maks": maks, "min": minimum}
+
+    def rollup(self) -> pd.DataFrame:
+        """
+        Rollup harian (tanggal x prodi x semester) yang dipelihara trigger SQLite
+        """
+        return rollup_dari_sqlite(self._baca())
+
+    # ==================== SINKRONISASI ====================
+    def _ganti_sementara(self, pasangan: Sequence[Tuple[int, dict]]) -> None:
+        """
+        Ganti baris ber-id sementara dengan baris server (id_sementara, baris_server)
+        """
+        with self._lock, self._tulis:
+            for id_lokal, data in pasangan:
+                ada = self._tulis.execute(
+                    f"DELETE FROM {TABEL_NILAI} WHERE id = ?", (id_lokal,)).rowcount
+                if ada:
+                    self._sisipkan([data])
+                else:
+                    # Dihapus secara lokal selagi dikirim: hapus juga di server
+                    self._tulis.execute("INSERT OR IGNORE INTO hapus_tertunda (id) VALUES (?)",
+                                        (data["id"],))
+
+    def _cocokkan_server(self, id_sementara: List[int], baris: List[dict]) -> int:
+        """
+        Ganti baris tertunda yang ternyata sudah ada di server, dicocokkan lewat
+        (nim, tanggal_input) yang diisi saat simpan
+        Returns: jumlah baris yang sudah tersimpan
+        """
+        kunci = {}
+        for id_lokal, data in zip(id_sementara, baris):
+            kunci.setdefault(kunci_baris(data), []).append(id_lokal)
+        waktu = sorted({b["tanggal_input"] for b in baris if b.get("tanggal_input") is not None})
+        if not waktu:
+            return 0
+        response = (self.client.table(TABEL_NILAI).select(",".join(KOLOM_SEMUA))
+                    .in_("tanggal_input", waktu).execute())
+        pasangan = []
+        for data in response.data or []:
+            antre = kunci.get(kunci_baris(data))
+            if antre:
+                pasangan.append((antre.pop(0), data))
+        self._ganti_sementara(pasangan)
+        return len(pasangan)
+
+    def _kirim_simpan(self) -> int:
+        """
+        Insert baris tertunda ke server dalam satu request per halaman,
+        lalu ganti id sementaranya dengan baris dari server
+        """
+        terkirim = 0
+        while True:
+            tertunda = pd.read_sql_query(
+                f"SELECT * FROM {TABEL_NILAI} WHERE id < 0 ORDER BY id DESC LIMIT ?",
+                self._baca(), params=[self.ukuran_halaman])
+            if tertunda.empty:
+                return terkirim
+            id_sementara = tertunda.pop("id").tolist()
+            baris = tertunda.astype(object).where(tertunda.notna(), None).to_dict("records")
+            if self._perlu_cek:
+                cocok = self._cocokkan_server(id_sementara, baris)
+                self._perlu_cek = False
+                if cocok:
+                    terkirim += cocok
+                    continue
+            try:
+                response = self.client.table(TABEL_NILAI).insert(baris).execute()
+            except Exception:
+                # Bisa gagal sesudah server commit: halaman ini dicocokkan dulu sebelum dikirim ulang
+                self._perlu_cek = True
+                raise
+            if len(response.data or []) != len(id_sementara):
+                raise RuntimeError("Insert tidak mengembalikan baris tersimpan")
+            self._ganti_sementara(list(zip(id_sementara, response.data or [])))
+            terkirim += len(id_sementara)
+
+    def _kirim_ubah(self) -> int:
+        """
+        Upsert (berdasarkan id) baris server yang diubah secara lokal
+        """
+        terkirim = 0
+        while True:
+            versi = self._baca().execute(
+                "SELECT id, versi FROM ubah_tertunda ORDER BY id LIMIT ?",
+                (self.ukuran_halaman,)).fetchall()
+            if not versi:
+                return terkirim
+            id_ubah = [i for i, _ in versi]
+            tanda = ",".join("?" * len(id_ubah))
+            # Baris yang sudah dihapus lokal tidak ikut; hapusnya dikirim _kirim_hapus
+            ubah = pd.read_sql_query(
+                f"SELECT {','.join(KOLOM_SEMUA)} FROM {TABEL_NILAI} WHERE id IN ({tanda})",
+                self._baca(), params=id_ubah)
+            if not ubah.empty:
+                baris = ubah.astype(object).where(ubah.notna(), None).to_dict("records")
+                self.client.table(TABEL_NILAI).upsert(baris, on_conflict="id").execute()
+            with self._lock, self._tulis:
+                self._tulis.executemany("DELETE FROM ubah_tertunda WHERE id = ? AND versi = ?",
+                                        versi)
+            terkirim += len(ubah)
+
+    def _kirim_hapus(self) -> int:
+        id_hapus = [i for (i,) in self._baca().execute("SELECT id FROM hapus_tertunda")]
+        for awal in range(0, len(id_hapus), self.ukuran_halaman):
+            batch = id_hapus[awal:awal + self.ukuran_halaman]
+            self.client.table(TABEL_NILAI).delete().in_("id", batch).execute()
+            with self._lock, self._tulis:
+                self._tulis.executemany("DELETE FROM hapus_tertunda WHERE id = ?",
+                                        [(i,) for i in batch])
+        return len(id_hapus)
+
+    def _sisipkan(self, baris: List[dict]) -> None:
+        """
+        INSERT OR REPLACE baris server (dipanggil dengan lock tulis dipegang)
+        """
+        if not baris:
+            return
+        self._tulis.executemany(
+            f"INSERT OR REPLACE INTO {TABEL_NILAI} ({','.join(KOLOM_SEMUA)}) "
+            f"VALUES ({','.join('?' * len(KOLOM_SEMUA))})",
+            [[b.get(k) for k in KOLOM_SEMUA] for b in baris])
+
+    def _tarik(self, penuh: bool) -> Tuple[int, int]:
+        """
+        Tarik baris baru (id > kursor id_tarik) dan buang baris yang sudah dihapus di server.
+        Tarik penuh menimpa semua baris agar perubahan in-place (hitung ulang) ikut terbawa.
+        Baris yang menunggu dihapus (hapus_tertunda) atau diubah (ubah_tertunda) di server
+        tidak ditimpa/dimunculkan kembali.
+        Returns: (baris_ditarik, baris_dibuang)
+        """
+        conn = self._baca()
+        id_terakhir = 0 if penuh else conn.execute(
+            "SELECT nilai FROM meta WHERE kunci = 'id_tarik'").fetchone()[0]
+        ditarik = 0
+        for baris in iter_halaman(self.client, KOLOM_SEMUA, self.ukuran_halaman,
+                                  setelah_id=id_terakhir):
+            with self._lock, self._tulis:
+                tertunda = {i for (i,) in self._tulis.execute(
+                    "SELECT id FROM hapus_tertunda UNION ALL SELECT id FROM ubah_tertunda")}
+                self._sisipkan([b for b in baris if b["id"] not in tertunda])
+                self._tulis.execute("UPDATE meta SET nilai = ? WHERE kunci = 'id_tarik'",
+                                    (baris[-1]["id"],))
+            ditarik += len(baris)
+
+        # Rekonsiliasi hapus seperti sinkron_delta: diff id hanya jika jumlahnya berbeda
+        batas, jumlah_lokal = conn.execute(
+            f"SELECT COALESCE(MAX(id), 0), COUNT(*) FROM {TABEL_NILAI} WHERE id > 0").fetchone()
+        dibuang = 0
+        if batas and hitung_baris(self.client, sampai_id=batas) != jumlah_lokal:
+            id_server = ambil_id_server(self.client, sampai_id=batas,
+                                        ukuran_halaman=self.ukuran_halaman)
+            id_lokal = [i for (i,) in conn.execute(
+                f"SELECT id FROM {TABEL_NILAI} WHERE id > 0")]
+            hilang = [(i,) for i in id_lokal if i not in id_server]
+            with self._lock, self._tulis:
+                self._tulis.executemany(f"DELETE FROM {TABEL_NILAI} WHERE id = ?", hilang)
+            dibuang = len(hilang)
+        return ditarik, dibuang
+
+    def sinkronkan(self, penuh: bool = False) -> dict:
+        """
+        Satu putaran sinkronisasi: kirim simpan, kirim hapus, lalu tarik dari server
+        """
+        if self.client is None:
+            raise RuntimeError("Client Supabase tidak tersedia (mode offline)")
+        with self._lock_sinkron:
+            penuh = penuh or self._minta_penuh or \
+                time.monotonic() - self.waktu_penuh > self.umur_penuh
+            dikirim = self._kirim_simpan()
+            dikirim += self._kirim_ubah()
+            dihapus = self._kirim_hapus()
+            ditarik, dibuang = self._tarik(penuh)
+            if penuh:
+                self.waktu_penuh = time.monotonic()
+                self._minta_penuh = False
+            self.terakhir_sinkron = time.time()
+            self.sinkron += 1
+            self.galat_terakhir = ""
+        return {"dikirim": dikirim, "dihapus": dihapus, "ditarik": ditarik, "dibuang": dibuang}
+
+    def minta_sinkron(self, penuh: bool = False) -> None:
+        """
+        Bangunkan worker; penuh=True setelah perubahan in-place di server
+        """
+        if penuh:
+            self._minta_penuh = True
+        self._picu.set()
+
+    def _jalankan(self) -> None:
+        while not self._berhenti.is_set():
+            try:
+                self.sinkronkan()
+            except Exception as e:
+                self.gagal += 1
+                self.galat_terakhir = str(e)
+            self._picu.wait(self.interval)
+            self._picu.clear()
+
+    def mulai(self) -> "PenyimpananLokal":
+        """
+        Jalankan worker sinkronisasi (hanya jika ada client)
+        """
+        if self.client is not None and (self._thread is None or not self._thread.is_alive()):
+            self._berhenti.clear()
+            self._thread = threading.Thread(target=self._jalankan, name="sinkron-lokal",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def hentikan(self, timeout: Optional[float] = None) -> None:
+        self._berhenti.set()
+        self._picu.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ==================== STATUS ====================
+    def status(self) -> dict:
+        conn = self._baca()
+        return {
+            "baris": conn.execute(f"SELECT COUNT(*) FROM {TABEL_NILAI}").fetchone()[0],
+            "tertunda_simpan": conn.execute(
+                f"SELECT COUNT(*) FROM {TABEL_NILAI} WHERE id < 0").fetchone()[0],
+            "tertunda_ubah": conn.execute("SELECT COUNT(*) FROM ubah_tertunda").fetchone()[0],
+            "tertunda_hapus": conn.execute("SELECT COUNT(*) FROM hapus_tertunda").fetchone()[0],
+            "online": self.client is not None,
+            "terakhir_sinkron": self.terakhir_sinkron,
+            "sinkron": self.sinkron,
+            "gagal": self.gagal,
+            "galat_terakhir": self.galat_terakhir,
+        }
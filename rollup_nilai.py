@@ -0,0 +1,271 @@
+"""
+Rollup harian nilai_akhir untuk analisis tren lintas tahun akademik
+Setiap baris rollup menyimpan jumlah, total nilai, total kuadrat nilai dan hitungan nilai huruf
+per (tanggal input, prodi, semester). Rollup dipelihara inkremental oleh trigger (Postgres dan
+SQLite) atau dari snapshot di memori, sehingga tren per periode, per angkatan dan pergeseran
+sebaran nilai huruf dihitung dari ribuan baris rollup, bukan dari seluruh tabel.
+
+Periode akademik diturunkan dari tanggal: Agustus-Januari semester Ganjil, Februari-Juli
+semester Genap. Angkatan diturunkan dari periode dan semester mahasiswa saat dinilai.
+"""
+
+import threading
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_nilai import TABEL_NILAI, UKURAN_HALAMAN
+from penilaian import HURUF
+
+TABEL_ROLLUP = "rollup_nilai_harian"
+KUNCI_ROLLUP = ["tanggal", "prodi", "semester"]
+KOLOM_HURUF = [f"jumlah_{h.lower()}" for h in HURUF[::-1]]
+KOLOM_JUMLAH = ["jumlah", "total_nilai", "total_kuadrat"] + KOLOM_HURUF
+KOLOM_ROLLUP = KUNCI_ROLLUP + KOLOM_JUMLAH
+# Kolom nilai_mahasiswa yang dibutuhkan untuk membangun rollup dari snapshot
+KOLOM_SUMBER_ROLLUP = ["id", "tanggal_input", "prodi", "semester", "nilai_akhir", "nilai_huruf"]
+
+BULAN_AWAL_GANJIL = 8
+BULAN_AWAL_GENAP = 2
+
+
+# ==================== ROLLUP DARI DATAFRAME ====================
+def rollup_dari_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rollup harian dari baris nilai_mahasiswa; baris tanpa tanggal_input, prodi, semester
+    atau nilai_akhir tidak dihitung (sama dengan trigger)
+    """
+    if df.empty or not set(KOLOM_SUMBER_ROLLUP[1:]) <= set(df.columns):
+        return pd.DataFrame(columns=KOLOM_ROLLUP)
+    df = df[KOLOM_SUMBER_ROLLUP[1:]].dropna(subset=KOLOM_SUMBER_ROLLUP[1:-1])
+    nilai = df["nilai_akhir"].to_numpy(dtype=np.float64)
+    huruf = df["nilai_huruf"].astype(object).to_numpy()
+    data = pd.DataFrame({
+        # Tanggal = 10 karakter pertama string ISO, seperti substr() di SQLite
+        "tanggal": df["tanggal_input"].astype(str).str[:10].to_numpy(),
+        "prodi": df["prodi"].astype(str).to_numpy(),
+        "semester": df["semester"].to_numpy(dtype=np.int64),
+        "jumlah": np.ones(len(df), dtype=np.int64),
+        "total_nilai": nilai,
+        "total_kuadrat": nilai * nilai,
+        **{kolom: (huruf == h).astype(np.int64) for kolom, h in zip(KOLOM_HURUF, HURUF[::-1])},
+    })
+    return data.groupby(KUNCI_ROLLUP, as_index=False, sort=True).sum()
+
+
+def gabung_rollup(*bagian: pd.DataFrame) -> pd.DataFrame:
+    """
+    Jumlahkan beberapa rollup (mis. rollup lama + rollup baris baru); kunci kosong dibuang
+    """
+    bagian = [b for b in bagian if not b.empty]
+    if not bagian:
+        return pd.DataFrame(columns=KOLOM_ROLLUP)
+    data = pd.concat(bagian, ignore_index=True)
+    data = data.groupby(KUNCI_ROLLUP, as_index=False, sort=True)[KOLOM_JUMLAH].sum()
+    return data[data["jumlah"] > 0].reset_index(drop=True)
+
+
+class RollupNilai:
+    """
+    Rollup di memori atas snapshot, dipakai jika tabel rollup belum dimigrasikan di server.
+    Baris yang ditambahkan ke snapshot di-rollup inkremental; perubahan lain membangun ulang.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sumber: Optional[pd.DataFrame] = None
+        self._jumlah = 0
+        self._id_terakhir: Optional[int] = None
+        self._harian = pd.DataFrame(columns=KOLOM_ROLLUP)
+        self.bangun_ulang = 0
+        self.inkremental = 0
+
+    def selaraskan(self, df: pd.DataFrame) -> "RollupNilai":
+        """
+        Samakan rollup dengan snapshot (urut id, baris baru selalu di akhir)
+        """
+        with self._lock:
+            if df is self._sumber:
+                return self
+            n = self._jumlah
+            if (self._sumber is not None and 0 < n < len(df) and "id" in df.columns
+                    and int(df["id"].iloc[n - 1]) == self._id_terakhir):
+                self._harian = gabung_rollup(self._harian, rollup_dari_dataframe(df.iloc[n:]))
+                self.inkremental += 1
+            else:
+                self._harian = rollup_dari_dataframe(df)
+                self.bangun_ulang += 1
+            self._sumber = df
+            self._jumlah = len(df)
+            self._id_terakhir = int(df["id"].iloc[-1]) if len(df) and "id" in df.columns else None
+        return self
+
+    def harian(self) -> pd.DataFrame:
+        with self._lock:
+            return self._harian.copy()
+
+    def statistik(self) -> dict:
+        with self._lock:
+            return {
+                "baris_rollup": len(self._harian),
+                "baris_sumber": self._jumlah,
+                "bangun_ulang": self.bangun_ulang,
+                "inkremental": self.inkremental,
+            }
+
+
+# ==================== ROLLUP SQLITE ====================
+def _sql_ubah(baris: str, arah: int) -> str:
+    """
+    Upsert satu baris (NEW/OLD) ke rollup dengan tanda arah (+1 insert, -1 delete)
+    """
+    huruf = ", ".join(f"{arah} * ({baris}.nilai_huruf IS '{h}')" for h in HURUF[::-1])
+    tambah = ", ".join(f"{k} = {k} + excluded.{k}" for k in KOLOM_JUMLAH)
+    return (
+        f"INSERT INTO {TABEL_ROLLUP} ({','.join(KOLOM_ROLLUP)}) "
+        f"SELECT substr({baris}.tanggal_input, 1, 10), {baris}.prodi, {baris}.semester, {arah}, "
+        f"{arah} * {baris}.nilai_akhir, {arah} * {baris}.nilai_akhir * {baris}.nilai_akhir, {huruf} "
+        f"WHERE {baris}.tanggal_input IS NOT NULL AND {baris}.prodi IS NOT NULL "
+        f"AND {baris}.semester IS NOT NULL AND {baris}.nilai_akhir IS NOT NULL "
+        f"ON CONFLICT({','.join(KUNCI_ROLLUP)}) DO UPDATE SET {tambah};"
+    )
+
+
+SKEMA_ROLLUP_SQLITE = f"""
+CREATE TABLE IF NOT EXISTS {TABEL_ROLLUP} (
+    tanggal TEXT NOT NULL,
+    prodi TEXT NOT NULL,
+    semester INTEGER NOT NULL,
+    {', '.join(f'{k} REAL NOT NULL DEFAULT 0' if k.startswith('total') else f'{k} INTEGER NOT NULL DEFAULT 0'
+               for k in KOLOM_JUMLAH)},
+    PRIMARY KEY ({', '.join(KUNCI_ROLLUP)})
+)
+"""
+
+KOLOM_PEMICU = "tanggal_input, prodi, semester, nilai_akhir, nilai_huruf"
+TRIGGER_ROLLUP_SQLITE = [
+    f"CREATE TRIGGER IF NOT EXISTS {TABEL_ROLLUP}_insert AFTER INSERT ON {TABEL_NILAI} "
+    f"BEGIN {_sql_ubah('NEW', 1)} END",
+    f"CREATE TRIGGER IF NOT EXISTS {TABEL_ROLLUP}_delete AFTER DELETE ON {TABEL_NILAI} "
+    f"BEGIN {_sql_ubah('OLD', -1)} END",
+    # Perubahan id (baris lokal mendapat id server) tidak menyentuh rollup
+    f"CREATE TRIGGER IF NOT EXISTS {TABEL_ROLLUP}_update AFTER UPDATE OF {KOLOM_PEMICU} "
+    f"ON {TABEL_NILAI} BEGIN {_sql_ubah('OLD', -1)} {_sql_ubah('NEW', 1)} END",
+]
+
+
+def pasang_rollup_sqlite(conn) -> None:
+    """
+    Membuat tabel rollup dan trigger-nya di koneksi SQLite; tabel yang baru dibuat
+    diisi sekali dari isi nilai_mahasiswa (backfill)
+    """
+    ada = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                       (TABEL_ROLLUP,)).fetchone()
+    with conn:
+        conn.execute(SKEMA_ROLLUP_SQLITE)
+        if not ada:
+            huruf = ", ".join(f"SUM(nilai_huruf IS '{h}')" for h in HURUF[::-1])
+            conn.execute(
+                f"INSERT INTO {TABEL_ROLLUP} ({','.join(KOLOM_ROLLUP)}) "
+                f"SELECT substr(tanggal_input, 1, 10) AS t, prodi, semester, COUNT(*), "
+                f"SUM(nilai_akhir), SUM(nilai_akhir * nilai_akhir), {huruf} FROM {TABEL_NILAI} "
+                f"WHERE tanggal_input IS NOT NULL AND prodi IS NOT NULL "
+                f"AND semester IS NOT NULL AND nilai_akhir IS NOT NULL "
+                f"GROUP BY t, prodi, semester")
+        for sql in TRIGGER_ROLLUP_SQLITE:
+            conn.execute(sql)
+
+
+def rollup_dari_sqlite(conn) -> pd.DataFrame:
+    return pd.read_sql_query(
+        f"SELECT {','.join(KOLOM_ROLLUP)} FROM {TABEL_ROLLUP} WHERE jumlah > 0 "
+        f"ORDER BY {','.join(KUNCI_ROLLUP)}", conn)
+
+
+# ==================== ROLLUP SERVER ====================
+def ambil_rollup_server(client, ukuran_halaman: int = UKURAN_HALAMAN) -> pd.DataFrame:
+    """
+    Seluruh baris rollup harian dari tabel rollup_nilai_harian (dipelihara trigger Postgres)
+    """
+    baris: List[dict] = []
+    awal = 0
+    while True:
+        query = client.table(TABEL_ROLLUP).select(",".join(KOLOM_ROLLUP)).gt("jumlah", 0)
+        for kolom in KUNCI_ROLLUP:
+            query = query.order(kolom)
+        halaman = query.range(awal, awal + ukuran_halaman - 1).execute().data or []
+        baris.extend(halaman)
+        if len(halaman) < ukuran_halaman:
+            break
+        awal += ukuran_halaman
+    return pd.DataFrame(baris, columns=KOLOM_ROLLUP)
+
+
+# ==================== TREN ====================
+def periode_akademik(tanggal: pd.Series) -> pd.DataFrame:
+    """
+    Tanggal -> indeks periode (urut waktu) dan label periode, mis. "2024/2025 Ganjil"
+    """
+    waktu = pd.to_datetime(tanggal, format="%Y-%m-%d", errors="coerce")
+    bulan = waktu.dt.month
+    tahun = waktu.dt.year - (bulan < BULAN_AWAL_GANJIL).astype(int)
+    genap = ((bulan >= BULAN_AWAL_GENAP) & (bulan < BULAN_AWAL_GANJIL)).astype(int)
+    return pd.DataFrame({
+        "indeks_periode": tahun * 2 + genap,
+        "periode": (tahun.astype(str) + "/" + (tahun + 1).astype(str) + " "
+                    + np.where(genap == 1, "Genap", "Ganjil")),
+    }, index=tanggal.index)
+
+
+def rollup_periode(harian: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rollup harian digabung per periode akademik x prodi x semester (rollup per term)
+    """
+    if harian.empty:
+        return pd.DataFrame(columns=["indeks_periode", "periode", "prodi", "semester"] + KOLOM_JUMLAH)
+    data = pd.concat([periode_akademik(harian["tanggal"]), harian[KUNCI_ROLLUP[1:] + KOLOM_JUMLAH]],
+                     axis=1).dropna(subset=["indeks_periode"])
+    data["indeks_periode"] = data["indeks_periode"].astype(np.int64)
+    data["semester"] = data["semester"].astype(np.int64)
+    return data.groupby(["indeks_periode", "periode", "prodi", "semester"],
+                        as_index=False, sort=True)[KOLOM_JUMLAH].sum()
+
+
+def _ringkas(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Jumlah -> rata-rata dan simpangan baku (dari total dan total kuadrat) per grup
+    """
+    n = data["jumlah"].astype(np.float64)
+    rata_rata = data["total_nilai"] / n
+    varians = ((data["total_kuadrat"] - n * rata_rata ** 2) / (n - 1)).clip(lower=0)
+    data = data.assign(rata_rata=rata_rata, std=np.sqrt(varians.where(n > 1)))
+    return data.drop(columns=["total_nilai", "total_kuadrat"])
+
+
+def tren_prodi(term: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per periode x prodi: jumlah, rata-rata, simpangan baku dan proporsi (%) tiap nilai huruf
+    """
+    kolom = ["indeks_periode", "periode", "prodi", "jumlah", "rata_rata", "std"] + list(HURUF[::-1])
+    if term.empty:
+        return pd.DataFrame(columns=kolom)
+    data = _ringkas(term.groupby(["indeks_periode", "periode", "prodi"], as_index=False,
+                                 sort=True)[KOLOM_JUMLAH].sum())
+    for kolom_huruf, h in zip(KOLOM_HURUF, HURUF[::-1]):
+        data[h] = data.pop(kolom_huruf) / data["jumlah"] * 100
+    return data[kolom]
+
+
+def tren_angkatan(term: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per periode x angkatan (tahun masuk = periode dikurangi semester yang sudah ditempuh):
+    jumlah, rata-rata dan simpangan baku
+    """
+    kolom = ["indeks_periode", "periode", "angkatan", "jumlah", "rata_rata", "std"]
+    if term.empty:
+        return pd.DataFrame(columns=kolom)
+    data = term.assign(angkatan=(term["indeks_periode"] - (term["semester"] - 1)) // 2)
+    data = _ringkas(data.groupby(["indeks_periode", "periode", "angkatan"], as_index=False,
+                                 sort=True)[["jumlah", "total_nilai", "total_kuadrat"]].sum())
+    return data[kolom]
@@ -0,0 +1,101 @@
+"""
+Server HTTP tiruan endpoint PostgREST Supabase untuk uji beban lapisan koneksi
+Setiap request ditahan selama latensi detik (meniru round trip dan kerja database) lalu
+dijawab dengan baris JSON tetap; koneksi keep-alive HTTP/1.1 dihitung agar penggunaan
+ulang koneksi bisa diperiksa. Mode gagal menjawab 503 untuk menguji pemutus sirkuit.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class _Penangan(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Header dan body dikirim terpisah; tanpa Nagle tidak tertahan delayed ACK
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.tiruan._catat_koneksi()
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _jawab(self) -> None:
+        panjang = int(self.headers.get("Content-Length") or 0)
+        if panjang:
+            self.rfile.read(panjang)
+        tiruan = self.server.tiruan
+        tiruan._catat_request()
+        if tiruan.latensi:
+            time.sleep(tiruan.latensi)
+        if tiruan.gagal:
+            status, isi = 503, b'{"message": "layanan tidak tersedia"}'
+        else:
+            status, isi = (201 if self.command == "POST" else 200), tiruan.isi
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(isi)))
+        self.send_header("Content-Range", f"0-{tiruan.baris - 1}/{tiruan.baris}")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(isi)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = do_HEAD = _jawab
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    tiruan: "ServerTiruan"
+
+
+class ServerTiruan:
+    """
+    Server di 127.0.0.1 pada port acak; url dipakai sebagai SUPABASE_URL
+    """
+
+    def __init__(self, latensi: float = 0.02, baris: int = 10):
+        self.latensi = latensi
+        self.baris = baris
+        self.gagal = False
+        self.isi = json.dumps([{"id": i + 1, "nim": f"{2021000 + i}", "nilai_akhir": 75.0}
+                               for i in range(baris)]).encode()
+        self.jumlah_request = 0
+        self.jumlah_koneksi = 0
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), _Penangan)
+        self._server.tiruan = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _catat_request(self) -> None:
+        with self._lock:
+            self.jumlah_request += 1
+
+    def _catat_koneksi(self) -> None:
+        with self._lock:
+            self.jumlah_koneksi += 1
+
+    def mulai(self) -> "ServerTiruan":
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        name="server-tiruan", daemon=True)
+        self._thread.start()
+        return self
+
+    def hentikan(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "ServerTiruan":
+        return self.mulai()
+
+    def __exit__(self, *_) -> None:
+        self.hentikan()
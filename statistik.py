@@ -0,0 +1,364 @@
+"""
+Perhitungan statistik untuk halaman STATISTIK NILAI
+Sumber dengan hasil yang sama:
+- pandas (snapshot lokal)
+- RPC Postgres statistik_nilai() di Supabase (lihat supabase/migrations)
+- SQLite lokal, pengganti server untuk pengujian/offline
+- agregat berjalan yang diperbarui per insert/delete (statistik_berjalan.py)
+"""
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from typing import Optional
+
+from data_nilai import TABEL_NILAI, FilterData
+from penilaian import HURUF
+
+JUMLAH_BIN_HISTOGRAM = 20
+RPC_STATISTIK = "statistik_nilai"
+RPC_RINGKASAN = "ringkasan_nilai"
+
+KOLOM_PER_PRODI = ["count", "mean", "min", "max", "std"]
+
+
+@dataclass
+class StatistikNilai:
+    """
+    Hasil agregasi nilai_akhir, bentuknya sama dengan hasil groupby pandas di halaman statistik
+    """
+    jumlah: int
+    per_prodi: pd.DataFrame          # index prodi, kolom count/mean/min/max/std
+    per_semester: pd.Series          # index semester, rata-rata nilai_akhir
+    matriks: pd.DataFrame            # pivot prodi x semester, rata-rata nilai_akhir
+    distribusi_huruf: pd.Series      # value_counts nilai_huruf, urut huruf
+    distribusi_predikat: pd.Series   # value_counts predikat, urut jumlah terbanyak
+    deskriptif: pd.Series            # setara Series.describe()
+    histogram: pd.DataFrame          # kolom batas_bawah, batas_atas, jumlah
+
+    @property
+    def kosong(self) -> bool:
+        return self.jumlah == 0
+
+
+# ==================== SUMBER: PANDAS ====================
+def nilai_float64(nilai: pd.Series) -> pd.Series:
+    """
+    nilai_akhir sebagai float64. Snapshot ringkas menyimpannya sebagai float32; karena nilai
+    tersimpan dua desimal, pembulatan ulang mengembalikan nilai aslinya sehingga batas bin
+    histogram dan min/max sama persis dengan data penuh.
+    """
+    return nilai.astype("float64").round(2)
+
+
+def _bin_histogram(nilai: pd.Series, jumlah_bin: int = JUMLAH_BIN_HISTOGRAM) -> pd.DataFrame:
+    """
+    Histogram lebar sama antara min dan max (rumus sama dengan versi SQL)
+    """
+    nilai = nilai.dropna().astype(float)
+    if nilai.empty:
+        return pd.DataFrame(columns=["batas_bawah", "batas_atas", "jumlah"])
+    lo, hi = float(nilai.min()), float(nilai.max())
+    if hi > lo:
+        indeks = np.minimum(np.floor((nilai.to_numpy() - lo) * jumlah_bin / (hi - lo)),
+                            jumlah_bin - 1).astype(int)
+    else:
+        indeks = np.zeros(len(nilai), dtype=int)
+    return _susun_histogram(lo, hi, dict(zip(*np.unique(indeks, return_counts=True))), jumlah_bin)
+
+
+def _susun_histogram(lo: float, hi: float, hitungan: dict,
+                     jumlah_bin: int = JUMLAH_BIN_HISTOGRAM) -> pd.DataFrame:
+    lebar = (hi - lo) / jumlah_bin
+    return pd.DataFrame({
+        "batas_bawah": [lo + i * lebar for i in range(jumlah_bin)],
+        "batas_atas": [lo + (i + 1) * lebar for i in range(jumlah_bin)],
+        "jumlah": [int(hitungan.get(i, 0)) for i in range(jumlah_bin)],
+    })
+
+
+def _urut_predikat(dist: pd.Series) -> pd.Series:
+    """
+    Urutan deterministik: jumlah terbanyak dulu, seri diurutkan berdasarkan label
+    """
+    urutan = sorted(dist.index, key=lambda k: (-dist[k], k))
+    return dist.reindex(urutan)
+
+
+def _hitung_nilai(kolom: pd.Series) -> pd.Series:
+    """
+    value_counts tanpa kategori berjumlah nol, dengan index biasa (bukan kategori)
+    """
+    dist = kolom.value_counts()
+    dist = dist[dist > 0]
+    dist.index = pd.Index(dist.index.astype(object), name=kolom.name)
+    return dist
+
+
+def _indeks_biasa(hasil):
+    """
+    Index/kolom kategori atau int8 dari snapshot ringkas dikembalikan ke tipe biasa
+    """
+    hasil.index = pd.Index(hasil.index.tolist(), name=hasil.index.name)
+    if isinstance(hasil, pd.DataFrame):
+        hasil.columns = pd.Index(hasil.columns.tolist(), name=hasil.columns.name)
+    return hasil.sort_index()
+
+
+def statistik_dari_dataframe(df: pd.DataFrame) -> StatistikNilai:
+    """
+    Menghitung statistik dari snapshot lokal dengan pandas
+    """
+    if df.empty:
+        return _statistik_kosong()
+
+    df = df.assign(nilai_akhir=nilai_float64(df["nilai_akhir"]))
+    nilai = df["nilai_akhir"]
+    return StatistikNilai(
+        jumlah=int(nilai.count()),
+        per_prodi=_indeks_biasa(df.groupby("prodi", observed=True)["nilai_akhir"]
+                                .agg(KOLOM_PER_PRODI)),
+        per_semester=_indeks_biasa(df.groupby("semester", observed=True)["nilai_akhir"].mean()),
+        matriks=_indeks_biasa(df.pivot_table(values="nilai_akhir", index="prodi",
+                                             columns="semester", aggfunc="mean",
+                                             observed=True)),
+        distribusi_huruf=_hitung_nilai(df["nilai_huruf"]).sort_index(),
+        distribusi_predikat=_urut_predikat(_hitung_nilai(df["predikat"])),
+        deskriptif=nilai.describe(),
+        histogram=_bin_histogram(nilai),
+    )
+
+
+def rekap_prodi_semester(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rekap setiap kombinasi prodi x semester dalam satu groupby: jumlah, rata-rata, min,
+    max, std nilai_akhir dan jumlah mahasiswa per nilai huruf
+    """
+    kolom_huruf = sorted(HURUF)
+    if df.empty:
+        return pd.DataFrame(columns=KOLOM_PER_PRODI + kolom_huruf,
+                            index=pd.MultiIndex.from_arrays([[], []], names=["prodi", "semester"]))
+    df = df.assign(nilai_akhir=nilai_float64(df["nilai_akhir"]))
+    grup = df.groupby(["prodi", "semester"], observed=True)
+    huruf = (grup["nilai_huruf"].value_counts().unstack(fill_value=0)
+             .reindex(columns=kolom_huruf, fill_value=0).astype("int64"))
+    rekap = grup["nilai_akhir"].agg(KOLOM_PER_PRODI).join(huruf)
+    rekap.index = pd.MultiIndex.from_tuples(
+        [(str(p), int(s)) for p, s in rekap.index], names=["prodi", "semester"])
+    rekap.columns = pd.Index(rekap.columns.tolist())
+    return rekap.sort_index()
+
+
+def _statistik_kosong() -> StatistikNilai:
+    return _dari_json({"jumlah": 0})
+
+
+# ==================== SUMBER: SERVER / SQLITE ====================
+def _dari_json(hasil: dict) -> StatistikNilai:
+    """
+    Menyusun StatistikNilai dari hasil agregasi database (format RPC statistik_nilai)
+    """
+    per_prodi = pd.DataFrame(hasil.get("per_prodi") or [],
+                             columns=["prodi"] + KOLOM_PER_PRODI)
+    per_prodi = per_prodi.set_index("prodi").sort_index()
+    per_prodi["count"] = per_prodi["count"].astype("int64")
+    per_prodi = per_prodi.astype({k: float for k in KOLOM_PER_PRODI[1:]})
+
+    per_semester = pd.DataFrame(hasil.get("per_semester") or [],
+                                columns=["semester", "mean"])
+    per_semester = per_semester.set_index("semester").sort_index()["mean"].astype(float)
+    per_semester.name = "nilai_akhir"
+
+    matriks = pd.DataFrame(hasil.get("matriks") or [],
+                           columns=["prodi", "semester", "mean"])
+    matriks = matriks.pivot(index="prodi", columns="semester", values="mean").sort_index()
+    matriks = matriks.reindex(sorted(matriks.columns), axis=1).astype(float)
+
+    distribusi_huruf = pd.Series(
+        {b["nilai_huruf"]: int(b["count"]) for b in hasil.get("distribusi_huruf") or []},
+        dtype="int64", name="count").sort_index()
+    distribusi_huruf.index.name = "nilai_huruf"
+
+    distribusi_predikat = pd.Series(
+        {b["predikat"]: int(b["count"]) for b in hasil.get("distribusi_predikat") or []},
+        dtype="int64", name="count")
+    distribusi_predikat = _urut_predikat(distribusi_predikat)
+    distribusi_predikat.index.name = "predikat"
+
+    d = hasil.get("deskriptif") or {}
+    deskriptif = pd.Series(
+        [float(d.get(k) if d.get(k) is not None else np.nan)
+         for k in ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]],
+        index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+        name="nilai_akhir")
+
+    h = hasil.get("histogram") or {}
+    if h.get("min") is None:
+        histogram = pd.DataFrame(columns=["batas_bawah", "batas_atas", "jumlah"])
+    else:
+        histogram = _susun_histogram(float(h["min"]), float(h["max"]),
+                                     {int(b["bin"]): int(b["count"]) for b in h.get("bin") or []})
+
+    return StatistikNilai(
+        jumlah=int(hasil.get("jumlah") or 0),
+        per_prodi=per_prodi,
+        per_semester=per_semester,
+        matriks=matriks,
+        distribusi_huruf=distribusi_huruf,
+        distribusi_predikat=distribusi_predikat,
+        deskriptif=deskriptif,
+        histogram=histogram,
+    )
+
+
+def statistik_dari_json(hasil: dict) -> StatistikNilai:
+    """
+    StatistikNilai dari JSON berformat respons RPC statistik_nilai() (mis. agregat berjalan)
+    """
+    return _dari_json(hasil)
+
+
+def statistik_dari_server(client) -> StatistikNilai:
+    """
+    Agregasi di sisi Postgres lewat RPC statistik_nilai(), hanya hasilnya yang ditransfer
+    """
+    response = client.rpc(RPC_STATISTIK).execute()
+    return _dari_json(response.data or {})
+
+
+# ==================== RINGKASAN (METRIK ATAS) ====================
+def ringkasan_dari_server(client, filter_data: Optional[FilterData] = None) -> dict:
+    """
+    Jumlah, rata-rata, maksimum dan minimum nilai_akhir lewat RPC ringkasan_nilai()
+    """
+    filter_data = filter_data or {}
+    params = {
+        "p_prodi": _sebagai_list(filter_data.get("prodi")),
+        "p_semester": _sebagai_list(filter_data.get("semester")),
+        "p_predikat": _sebagai_list(filter_data.get("predikat")),
+    }
+    hasil = client.rpc(RPC_RINGKASAN, params).execute().data or {}
+    return {
+        "jumlah": int(hasil.get("jumlah") or 0),
+        "rata_rata": hasil.get("rata_rata"),
+        "maks": hasil.get("maks"),
+        "min": hasil.get("min"),
+    }
+
+
+def ringkasan_dari_dataframe(df: pd.DataFrame) -> dict:
+    """
+    Ringkasan yang sama dihitung dari snapshot lokal
+    """
+    if df.empty:
+        return {"jumlah": 0, "rata_rata": None, "maks": None, "min": None}
+    nilai = nilai_float64(df["nilai_akhir"])
+    return {
+        "jumlah": len(df),
+        "rata_rata": float(nilai.mean()),
+        "maks": float(nilai.max()),
+        "min": float(nilai.min()),
+    }
+
+
+def _sebagai_list(nilai) -> Optional[list]:
+    return None if nilai is None else [v.item() if hasattr(v, "item") else v for v in nilai]
+
+
+def _sqlite_semua(conn, sql: str, params: tuple = ()) -> list:
+    kursor = conn.execute(sql, params)
+    kolom = [c[0] for c in kursor.description]
+    return [dict(zip(kolom, baris)) for baris in kursor.fetchall()]
+
+
+def _sqlite_kuantil(conn, tabel: str, n: int, q: float) -> float:
+    """
+    Kuantil interpolasi linear (sama dengan pandas dan percentile_cont Postgres)
+    """
+    posisi = q * (n - 1)
+    bawah = math.floor(posisi)
+    nilai = [b[0] for b in conn.execute(
+        f"SELECT nilai_akhir FROM {tabel} WHERE nilai_akhir IS NOT NULL "
+        f"ORDER BY nilai_akhir LIMIT 2 OFFSET ?", (bawah,))]
+    if len(nilai) == 1 or posisi == bawah:
+        return float(nilai[0])
+    return float(nilai[0] + (nilai[1] - nilai[0]) * (posisi - bawah))
+
+
+def statistik_dari_sqlite(conn, tabel: str = TABEL_NILAI) -> StatistikNilai:
+    """
+    Agregasi yang sama dengan RPC statistik_nilai() dijalankan di SQLite lokal
+    """
+    return _dari_json(json_statistik_sqlite(conn, tabel))
+
+
+def json_statistik_sqlite(conn, tabel: str = TABEL_NILAI) -> dict:
+    """
+    Hasil agregasi SQLite dalam bentuk JSON yang sama dengan respons RPC statistik_nilai()
+    """
+    # Std sampel dua tahap (selisih terhadap rata-rata grup), seperti pandas
+    per_prodi = _sqlite_semua(conn, f"""
+        SELECT t.prodi AS prodi, COUNT(t.nilai_akhir) AS count, g.mean AS mean,
+               MIN(t.nilai_akhir) AS min, MAX(t.nilai_akhir) AS max,
+               CASE WHEN COUNT(t.nilai_akhir) > 1
+                    THEN SUM((t.nilai_akhir - g.mean) * (t.nilai_akhir - g.mean))
+                         / (COUNT(t.nilai_akhir) - 1) END AS var
+        FROM {tabel} t
+        JOIN (SELECT prodi, AVG(nilai_akhir) AS mean FROM {tabel}
+              WHERE prodi IS NOT NULL GROUP BY prodi) g ON g.prodi = t.prodi
+        GROUP BY t.prodi ORDER BY t.prodi""")
+    for baris in per_prodi:
+        var = baris.pop("var")
+        baris["std"] = math.sqrt(var) if var is not None else None
+
+    per_semester = _sqlite_semua(conn, f"""
+        SELECT semester, AVG(nilai_akhir) AS mean FROM {tabel}
+        WHERE semester IS NOT NULL GROUP BY semester ORDER BY semester""")
+    matriks = _sqlite_semua(conn, f"""
+        SELECT prodi, semester, AVG(nilai_akhir) AS mean FROM {tabel}
+        WHERE prodi IS NOT NULL AND semester IS NOT NULL AND nilai_akhir IS NOT NULL
+        GROUP BY prodi, semester""")
+    distribusi_huruf = _sqlite_semua(conn, f"""
+        SELECT nilai_huruf, COUNT(*) AS count FROM {tabel}
+        WHERE nilai_huruf IS NOT NULL GROUP BY nilai_huruf""")
+    distribusi_predikat = _sqlite_semua(conn, f"""
+        SELECT predikat, COUNT(*) AS count FROM {tabel}
+        WHERE predikat IS NOT NULL GROUP BY predikat""")
+
+    ringkas = _sqlite_semua(conn, f"""
+        SELECT COUNT(nilai_akhir) AS count, AVG(nilai_akhir) AS mean,
+               MIN(nilai_akhir) AS min, MAX(nilai_akhir) AS max FROM {tabel}""")[0]
+    n = ringkas["count"]
+    deskriptif = dict(ringkas)
+    histogram = {"min": ringkas["min"], "max": ringkas["max"], "bin": []}
+    if n:
+        var = conn.execute(
+            f"SELECT SUM((nilai_akhir - ?) * (nilai_akhir - ?)) FROM {tabel} "
+            f"WHERE nilai_akhir IS NOT NULL", (ringkas["mean"], ringkas["mean"])).fetchone()[0]
+        deskriptif["std"] = math.sqrt(var / (n - 1)) if n > 1 else None
+        for q, kunci in [(0.25, "25%"), (0.5, "50%"), (0.75, "75%")]:
+            deskriptif[kunci] = _sqlite_kuantil(conn, tabel, n, q)
+
+        lo, hi = ringkas["min"], ringkas["max"]
+        if hi > lo:
+            ekspresi_bin = (f"MIN(CAST(((nilai_akhir - {lo!r}) * {JUMLAH_BIN_HISTOGRAM}) "
+                            f"/ ({hi!r} - {lo!r}) AS INTEGER), {JUMLAH_BIN_HISTOGRAM - 1})")
+        else:
+            ekspresi_bin = "0"
+        histogram["bin"] = _sqlite_semua(conn, f"""
+            SELECT {ekspresi_bin} AS bin, COUNT(*) AS count FROM {tabel}
+            WHERE nilai_akhir IS NOT NULL GROUP BY 1""")
+
+    return {
+        "jumlah": n,
+        "per_prodi": per_prodi,
+        "per_semester": per_semester,
+        "matriks": matriks,
+        "distribusi_huruf": distribusi_huruf,
+        "distribusi_predikat": distribusi_predikat,
+        "deskriptif": deskriptif,
+        "histogram": histogram,
+    }
@@ -0,0 +1,321 @@
+"""
+Statistik nilai_akhir yang dipelihara inkremental (agregat berjalan)
+Setiap grup (total, per prodi, semester, nilai huruf, predikat dan prodi x semester) menyimpan
+jumlah, rata-rata dan M2 (algoritma Welford) serta min/max, sehingga insert dan delete
+memperbarui metrik dalam O(1) per baris tanpa memindai tabel.
+
+Delete yang mengenai min/max grup menandai min/max basi; nilainya dibangun ulang dari sebaran
+grup (hitungan per 0,01 poin) saat dibaca. Sebaran total juga melayani kuartil dan histogram.
+
+Baris tanpa nilai_akhir tidak masuk agregat mana pun (sama dengan count() pandas pada
+statistik_dari_dataframe), tetapi tetap dihitung dalam jumlah baris ringkasan() seperti
+len(df) pada ringkasan_dari_dataframe.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from statistik import JUMLAH_BIN_HISTOGRAM, StatistikNilai, statistik_dari_json
+
+# nilai_akhir disimpan dua desimal dalam rentang 0-100
+RESOLUSI = 100
+UKURAN_SEBARAN = 100 * RESOLUSI + 1
+# Agregat dibangun ulang penuh dari snapshot setelah umur ini (menangkap penulis lain)
+UMUR_BANGUN_ULANG = 300.0
+
+DIMENSI = {
+    "prodi": ["prodi"],
+    "semester": ["semester"],
+    "nilai_huruf": ["nilai_huruf"],
+    "predikat": ["predikat"],
+    "prodi_semester": ["prodi", "semester"],
+}
+KOLOM_BERJALAN = ["prodi", "semester", "nilai_huruf", "predikat", "nilai_akhir"]
+
+
+def _bulat(nilai) -> Optional[float]:
+    if nilai is None or nilai is pd.NA:
+        return None
+    nilai = float(nilai)
+    return None if math.isnan(nilai) else round(nilai, 2)
+
+
+def _slot(nilai: float) -> int:
+    return min(max(int(round(nilai * RESOLUSI)), 0), UKURAN_SEBARAN - 1)
+
+
+def _label(kolom: str, nilai) -> Hashable:
+    return int(nilai) if kolom == "semester" else str(nilai)
+
+
+class Agregat:
+    """
+    Jumlah, rata-rata, M2 (jumlah kuadrat selisih), min/max dan sebaran satu grup
+    """
+    __slots__ = ("jumlah", "rata_rata", "m2", "minimum", "maksimum", "basi", "sebaran")
+
+    def __init__(self):
+        self.jumlah = 0
+        self.rata_rata = 0.0
+        self.m2 = 0.0
+        self.minimum = math.inf
+        self.maksimum = -math.inf
+        self.basi = False
+        self.sebaran = np.zeros(UKURAN_SEBARAN, dtype=np.int32)
+
+    @classmethod
+    def dari_sebaran(cls, sebaran: np.ndarray, rata_rata: float, m2: float) -> "Agregat":
+        agregat = cls()
+        agregat.sebaran = sebaran.astype(np.int32)
+        agregat.jumlah = int(sebaran.sum())
+        agregat.rata_rata = float(rata_rata)
+        agregat.m2 = float(m2)
+        agregat._segarkan_min_maks()
+        return agregat
+
+    def tambah(self, x: float) -> None:
+        self.jumlah += 1
+        delta = x - self.rata_rata
+        self.rata_rata += delta / self.jumlah
+        self.m2 += delta * (x - self.rata_rata)
+        self.minimum = min(self.minimum, x)
+        self.maksimum = max(self.maksimum, x)
+        self.sebaran[_slot(x)] += 1
+
+    def hapus(self, x: float) -> None:
+        """
+        Kebalikan langkah Welford; min/max hanya ditandai basi jika nilai batas yang dihapus
+        """
+        if self.jumlah <= 1:
+            self.__init__()
+            return
+        delta = x - self.rata_rata
+        self.rata_rata -= delta / (self.jumlah - 1)
+        self.m2 = max(self.m2 - delta * (x - self.rata_rata), 0.0)
+        self.jumlah -= 1
+        self.sebaran[_slot(x)] -= 1
+        if x <= self.minimum or x >= self.maksimum:
+            self.basi = True
+
+    def _segarkan_min_maks(self) -> None:
+        terisi = np.flatnonzero(self.sebaran)
+        if len(terisi):
+            self.minimum = float(terisi[0] / RESOLUSI)
+            self.maksimum = float(terisi[-1] / RESOLUSI)
+        else:
+            self.minimum, self.maksimum = math.inf, -math.inf
+        self.basi = False
+
+    def baca(self) -> dict:
+        if self.basi:
+            self._segarkan_min_maks()
+        return {
+            "count": self.jumlah,
+            "mean": self.rata_rata if self.jumlah else None,
+            "min": self.minimum if self.jumlah else None,
+            "max": self.maksimum if self.jumlah else None,
+            "std": math.sqrt(self.m2 / (self.jumlah - 1)) if self.jumlah > 1 else None,
+        }
+
+
+class StatistikBerjalan:
+    """
+    Agregat berjalan seluruh tabel, dipakai bersama semua sesi. Dibangun sekali dari snapshot
+    (bangun), lalu diperbarui per baris lewat tambah/hapus.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._total = Agregat()
+        self._grup: Dict[str, Dict[Hashable, Agregat]] = {d: {} for d in DIMENSI}
+        self._baris = 0
+        self.waktu_bangun: Optional[float] = None
+        self.pembaruan = 0
+
+    @property
+    def siap(self) -> bool:
+        return self.waktu_bangun is not None
+
+    def perlu_bangun(self, umur: float = UMUR_BANGUN_ULANG) -> bool:
+        return not self.siap or time.monotonic() - self.waktu_bangun > umur
+
+    def invalidasi(self) -> None:
+        with self._lock:
+            self.waktu_bangun = None
+
+    # ==================== PEMBANGUNAN ====================
+    def bangun(self, df: pd.DataFrame) -> "StatistikBerjalan":
+        """
+        Bangun ulang semua agregat dari snapshot (vektorisasi per dimensi, tanpa loop baris)
+        """
+        df = df[[k for k in KOLOM_BERJALAN if k in df.columns]]
+        baris = len(df)
+        df = df[df["nilai_akhir"].notna()] if "nilai_akhir" in df.columns else df.iloc[0:0]
+        nilai = df["nilai_akhir"].astype("float64").round(2).to_numpy() if len(df) else np.empty(0)
+        slot = np.clip(np.rint(nilai * RESOLUSI).astype(np.int64), 0, UKURAN_SEBARAN - 1)
+
+        total = Agregat.dari_sebaran(
+            np.bincount(slot, minlength=UKURAN_SEBARAN),
+            nilai.mean() if len(nilai) else 0.0,
+            ((nilai - nilai.mean()) ** 2).sum() if len(nilai) else 0.0)
+
+        grup = {}
+        for dimensi, kolom in DIMENSI.items():
+            grup[dimensi] = {}
+            if df.empty or not set(kolom) <= set(df.columns):
+                continue
+            pengelompok = df.groupby(kolom, observed=True, sort=True)
+            # Baris dengan kunci kosong tidak masuk grup mana pun (ngroup NaN)
+            kode = pengelompok.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+            label = pengelompok.size().index.tolist()
+            if not label:
+                continue
+            ada = kode >= 0
+            kode, nilai_grup, slot_grup = kode[ada], nilai[ada], slot[ada]
+            k = len(label)
+            jumlah = np.bincount(kode, minlength=k)
+            rata_rata = np.bincount(kode, weights=nilai_grup, minlength=k) / np.maximum(jumlah, 1)
+            m2 = np.bincount(kode, weights=(nilai_grup - rata_rata[kode]) ** 2, minlength=k)
+            sebaran = np.bincount(kode * UKURAN_SEBARAN + slot_grup,
+                                  minlength=k * UKURAN_SEBARAN).reshape(k, UKURAN_SEBARAN)
+            for i, lab in enumerate(label):
+                if not jumlah[i]:
+                    continue
+                lab = lab if isinstance(lab, tuple) else (lab,)
+                kunci = tuple(_label(c, v) for c, v in zip(kolom, lab))
+                grup[dimensi][kunci[0] if len(kunci) == 1 else kunci] = Agregat.dari_sebaran(
+                    sebaran[i], rata_rata[i], m2[i])
+
+        with self._lock:
+            self._total, self._grup, self._baris = total, grup, baris
+            self.waktu_bangun = time.monotonic()
+        return self
+
+    # ==================== PEMBARUAN O(1) ====================
+    @staticmethod
+    def _kunci(baris: dict, kolom: List[str]) -> Optional[Hashable]:
+        nilai = [baris.get(k) for k in kolom]
+        if any(v is None or v is pd.NA or (isinstance(v, float) and math.isnan(v)) for v in nilai):
+            return None
+        kunci = tuple(_label(k, v) for k, v in zip(kolom, nilai))
+        return kunci[0] if len(kunci) == 1 else kunci
+
+    def _terapkan(self, baris: Iterable[dict], hapus: bool) -> None:
+        with self._lock:
+            if not self.siap:
+                # Belum dibangun: baris ikut terhitung saat bangun dari snapshot
+                return
+            for b in baris:
+                self._baris += -1 if hapus else 1
+                x = _bulat(b.get("nilai_akhir"))
+                if x is None:
+                    continue
+                for dimensi, kolom in DIMENSI.items():
+                    kunci = self._kunci(b, kolom)
+                    if kunci is None:
+                        continue
+                    grup = self._grup[dimensi]
+                    if hapus:
+                        agregat = grup.get(kunci)
+                        if agregat is None:
+                            continue
+                        agregat.hapus(x)
+                        if not agregat.jumlah:
+                            del grup[kunci]
+                    else:
+                        grup.setdefault(kunci, Agregat()).tambah(x)
+                if hapus:
+                    self._total.hapus(x)
+                else:
+                    self._total.tambah(x)
+                self.pembaruan += 1
+
+    def tambah(self, baris: Iterable[dict]) -> None:
+        self._terapkan(baris, hapus=False)
+
+    def hapus(self, baris: Iterable[dict]) -> None:
+        self._terapkan(baris, hapus=True)
+
+    # ==================== PEMBACAAN ====================
+    def ringkasan(self) -> dict:
+        """
+        Metrik atas REKAPITULASI (format sama dengan ringkasan_dari_dataframe)
+        """
+        with self._lock:
+            total = self._total.baca()
+            baris = self._baris
+        return {"jumlah": baris, "rata_rata": total["mean"],
+                "maks": total["max"], "min": total["min"]}
+
+    def _kuantil(self, kumulatif: np.ndarray, n: int, q: float) -> float:
+        """
+        Kuantil interpolasi linear (sama dengan pandas) dari sebaran kumulatif
+        """
+        posisi = q * (n - 1)
+        bawah = math.floor(posisi)
+        nilai_bawah = np.searchsorted(kumulatif, bawah, side="right") / RESOLUSI
+        if posisi == bawah:
+            return float(nilai_bawah)
+        nilai_atas = np.searchsorted(kumulatif, bawah + 1, side="right") / RESOLUSI
+        return float(nilai_bawah + (nilai_atas - nilai_bawah) * (posisi - bawah))
+
+    def ke_json(self) -> dict:
+        """
+        Agregat dalam bentuk JSON yang sama dengan respons RPC statistik_nilai()
+        """
+        with self._lock:
+            total = self._total.baca()
+            per_dimensi = {d: {k: a.baca() for k, a in grup.items()}
+                           for d, grup in self._grup.items()}
+            sebaran = self._total.sebaran.copy()
+
+        n = total["count"]
+        deskriptif = dict(total)
+        histogram = {"min": total["min"], "max": total["max"], "bin": []}
+        if n:
+            kumulatif = np.cumsum(sebaran)
+            for q, kunci in [(0.25, "25%"), (0.5, "50%"), (0.75, "75%")]:
+                deskriptif[kunci] = self._kuantil(kumulatif, n, q)
+
+            terisi = np.flatnonzero(sebaran)
+            lo, hi = total["min"], total["max"]
+            if hi > lo:
+                indeks = np.minimum(np.floor((terisi / RESOLUSI - lo) * JUMLAH_BIN_HISTOGRAM
+                                             / (hi - lo)), JUMLAH_BIN_HISTOGRAM - 1).astype(int)
+            else:
+                indeks = np.zeros(len(terisi), dtype=int)
+            hitungan = np.bincount(indeks, weights=sebaran[terisi], minlength=JUMLAH_BIN_HISTOGRAM)
+            histogram["bin"] = [{"bin": i, "count": int(c)} for i, c in enumerate(hitungan) if c]
+
+        return {
+            "jumlah": n,
+            "per_prodi": [{"prodi": p, **a} for p, a in per_dimensi["prodi"].items()],
+            "per_semester": [{"semester": s, "mean": a["mean"]}
+                             for s, a in per_dimensi["semester"].items()],
+            "matriks": [{"prodi": p, "semester": s, "mean": a["mean"]}
+                        for (p, s), a in per_dimensi["prodi_semester"].items()],
+            "distribusi_huruf": [{"nilai_huruf": h, "count": a["count"]}
+                                 for h, a in per_dimensi["nilai_huruf"].items()],
+            "distribusi_predikat": [{"predikat": p, "count": a["count"]}
+                                    for p, a in per_dimensi["predikat"].items()],
+            "deskriptif": deskriptif,
+            "histogram": histogram,
+        }
+
+    def statistik(self) -> StatistikNilai:
+        return statistik_dari_json(self.ke_json())
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "siap": self.siap,
+                "baris": self._total.jumlah,
+                "grup": sum(len(g) for g in self._grup.values()),
+                "pembaruan": self.pembaruan,
+                "umur": None if not self.siap else time.monotonic() - self.waktu_bangun,
+            }
@@ -0,0 +1,98 @@
+-- Agregasi untuk halaman STATISTIK NILAI dihitung di Postgres.
+-- Format JSON sama dengan yang dibaca statistik._dari_json() di aplikasi.
+create or replace function public.statistik_nilai()
+returns json
+language sql
+stable
+as $$
+  with data as (
+    select prodi, semester, nilai_akhir::float8 as nilai_akhir, nilai_huruf, predikat
+    from public.nilai_mahasiswa
+  ),
+  ringkas as (
+    select count(nilai_akhir) as n, min(nilai_akhir) as lo, max(nilai_akhir) as hi
+    from data
+  )
+  select json_build_object(
+    'jumlah', (select n from ringkas),
+
+    'per_prodi', (
+      select coalesce(json_agg(t order by t.prodi), '[]'::json) from (
+        select prodi,
+               count(nilai_akhir) as count,
+               avg(nilai_akhir) as mean,
+               min(nilai_akhir) as min,
+               max(nilai_akhir) as max,
+               stddev_samp(nilai_akhir) as std
+        from data where prodi is not null
+        group by prodi
+      ) t
+    ),
+
+    'per_semester', (
+      select coalesce(json_agg(t order by t.semester), '[]'::json) from (
+        select semester, avg(nilai_akhir) as mean
+        from data where semester is not null
+        group by semester
+      ) t
+    ),
+
+    'matriks', (
+      select coalesce(json_agg(t), '[]'::json) from (
+        select prodi, semester, avg(nilai_akhir) as mean
+        from data
+        where prodi is not null and semester is not null and nilai_akhir is not null
+        group by prodi, semester
+      ) t
+    ),
+
+    'distribusi_huruf', (
+      select coalesce(json_agg(t), '[]'::json) from (
+        select nilai_huruf, count(*) as count
+        from data where nilai_huruf is not null
+        group by nilai_huruf
+      ) t
+    ),
+
+    'distribusi_predikat', (
+      select coalesce(json_agg(t), '[]'::json) from (
+        select predikat, count(*) as count
+        from data where predikat is not null
+        group by predikat
+      ) t
+    ),
+
+    'deskriptif', (
+      select json_build_object(
+        'count', count(nilai_akhir),
+        'mean', avg(nilai_akhir),
+        'std', stddev_samp(nilai_akhir),
+        'min', min(nilai_akhir),
+        '25%', percentile_cont(0.25) within group (order by nilai_akhir),
+        '50%', percentile_cont(0.50) within group (order by nilai_akhir),
+        '75%', percentile_cont(0.75) within group (order by nilai_akhir),
+        'max', max(nilai_akhir)
+      ) from data
+    ),
+
+    -- 20 bin lebar sama antara min dan max, bin terakhir inklusif
+    'histogram', (
+      select json_build_object(
+        'min', r.lo,
+        'max', r.hi,
+        'bin', coalesce((
+          select json_agg(b) from (
+            select case when r.hi > r.lo
+                        then least(floor(((d.nilai_akhir - r.lo) * 20) / (r.hi - r.lo))::int, 19)
+                        else 0 end as bin,
+                   count(*) as count
+            from data d where d.nilai_akhir is not null
+            group by 1
+          ) b
+        ), '[]'::json)
+      ) from ringkas r
+    )
+  );
+$$;
+
+grant execute on function public.statistik_nilai() to anon, authenticated;
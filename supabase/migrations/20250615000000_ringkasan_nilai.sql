@@ -0,0 +1,30 @@
+-- Ringkasan metrik atas halaman REKAPITULASI NILAI, dengan filter opsional.
+-- Parameter null berarti tanpa filter pada kolom tersebut.
+create or replace function public.ringkasan_nilai(
+  p_prodi text[] default null,
+  p_semester int[] default null,
+  p_predikat text[] default null
+)
+returns json
+language sql
+stable
+as $$
+  select json_build_object(
+    'jumlah', count(*),
+    'rata_rata', avg(nilai_akhir::float8),
+    'maks', max(nilai_akhir::float8),
+    'min', min(nilai_akhir::float8)
+  )
+  from public.nilai_mahasiswa
+  where (p_prodi is null or prodi = any(p_prodi))
+    and (p_semester is null or semester = any(p_semester))
+    and (p_predikat is null or predikat = any(p_predikat));
+$$;
+
+grant execute on function public.ringkasan_nilai(text[], int[], text[]) to anon, authenticated;
+
+-- Filter in_ dan paginasi halaman REKAPITULASI
+create index if not exists nilai_mahasiswa_prodi_semester_idx
+  on public.nilai_mahasiswa (prodi, semester, id);
+create index if not exists nilai_mahasiswa_predikat_idx
+  on public.nilai_mahasiswa (predikat, id);
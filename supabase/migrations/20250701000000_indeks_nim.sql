@@ -0,0 +1,13 @@
+-- Cek duplikat NIM + semester saat input (sengaja tidak unique: data lama yang
+-- terlanjur ganda dan baris di antrian tulis tidak boleh gagal tersimpan).
+create index if not exists nilai_mahasiswa_nim_semester_idx
+  on public.nilai_mahasiswa (nim, semester);
+
+-- Pencarian awalan NIM (like '2021%') tanpa bergantung pada collation database
+create index if not exists nilai_mahasiswa_nim_pola_idx
+  on public.nilai_mahasiswa (nim text_pattern_ops);
+
+-- Pencarian awalan nama tanpa membedakan huruf besar/kecil (ilike 'budi%')
+create extension if not exists pg_trgm;
+create index if not exists nilai_mahasiswa_nama_trgm_idx
+  on public.nilai_mahasiswa using gin (nama gin_trgm_ops);
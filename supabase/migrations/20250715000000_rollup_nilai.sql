@@ -0,0 +1,100 @@
+-- Rollup harian nilai_akhir per (tanggal input, prodi, semester) untuk tab Tren Historis.
+-- Dipelihara trigger per baris sehingga tren lintas tahun akademik dibaca dari tabel kecil
+-- ini, bukan dengan memindai nilai_mahasiswa. Baris dengan jumlah 0 (semua datanya
+-- dihapus) dibiarkan dan disaring saat dibaca.
+create table if not exists public.rollup_nilai_harian (
+  tanggal date not null,
+  prodi text not null,
+  semester int not null,
+  jumlah bigint not null default 0,
+  total_nilai float8 not null default 0,
+  total_kuadrat float8 not null default 0,
+  jumlah_a bigint not null default 0,
+  jumlah_b bigint not null default 0,
+  jumlah_c bigint not null default 0,
+  jumlah_d bigint not null default 0,
+  jumlah_e bigint not null default 0,
+  primary key (tanggal, prodi, semester)
+);
+
+grant select on public.rollup_nilai_harian to anon, authenticated;
+
+-- Tambah (p_arah = 1) atau kurangi (p_arah = -1) satu baris nilai pada rollup
+create or replace function public.rollup_nilai_ubah(
+  p_tanggal date, p_prodi text, p_semester int,
+  p_nilai float8, p_huruf text, p_arah int
+)
+returns void
+language sql
+security definer
+set search_path = public
+as $$
+  insert into public.rollup_nilai_harian as r
+    (tanggal, prodi, semester, jumlah, total_nilai, total_kuadrat,
+     jumlah_a, jumlah_b, jumlah_c, jumlah_d, jumlah_e)
+  values (p_tanggal, p_prodi, p_semester, p_arah, p_arah * p_nilai, p_arah * p_nilai * p_nilai,
+          p_arah * (p_huruf = 'A')::int, p_arah * (p_huruf = 'B')::int,
+          p_arah * (p_huruf = 'C')::int, p_arah * (p_huruf = 'D')::int,
+          p_arah * (p_huruf = 'E')::int)
+  on conflict (tanggal, prodi, semester) do update set
+    jumlah = r.jumlah + excluded.jumlah,
+    total_nilai = r.total_nilai + excluded.total_nilai,
+    total_kuadrat = r.total_kuadrat + excluded.total_kuadrat,
+    jumlah_a = r.jumlah_a + excluded.jumlah_a,
+    jumlah_b = r.jumlah_b + excluded.jumlah_b,
+    jumlah_c = r.jumlah_c + excluded.jumlah_c,
+    jumlah_d = r.jumlah_d + excluded.jumlah_d,
+    jumlah_e = r.jumlah_e + excluded.jumlah_e;
+$$;
+
+create or replace function public.rollup_nilai_trigger()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  if tg_op in ('DELETE', 'UPDATE') and old.tanggal_input is not null and old.prodi is not null
+     and old.semester is not null and old.nilai_akhir is not null then
+    perform public.rollup_nilai_ubah(old.tanggal_input::date, old.prodi, old.semester,
+                                     old.nilai_akhir::float8, coalesce(old.nilai_huruf, ''), -1);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') and new.tanggal_input is not null and new.prodi is not null
+     and new.semester is not null and new.nilai_akhir is not null then
+    perform public.rollup_nilai_ubah(new.tanggal_input::date, new.prodi, new.semester,
+                                     new.nilai_akhir::float8, coalesce(new.nilai_huruf, ''), 1);
+  end if;
+  return null;
+end;
+$$;
+
+-- Kedua fungsi security definer hanya untuk trigger: Supabase memberi EXECUTE fungsi baru di
+-- schema public ke anon/authenticated, sehingga tanpa revoke klien bisa menulis angka apa pun
+-- ke rollup lewat /rpc. Trigger tetap berjalan karena dipanggil sebagai pemilik fungsi.
+revoke execute on function public.rollup_nilai_ubah(date, text, int, float8, text, int)
+  from public, anon, authenticated;
+revoke execute on function public.rollup_nilai_trigger() from public, anon, authenticated;
+
+-- Trigger dipasang dan rollup diisi ulang di bawah lock agar tidak ada penulisan yang
+-- terlewat atau terhitung dua kali di antara keduanya
+lock table public.nilai_mahasiswa in share row exclusive mode;
+
+drop trigger if exists rollup_nilai_harian_trigger on public.nilai_mahasiswa;
+create trigger rollup_nilai_harian_trigger
+  after insert or delete or update of tanggal_input, prodi, semester, nilai_akhir, nilai_huruf
+  on public.nilai_mahasiswa
+  for each row execute function public.rollup_nilai_trigger();
+
+truncate public.rollup_nilai_harian;
+insert into public.rollup_nilai_harian
+  (tanggal, prodi, semester, jumlah, total_nilai, total_kuadrat,
+   jumlah_a, jumlah_b, jumlah_c, jumlah_d, jumlah_e)
+select tanggal_input::date, prodi, semester, count(*),
+       sum(nilai_akhir::float8), sum(nilai_akhir::float8 * nilai_akhir::float8),
+       count(*) filter (where nilai_huruf = 'A'), count(*) filter (where nilai_huruf = 'B'),
+       count(*) filter (where nilai_huruf = 'C'), count(*) filter (where nilai_huruf = 'D'),
+       count(*) filter (where nilai_huruf = 'E')
+from public.nilai_mahasiswa
+where tanggal_input is not null and prodi is not null
+  and semester is not null and nilai_akhir is not null
+group by 1, 2, 3;
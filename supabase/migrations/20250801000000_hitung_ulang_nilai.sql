@@ -0,0 +1,30 @@
+-- Tulis hasil hitung_ulang.py: hanya kolom turunan (nilai_akhir, nilai_huruf, predikat)
+-- yang diperbarui, per id, dalam satu request per batch. Baris yang dihapus selama job
+-- berjalan tidak disisipkan kembali, dan baris yang kolom inputnya (prodi, semester,
+-- nilai_tugas/uts/uas) diubah sesudah dibaca job dilewati agar tidak ditimpa nilai lama.
+create or replace function public.hitung_ulang_nilai(p_baris json)
+returns int
+language sql
+as $$
+  with diubah as (
+    update public.nilai_mahasiswa t set
+      nilai_akhir = b.nilai_akhir,
+      nilai_huruf = b.nilai_huruf,
+      predikat = b.predikat
+    from json_to_recordset(p_baris) as b(
+      id bigint, prodi text, semester float8,
+      nilai_tugas float8, nilai_uts float8, nilai_uas float8,
+      nilai_akhir float8, nilai_huruf text, predikat text
+    )
+    where t.id = b.id
+      and t.prodi is not distinct from b.prodi
+      and t.semester::float8 is not distinct from b.semester
+      and t.nilai_tugas::float8 is not distinct from b.nilai_tugas
+      and t.nilai_uts::float8 is not distinct from b.nilai_uts
+      and t.nilai_uas::float8 is not distinct from b.nilai_uas
+    returning 1
+  )
+  select count(*)::int from diubah;
+$$;
+
+grant execute on function public.hitung_ulang_nilai(json) to anon, authenticated;
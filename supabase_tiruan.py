@@ -0,0 +1,309 @@
+"""
+Tiruan lokal client Supabase untuk benchmark dan pengujian beban
+Mendukung subset query builder postgrest yang dipakai aplikasi (select/insert/upsert/update/
+delete, filter eq/gt/gte/lt/lte/in_, order, limit, range, count, csv) serta RPC statistik_nilai,
+ringkasan_nilai dan hitung_ulang_nilai. Tabel rollup_nilai_harian dipasang dengan trigger SQLite saat
+pertama diakses, seperti migrasinya di Postgres. Data disimpan di SQLite (default di memori); latensi jaringan bisa
+disimulasikan per request.
+"""
+
+import csv
+import io
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional
+
+import pandas as pd
+from postgrest.types import ReturnMethod
+
+from data_nilai import KOLOM_SEMUA, TABEL_NILAI, buat_tabel_sqlite
+from hitung_ulang import KOLOM_INPUT, KOLOM_TURUNAN, RPC_HITUNG_ULANG
+from penyimpanan import klausa_filter
+from rollup_nilai import KOLOM_ROLLUP, TABEL_ROLLUP, pasang_rollup_sqlite
+from statistik import RPC_RINGKASAN, RPC_STATISTIK, json_statistik_sqlite
+
+KOLOM_TABEL = {TABEL_NILAI: KOLOM_SEMUA, TABEL_ROLLUP: KOLOM_ROLLUP}
+
+
+@dataclass
+class ResponsTiruan:
+    data: Any
+    count: Optional[int] = None
+
+
+class _Query:
+    """
+    Query builder satu tabel; filter dikumpulkan sebagai klausa WHERE SQLite
+    """
+
+    def __init__(self, client: "SupabaseTiruan", tabel: str):
+        self.client = client
+        self.tabel = tabel
+        self.operasi = "select"
+        self.kolom = "*"
+        self.hitung = False
+        self.head = False
+        self.format_csv = False
+        self.minimal = False
+        self.muatan: List[dict] = []
+        self.kolom_konflik: Optional[str] = None
+        self.where: List[str] = []
+        self.params: list = []
+        self.urut: List[str] = []
+        self.batas: Optional[int] = None
+        self.geser = 0
+
+    def _kolom_valid(self, kolom: str) -> str:
+        if kolom not in KOLOM_TABEL[self.tabel]:
+            raise ValueError(f"Kolom tidak dikenal: {kolom}")
+        return kolom
+
+    # ==================== OPERASI ====================
+    def select(self, *kolom: str, count: Optional[str] = None, head: Optional[bool] = None):
+        daftar = [k.strip() for bagian in kolom for k in bagian.split(",") if k.strip()]
+        self.kolom = ",".join(self._kolom_valid(k) for k in daftar) if daftar != ["*"] else "*"
+        self.hitung = count is not None
+        self.head = bool(head)
+        return self
+
+    def insert(self, data, returning: ReturnMethod = ReturnMethod.representation, **_):
+        self.operasi = "insert"
+        self.muatan = data if isinstance(data, list) else [data]
+        self.minimal = returning == ReturnMethod.minimal
+        return self
+
+    def upsert(self, data, on_conflict: str = "id",
+               returning: ReturnMethod = ReturnMethod.representation, **_):
+        self.insert(data, returning)
+        self.operasi = "upsert"
+        self.kolom_konflik = self._kolom_valid(on_conflict or "id")
+        return self
+
+    def update(self, data: dict, returning: ReturnMethod = ReturnMethod.representation, **_):
+        self.operasi = "update"
+        self.muatan = [{self._kolom_valid(k): v for k, v in data.items()}]
+        self.minimal = returning == ReturnMethod.minimal
+        return self
+
+    def delete(self, count: Optional[str] = None,
+               returning: ReturnMethod = ReturnMethod.representation, **_):
+        self.operasi = "delete"
+        self.hitung = count is not None
+        self.minimal = returning == ReturnMethod.minimal
+        return self
+
+    # ==================== FILTER ====================
+    def _banding(self, kolom: str, operator: str, nilai):
+        self.where.append(f"{self._kolom_valid(kolom)} {operator} ?")
+        self.params.append(nilai)
+        return self
+
+    def eq(self, kolom: str, nilai):
+        return self._banding(kolom, "=", nilai)
+
+    def gt(self, kolom: str, nilai):
+        return self._banding(kolom, ">", nilai)
+
+    def gte(self, kolom: str, nilai):
+        return self._banding(kolom, ">=", nilai)
+
+    def lt(self, kolom: str, nilai):
+        return self._banding(kolom, "<", nilai)
+
+    def lte(self, kolom: str, nilai):
+        return self._banding(kolom, "<=", nilai)
+
+    def in_(self, kolom: str, nilai):
+        where, params = klausa_filter({self._kolom_valid(kolom): list(nilai)})
+        self.where.append(where[len(" WHERE "):])
+        self.params.extend(params)
+        return self
+
+    def order(self, kolom: str, desc: bool = False):
+        self.urut.append(f"{self._kolom_valid(kolom)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, jumlah: int):
+        self.batas = jumlah
+        return self
+
+    def range(self, awal: int, akhir: int):
+        self.geser = awal
+        self.batas = akhir - awal + 1
+        return self
+
+    def csv(self):
+        self.format_csv = True
+        return self
+
+    # ==================== EKSEKUSI ====================
+    def _klausa(self) -> str:
+        return " WHERE " + " AND ".join(self.where) if self.where else ""
+
+    def execute(self) -> ResponsTiruan:
+        self.client._request()
+        with self.client._lock:
+            if self.operasi == "select":
+                return self._select()
+            if self.operasi == "delete":
+                return self._delete()
+            if self.operasi == "update":
+                return self._update()
+            return self._tulis()
+
+    def _select(self) -> ResponsTiruan:
+        conn = self.client.conn
+        where = self._klausa()
+        jumlah = (conn.execute(f"SELECT COUNT(*) FROM {self.tabel}{where}", self.params)
+                  .fetchone()[0] if self.hitung else None)
+        if self.head:
+            return ResponsTiruan([], jumlah)
+
+        sql = f"SELECT {self.kolom} FROM {self.tabel}{where}"
+        if self.urut:
+            sql += f" ORDER BY {', '.join(self.urut)}"
+        if self.batas is not None or self.geser:
+            sql += f" LIMIT {-1 if self.batas is None else int(self.batas)} OFFSET {int(self.geser)}"
+        kursor = conn.execute(sql, self.params)
+        kolom = [c[0] for c in kursor.description]
+        baris = kursor.fetchall()
+
+        if self.format_csv:
+            teks = io.StringIO()
+            penulis = csv.writer(teks, lineterminator="\n")
+            penulis.writerow(kolom)
+            penulis.writerows(["" if v is None else v for v in b] for b in baris)
+            return ResponsTiruan(teks.getvalue(), jumlah)
+        return ResponsTiruan([dict(zip(kolom, b)) for b in baris], jumlah)
+
+    def _delete(self) -> ResponsTiruan:
+        conn = self.client.conn
+        where = self._klausa()
+        dihapus = []
+        if not self.minimal:
+            kursor = conn.execute(f"SELECT * FROM {self.tabel}{where}", self.params)
+            kolom = [c[0] for c in kursor.description]
+            dihapus = [dict(zip(kolom, b)) for b in kursor.fetchall()]
+        jumlah = conn.execute(f"DELETE FROM {self.tabel}{where}", self.params).rowcount
+        conn.commit()
+        return ResponsTiruan(dihapus, jumlah if self.hitung else None)
+
+    def _update(self) -> ResponsTiruan:
+        conn = self.client.conn
+        where = self._klausa()
+        id_data = [i for (i,) in conn.execute(f"SELECT id FROM {self.tabel}{where}", self.params)]
+        data = self.muatan[0]
+        conn.executemany(f"UPDATE {self.tabel} SET {','.join(f'{k} = ?' for k in data)} "
+                         f"WHERE id = ?", [list(data.values()) + [i] for i in id_data])
+        conn.commit()
+        if self.minimal:
+            return ResponsTiruan([])
+        where, params = klausa_filter({"id": id_data})
+        kursor = conn.execute(f"SELECT * FROM {self.tabel}{where}", params)
+        kolom = [c[0] for c in kursor.description]
+        return ResponsTiruan([dict(zip(kolom, b)) for b in kursor.fetchall()])
+
+    def _tulis(self) -> ResponsTiruan:
+        conn = self.client.conn
+        hasil = []
+        sekarang = datetime.now().isoformat()
+        for baris in self.muatan:
+            baris = {self._kolom_valid(k): v for k, v in baris.items()}
+            baris.setdefault("tanggal_input", sekarang)
+            kolom = list(baris)
+            sql = (f"INSERT INTO {self.tabel} ({','.join(kolom)}) "
+                   f"VALUES ({','.join('?' * len(kolom))})")
+            if self.operasi == "upsert":
+                perbarui = [k for k in kolom if k != self.kolom_konflik]
+                sql += (f" ON CONFLICT({self.kolom_konflik}) DO UPDATE SET "
+                        + ",".join(f"{k}=excluded.{k}" for k in perbarui))
+            kursor = conn.execute(sql, list(baris.values()))
+            if not self.minimal:
+                hasil.append({**baris, "id": baris.get("id", kursor.lastrowid)})
+        conn.commit()
+        return ResponsTiruan(hasil)
+
+
+class _Rpc:
+    def __init__(self, client: "SupabaseTiruan", nama: str, params: Optional[dict]):
+        self.client = client
+        self.nama = nama
+        self.params = params or {}
+
+    def execute(self) -> ResponsTiruan:
+        self.client._request()
+        with self.client._lock:
+            if self.nama == RPC_STATISTIK:
+                return ResponsTiruan(json_statistik_sqlite(self.client.conn, TABEL_NILAI))
+            if self.nama == RPC_RINGKASAN:
+                where, params = klausa_filter({
+                    "prodi": self.params.get("p_prodi"),
+                    "semester": self.params.get("p_semester"),
+                    "predikat": self.params.get("p_predikat"),
+                })
+                jumlah, rata_rata, maks, minimum = self.client.conn.execute(
+                    f"SELECT COUNT(*), AVG(nilai_akhir), MAX(nilai_akhir), MIN(nilai_akhir) "
+                    f"FROM {TABEL_NILAI}{where}", params).fetchone()
+                return ResponsTiruan({"jumlah": jumlah, "rata_rata": rata_rata,
+                                      "maks": maks, "min": minimum})
+            if self.nama == RPC_HITUNG_ULANG:
+                # Seperti migrasinya: hanya kolom turunan, dan hanya jika kolom input belum berubah
+                kursor = self.client.conn.executemany(
+                    f"UPDATE {TABEL_NILAI} SET "
+                    f"{','.join(f'{k} = ?' for k in KOLOM_TURUNAN)} WHERE id = ? AND "
+                    f"{' AND '.join(f'{k} IS ?' for k in KOLOM_INPUT)}",
+                    [[b.get(k) for k in KOLOM_TURUNAN + ["id"] + KOLOM_INPUT]
+                     for b in self.params.get("p_baris") or []])
+                self.client.conn.commit()
+                return ResponsTiruan(kursor.rowcount)
+        raise RuntimeError(f"RPC {self.nama} tidak tersedia di tiruan")
+
+
+class SupabaseTiruan:
+    """
+    Pengganti supabase.Client berbasis SQLite. Satu koneksi dipakai bersama (terkunci),
+    latensi (detik) ditambahkan ke setiap request untuk meniru round trip jaringan.
+    """
+
+    def __init__(self, berkas: str = ":memory:", latensi: float = 0.0):
+        self.latensi = latensi
+        self.conn = sqlite3.connect(berkas, check_same_thread=False)
+        buat_tabel_sqlite(self.conn)
+        self._lock = threading.Lock()
+        self.jumlah_request = 0
+        self.rollup_terpasang = False
+
+    def _request(self) -> None:
+        self.jumlah_request += 1
+        if self.latensi:
+            time.sleep(self.latensi)
+
+    def table(self, nama: str) -> _Query:
+        if nama not in KOLOM_TABEL:
+            raise ValueError(f"Tabel tidak dikenal: {nama}")
+        if nama == TABEL_ROLLUP and not self.rollup_terpasang:
+            with self._lock:
+                pasang_rollup_sqlite(self.conn)
+                self.rollup_terpasang = True
+        return _Query(self, nama)
+
+    def rpc(self, nama: str, params: Optional[dict] = None) -> _Rpc:
+        return _Rpc(self, nama, params)
+
+    def muat(self, df: pd.DataFrame) -> int:
+        """
+        Isi tabel langsung dari DataFrame (tanpa latensi request), untuk menyiapkan data uji
+        Returns: jumlah baris
+        """
+        kolom = [k for k in KOLOM_SEMUA if k in df.columns]
+        nilai = df[kolom].astype(object).where(df[kolom].notna(), None)
+        with self._lock:
+            self.conn.executemany(
+                f"INSERT INTO {TABEL_NILAI} ({','.join(kolom)}) "
+                f"VALUES ({','.join('?' * len(kolom))})",
+                nilai.itertuples(index=False, name=None))
+            self.conn.commit()
+        return len(df)
@@ -0,0 +1,8 @@
+"""
+Modul aplikasi berada di akar repositori; pytest dijalankan dari akar maupun dari tests/
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
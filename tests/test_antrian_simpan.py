@@ -0,0 +1,58 @@
+"""
+Penggolongan galat antrian simpan dan pemindahan baris yang ditolak ke antrian_gagal
+"""
+
+import pytest
+from postgrest.exceptions import APIError
+
+from antrian_simpan import AntrianSimpan, galat_permanen
+from supabase_tiruan import SupabaseTiruan
+
+
+@pytest.mark.parametrize("kode, permanen", [
+    ("23505", True), ("22P02", True), ("42703", True), ("42501", True),
+    ("PGRST204", True), ("PGRST301", True), (401, True), (403, True), (413, True),
+    ("PGRST000", False), ("PGRST003", False), (408, False), (429, False),
+    (502, False), ("40001", False), ("57014", False), (None, False),
+])
+def test_galat_permanen(kode, permanen):
+    assert galat_permanen(APIError({"code": kode, "message": "galat"})) is permanen
+
+
+def test_galat_jaringan_sementara():
+    assert not galat_permanen(TimeoutError("timeout"))
+    assert not galat_permanen(ConnectionError("putus"))
+
+
+def test_kolom_tidak_dikenal_dipindah_ke_antrian_gagal(tmp_path):
+    class ClientKolomSalah:
+        """
+        Menolak baris dengan kolom tak dikenal seperti PostgREST (PGRST204)
+        """
+
+        def __init__(self):
+            self.server = SupabaseTiruan()
+
+        def table(self, nama):
+            client = self
+
+            class Query:
+                def insert(self, baris):
+                    self.baris = baris
+                    return self
+
+                def execute(self):
+                    if any("kolom_salah" in b for b in self.baris):
+                        raise APIError({"code": "PGRST204", "message": "kolom_salah tidak ada"})
+                    return client.server.table(nama).insert(self.baris).execute()
+
+            return Query()
+
+    antrian = AntrianSimpan(ClientKolomSalah(), str(tmp_path / "antrian.db"))
+    antrian.tambah({"nim": "1", "nama": "A"})
+    antrian.tambah({"nim": "2", "nama": "B", "kolom_salah": 1})
+    antrian.tambah({"nim": "3", "nama": "C"})
+
+    assert antrian.kirim_batch() == 3
+    assert antrian.kedalaman() == 0
+    assert [b["nim"] for b in antrian.daftar_gagal()] == ["2"]
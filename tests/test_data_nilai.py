@@ -0,0 +1,18 @@
+"""
+Hapus batch lewat data_nilai terhadap Supabase tiruan
+"""
+
+from benchmark import data_sintetis
+from data_nilai import TABEL_NILAI, hapus_id
+from supabase_tiruan import SupabaseTiruan
+
+
+def test_hapus_id_mengembalikan_jumlah_terhapus():
+    client = SupabaseTiruan()
+    client.muat(data_sintetis(200))
+    # Rentang panjang (satu delete gte/lte), id lepas (delete in_) dan id yang tidak ada
+    id_data = list(range(1, 81)) + [100, 150, 150, 999, 1000]
+    assert hapus_id(client, id_data, ukuran_batch=2) == 82
+    assert hapus_id(client, [100, 999]) == 0
+    sisa = client.conn.execute(f"SELECT COUNT(*) FROM {TABEL_NILAI}").fetchone()[0]
+    assert sisa == 118
@@ -0,0 +1,81 @@
+"""
+Pemuatan skema penilaian dari TOML: validasi prodi/semester dan lokasi berkas bawaan
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from impor_nilai import validasi
+from penilaian import BERKAS_SKEMA, DAFTAR_PRODI, RegistriSkema, muat_registri
+
+
+def tulis_skema(tmp_path, isi):
+    berkas = tmp_path / "skema.toml"
+    berkas.write_text(isi, encoding="utf-8")
+    return str(berkas)
+
+
+def test_prodi_salah_ketik_ditolak(tmp_path):
+    berkas = tulis_skema(tmp_path, """
+[[skema]]
+nama = "TI akhir"
+prodi = ["Tl"]
+bobot = { tugas = 0.2, uts = 0.3, uas = 0.5 }
+""")
+    with pytest.raises(ValueError, match="Tl"):
+        muat_registri(berkas)
+
+
+def test_semester_di_luar_daftar_ditolak():
+    with pytest.raises(ValueError, match="semester"):
+        RegistriSkema([{"nama": "pendek", "prodi": "TI", "semester": [9]}])
+
+
+def test_skema_berlaku_untuk_prodi_dan_semester(tmp_path):
+    berkas = tulis_skema(tmp_path, """
+[[skema]]
+nama = "TI akhir"
+prodi = ["TI"]
+semester = [7, 8]
+bobot = { tugas = 0.2, uts = 0.3, uas = 0.5 }
+""")
+    registri = muat_registri(berkas)
+    assert registri.skema_untuk("TI", 8).nama == "TI akhir"
+    assert registri.skema_untuk("SI", 8).nama == "default"
+
+
+def test_berkas_eksplisit_wajib_ada(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        muat_registri(str(tmp_path / "tidak_ada.toml"))
+
+
+def test_berkas_bawaan_tidak_bergantung_direktori_kerja(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert os.path.isabs(BERKAS_SKEMA)
+    assert os.path.exists(BERKAS_SKEMA)
+    assert muat_registri().sidik() == muat_registri(BERKAS_SKEMA).sidik()
+
+
+def test_daftar_prodi_dari_konfigurasi(tmp_path):
+    berkas = tulis_skema(tmp_path, """
+prodi = ["SI", "TI", "Teknosi", "DS"]
+
+[[skema]]
+nama = "DS"
+prodi = ["DS"]
+bobot = { tugas = 0.2, uts = 0.3, uas = 0.5 }
+""")
+    registri = muat_registri(berkas)
+    assert registri.daftar_prodi == DAFTAR_PRODI + ["DS"]
+    assert registri.skema_untuk("DS", 3).nama == "DS"
+    assert registri.skema_untuk("TI", 3).nama == "default"
+    assert registri.sidik() != RegistriSkema().sidik()
+
+    df = pd.DataFrame({"nama": ["A", "B"], "nim": ["1", "2"], "prodi": ["DS", "MI"],
+                       "semester": [3, 3], "nilai_tugas": [80, 80], "nilai_uts": [80, 80],
+                       "nilai_uas": [80, 80]})
+    valid, kesalahan = validasi(df, daftar_prodi=registri.daftar_prodi)
+    assert valid["prodi"].tolist() == ["DS"]
+    assert [k["alasan"] for k in kesalahan] == ["Program studi tidak valid"]
@@ -0,0 +1,177 @@
+"""
+Sinkronisasi PenyimpananLokal dengan Supabase tiruan (tanpa jaringan): simpan/ubah/hapus
+tertunda, penulis lain di sela sinkronisasi, dan kirim ulang setelah timeout sesudah commit
+"""
+
+import pytest
+
+from data_nilai import TABEL_NILAI
+from penyimpanan import PenyimpananLokal
+from supabase_tiruan import SupabaseTiruan
+
+
+def baris(nim: str, detik: int = 0, nilai: float = 80.0) -> dict:
+    return {"nama": f"Mahasiswa {nim}", "nim": nim, "prodi": "SI", "semester": 1,
+            "nilai_tugas": nilai, "nilai_uts": nilai, "nilai_uas": nilai,
+            "nilai_akhir": nilai, "nilai_huruf": "B", "predikat": "Baik",
+            "tanggal_input": f"2025-03-01T08:00:{detik:02d}.123456"}
+
+
+def isi_server(server: SupabaseTiruan, nim: list) -> None:
+    server.table(TABEL_NILAI).insert([baris(n, i) for i, n in enumerate(nim)]).execute()
+
+
+def data_server(server: SupabaseTiruan) -> dict:
+    return {i: (nim, nilai) for i, nim, nilai in server.conn.execute(
+        f"SELECT id, nim, nilai_akhir FROM {TABEL_NILAI}")}
+
+
+def data_lokal(lokal: PenyimpananLokal) -> dict:
+    df = lokal.ambil(["id", "nim", "nilai_akhir"])
+    return {int(i): (nim, float(nilai)) for i, nim, nilai in df.itertuples(index=False)}
+
+
+class _KirimTerputus:
+    """
+    Query insert yang sampai ke server lalu gagal sebelum jawabannya diterima
+    """
+
+    def __init__(self, query):
+        self.query = query
+
+    def insert(self, *args, **kwargs):
+        self.query.insert(*args, **kwargs)
+        return self
+
+    def execute(self):
+        self.query.execute()
+        raise TimeoutError("timeout membaca respons")
+
+
+class ClientTerputus:
+    """
+    Client yang memutus insert pertama sesudah server commit
+    """
+
+    def __init__(self, server: SupabaseTiruan, putus: int = 1):
+        self.server = server
+        self.putus = putus
+
+    def table(self, nama: str):
+        query = self.server.table(nama)
+        if self.putus:
+            self.putus -= 1
+            return _KirimTerputus(query)
+        return query
+
+    def rpc(self, nama: str, params=None):
+        return self.server.rpc(nama, params)
+
+
+@pytest.fixture
+def server() -> SupabaseTiruan:
+    return SupabaseTiruan()
+
+
+@pytest.fixture
+def buat_lokal(tmp_path):
+    dibuat = []
+
+    def buat(client) -> PenyimpananLokal:
+        lokal = PenyimpananLokal(str(tmp_path / "nilai_lokal.db"), client, ukuran_halaman=2)
+        dibuat.append(lokal)
+        return lokal
+
+    yield buat
+    for lokal in dibuat:
+        lokal.hentikan()
+
+
+def test_simpan_ubah_hapus_tertunda_sampai_ke_server(server, buat_lokal):
+    isi_server(server, ["A", "B", "C"])
+    lokal = buat_lokal(server)
+    lokal.sinkronkan(penuh=True)
+    assert data_lokal(lokal) == data_server(server)
+
+    disimpan = lokal.simpan([baris("D", 10), baris("E", 11)])
+    assert all(b["id"] < 0 for b in disimpan)
+    assert lokal.perbarui(1, {**baris("A"), "nilai_akhir": 95.0})
+    assert lokal.hapus([2]) == 1
+    assert lokal.status()["tertunda_simpan"] == 2
+
+    hasil = lokal.sinkronkan()
+    assert hasil["dikirim"] == 3 and hasil["dihapus"] == 1
+    server_sekarang = data_server(server)
+    assert server_sekarang[1] == ("A", 95.0)
+    assert 2 not in server_sekarang
+    assert sorted(nim for nim, _ in server_sekarang.values()) == ["A", "C", "D", "E"]
+    assert data_lokal(lokal) == server_sekarang
+    status = lokal.status()
+    assert (status["tertunda_simpan"], status["tertunda_ubah"], status["tertunda_hapus"]) == (0, 0, 0)
+
+
+def test_hapus_banyak_id_per_batch(server, buat_lokal):
+    isi_server(server, [str(i) for i in range(7)])
+    lokal = buat_lokal(server)
+    lokal.sinkronkan(penuh=True)
+    lokal.simpan([baris("X", 30)])
+
+    # ukuran_halaman 2: satu DELETE ... IN per dua id; id yang tidak dikenal diabaikan
+    assert lokal.hapus(lokal.cari_id() + [999]) == 8
+    assert lokal.hitung() == 0
+    lokal.sinkronkan()
+    assert data_server(server) == {}
+
+
+def test_perubahan_server_tertarik(server, buat_lokal):
+    isi_server(server, ["A", "B", "C"])
+    lokal = buat_lokal(server)
+    lokal.sinkronkan(penuh=True)
+
+    server.table(TABEL_NILAI).delete().in_("id", [3]).execute()
+    isi_server(server, ["F"])
+    hasil = lokal.sinkronkan()
+    assert (hasil["ditarik"], hasil["dibuang"]) == (1, 1)
+    assert data_lokal(lokal) == data_server(server)
+
+
+def test_baris_penulis_lain_sebelum_kiriman_sendiri_tetap_tertarik(server, buat_lokal):
+    isi_server(server, ["A", "B"])
+    lokal = buat_lokal(server)
+    lokal.sinkronkan(penuh=True)
+
+    # Penulis lain mendapat id 3, kiriman lokal sesudahnya id 4
+    isi_server(server, ["C"])
+    lokal.simpan([baris("D", 10)])
+    lokal.sinkronkan()
+    assert sorted(data_lokal(lokal)) == [1, 2, 3, 4]
+    assert data_lokal(lokal) == data_server(server)
+
+
+def test_kirim_ulang_setelah_timeout_tidak_menggandakan(server, buat_lokal):
+    lokal = buat_lokal(ClientTerputus(server))
+    lokal.simpan([baris("A", 1), baris("B", 2), baris("C", 3)])
+
+    with pytest.raises(TimeoutError):
+        lokal.sinkronkan()
+    # Halaman pertama sudah tersimpan di server walaupun jawabannya hilang
+    assert len(data_server(server)) == 2
+
+    hasil = lokal.sinkronkan()
+    assert hasil["dikirim"] == 3
+    assert sorted(nim for nim, _ in data_server(server).values()) == ["A", "B", "C"]
+    assert data_lokal(lokal) == data_server(server)
+    assert lokal.status()["tertunda_simpan"] == 0
+
+
+def test_sisa_tertunda_proses_lama_dicocokkan(server, buat_lokal):
+    lokal = buat_lokal(ClientTerputus(server))
+    lokal.simpan([baris("A", 1)])
+    with pytest.raises(TimeoutError):
+        lokal.sinkronkan()
+
+    # Proses dimulai ulang dengan berkas yang sama
+    lokal = buat_lokal(server)
+    lokal.sinkronkan()
+    assert [nim for nim, _ in data_server(server).values()] == ["A"]
+    assert data_lokal(lokal) == data_server(server)
@@ -0,0 +1,95 @@
+"""
+Agregasi STATISTIK NILAI dari semua sumber harus sama dengan hasil pandas atas data penuh:
+RPC statistik_nilai/ringkasan_nilai (Supabase tiruan berbasis SQLite), snapshot ringkas
+(CSV -> kategori/float32) dan agregat berjalan
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import data_sintetis
+from data_nilai import KOLOM_STATISTIK, ambil_data
+from statistik import (ringkasan_dari_dataframe, ringkasan_dari_server,
+                       statistik_dari_dataframe, statistik_dari_server)
+from statistik_berjalan import StatistikBerjalan
+from supabase_tiruan import SupabaseTiruan
+
+JUMLAH_BARIS = 2_000
+SEED = 7
+
+# Sumber menjumlahkan dengan urutan berbeda (SQLite, pandas, Welford); nilai, hitungan dan
+# batas histogram harus sama, rata-rata/std boleh berbeda di digit pembulatan float64
+TOLERANSI = {"rtol": 1e-9, "atol": 1e-9}
+
+
+@pytest.fixture(scope="module")
+def sumber() -> pd.DataFrame:
+    """
+    Data tetap ditambah satu baris tanpa nilai (dikecualikan dari agregat nilai_akhir)
+    """
+    df = data_sintetis(JUMLAH_BARIS, SEED)
+    kosong = {**df.iloc[0].to_dict(), "id": JUMLAH_BARIS + 1, "nilai_akhir": None,
+              "nilai_huruf": None, "predikat": None}
+    return pd.concat([df, pd.DataFrame([kosong])], ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def client(sumber) -> SupabaseTiruan:
+    client = SupabaseTiruan()
+    client.muat(sumber)
+    return client
+
+
+@pytest.fixture(scope="module")
+def acuan(sumber):
+    return statistik_dari_dataframe(sumber[KOLOM_STATISTIK].astype({"nilai_akhir": "float64"}))
+
+
+def _sama(hasil, acuan) -> None:
+    assert hasil.jumlah == acuan.jumlah
+    pd.testing.assert_frame_equal(hasil.per_prodi, acuan.per_prodi, check_names=False,
+                                  check_index_type=False, **TOLERANSI)
+    pd.testing.assert_series_equal(hasil.per_semester, acuan.per_semester, check_names=False,
+                                   check_index_type=False, **TOLERANSI)
+    pd.testing.assert_frame_equal(hasil.matriks, acuan.matriks, check_names=False,
+                                  check_index_type=False, check_column_type=False, **TOLERANSI)
+    pd.testing.assert_series_equal(hasil.distribusi_huruf, acuan.distribusi_huruf,
+                                   check_names=False, check_index_type=False)
+    pd.testing.assert_series_equal(hasil.distribusi_predikat, acuan.distribusi_predikat,
+                                   check_names=False, check_index_type=False)
+    pd.testing.assert_series_equal(hasil.deskriptif, acuan.deskriptif, check_names=False,
+                                   **TOLERANSI)
+    pd.testing.assert_frame_equal(hasil.histogram, acuan.histogram, **TOLERANSI)
+
+
+def test_rpc_statistik_sama_dengan_pandas(client, acuan):
+    _sama(statistik_dari_server(client), acuan)
+
+
+def test_snapshot_ringkas_sama_dengan_pandas(client, acuan):
+    snapshot = ambil_data(client, KOLOM_STATISTIK, ringkas=True)
+    assert snapshot["nilai_akhir"].dtype == np.float32
+    _sama(statistik_dari_dataframe(snapshot), acuan)
+
+
+def test_statistik_berjalan_sama_dengan_pandas(client, acuan):
+    berjalan = StatistikBerjalan().bangun(ambil_data(client, KOLOM_STATISTIK, ringkas=True))
+    _sama(berjalan.statistik(), acuan)
+
+
+@pytest.mark.parametrize("filter_data", [
+    None,
+    {"prodi": ["SI"]},
+    {"prodi": ["TI", "Teknosi"], "semester": [1, 2, 8]},
+    {"predikat": ["Baik"], "semester": [3]},
+])
+def test_rpc_ringkasan_sama_dengan_pandas(client, sumber, filter_data):
+    df = sumber
+    for kolom, nilai in (filter_data or {}).items():
+        df = df[df[kolom].isin(nilai)]
+    hasil = ringkasan_dari_server(client, filter_data)
+    acuan = ringkasan_dari_dataframe(df)
+    assert hasil["jumlah"] == acuan["jumlah"]
+    for kunci in ("rata_rata", "maks", "min"):
+        assert hasil[kunci] == pytest.approx(acuan[kunci], rel=1e-9)
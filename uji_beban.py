@@ -0,0 +1,485 @@
+"""
+Uji beban sesi dosen bersamaan terhadap app.py lewat Streamlit AppTest
+
+Setiap sesi adalah satu AppTest yang dijalankan di thread sendiri, seperti server Streamlit
+menjalankan skrip setiap sesi di thread terpisah dalam satu proses: cache_resource (client,
+cache snapshot, indeks, agregat berjalan) dipakai bersama dan GIL dibagi. Supabase diganti
+tiruan SQLite (supabase_tiruan.py) dengan latensi per request, diisi data sintetis.
+Kredensial dan semua berkas yang ditulis aplikasi (antrian simpan, penyimpanan lokal,
+metrik latensi) dipaksa lewat secrets ke tiruan dan direktori sementara, sehingga uji beban
+tidak pernah menyentuh backend sungguhan atau berkas di direktori kerja.
+
+Setiap sesi menjalankan campuran aksi (simpan form nilai, ubah filter, pindah halaman tabel,
+cari NIM, ganti tab statistik) dengan jeda berpikir acak. Untuk setiap jumlah sesi dilaporkan
+throughput, persentil latensi per aksi dan memori per sesi; batas skala adalah jumlah sesi
+terbesar sebelum p95 pertama kali melewati ambang atau ada aksi yang gagal.
+
+Penggunaan:
+    python uji_beban.py --sesi 1 5 10 20 --durasi 30
+    python uji_beban.py --sesi 10 --baris 100000 --latensi 0.03 --json hasil_beban.json
+    python uji_beban.py --sesi 5 10 --atur STATISTIK_BERJALAN=false
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from benchmark import data_sintetis
+from penilaian import DAFTAR_PRODI, DAFTAR_SEMESTER
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+SESI_DEFAULT = [1, 2, 5, 10, 20]
+DURASI_DEFAULT = 30.0          # detik per tingkat jumlah sesi
+JEDA_DEFAULT = 1.0             # rata-rata jeda berpikir antar aksi (detik, eksponensial)
+LATENSI_DEFAULT = 0.02         # latensi per request Supabase tiruan (detik)
+BARIS_DEFAULT = 10_000
+AMBANG_P95 = 2.0               # p95 latensi aksi (detik) yang masih dianggap layak
+TIMEOUT_RUN = 120.0
+
+HALAMAN_INPUT = "📝 INPUT NILAI"
+HALAMAN_REKAP = "📊 REKAPITULASI NILAI"
+HALAMAN_STATISTIK = "📈 STATISTIK NILAI"
+
+# Bobot campuran aksi satu sesi dosen
+CAMPURAN_AKSI = {
+    "simpan_nilai": 0.25,
+    "filter_rekap": 0.2,
+    "halaman_rekap": 0.15,
+    "cari_rekap": 0.15,
+    "tab_statistik": 0.25,
+}
+
+PERSENTIL = (50, 95, 99)
+
+# Alamat .invalid tidak pernah bisa di-resolve (RFC 6761): tanpa tiruan pun tidak ada request keluar
+URL_TIRUAN = "http://supabase-tiruan.invalid"
+KUNCI_TIRUAN = "kunci-tiruan"
+# Konfigurasi yang selalu ditetapkan uji beban dan tidak bisa diubah lewat --atur
+KONFIGURASI_TETAP = ("SUPABASE_URL", "SUPABASE_KEY", "BERKAS_ANTRIAN", "BERKAS_LOKAL",
+                     "BERKAS_METRIK")
+
+
+# ==================== APPTEST BERSAMA ====================
+_lock_pasang = threading.Lock()
+_terpasang = False
+
+
+def pasang_apptest_bersama(secrets: dict) -> None:
+    """
+    AppTest dirancang untuk satu sesi sekali jalan per proses. Agar banyak AppTest bisa
+    berjalan bersamaan, keadaan global yang diganti per run dibuat tetap:
+    - st.secrets dipasang sekali (AppTest.secrets dibiarkan kosong agar tidak ditukar per run)
+    - Runtime tiruan terakhir tetap terlihat setelah run lain selesai dan mengosongkannya
+    - bytecode app.py dikompilasi sekali (ast.parse bersamaan tidak aman di CPython 3.11)
+    - opsi global.appTest aktif permanen, bukan di-patch dan dipulihkan per run
+    """
+    global _terpasang
+    import streamlit as st
+    from streamlit import config
+    from streamlit.runtime.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.secrets import Secrets
+
+    rahasia = Secrets()
+    rahasia._secrets = dict(secrets)
+    st.secrets = rahasia
+
+    with _lock_pasang:
+        if _terpasang:
+            return
+        config.set_option("global.appTest", True)
+
+        terakhir: List[Optional[Runtime]] = [None]
+
+        def instance(cls) -> Runtime:
+            if cls._instance is not None:
+                terakhir[0] = cls._instance
+            if terakhir[0] is None:
+                raise RuntimeError("Runtime hasn't been created!")
+            return cls._instance or terakhir[0]
+
+        Runtime.instance = classmethod(instance)
+        Runtime.exists = classmethod(lambda cls: cls._instance is not None or terakhir[0] is not None)
+
+        bytecode: Dict[str, object] = {}
+        lock_bytecode = threading.Lock()
+        ambil_bytecode = ScriptCache.get_bytecode
+
+        def get_bytecode(self, script_path: str):
+            with lock_bytecode:
+                if script_path not in bytecode:
+                    bytecode[script_path] = ambil_bytecode(self, script_path)
+                return bytecode[script_path]
+
+        ScriptCache.get_bytecode = get_bytecode
+        _terpasang = True
+
+
+def secrets_uji(direktori: str, atur: Optional[dict] = None) -> dict:
+    """
+    Secrets aplikasi untuk uji beban: --atur ditambah kredensial tiruan dan berkas
+    di direktori sementara, yang tidak boleh ditimpa
+    """
+    terlarang = sorted(set(atur or {}) & set(KONFIGURASI_TETAP))
+    if terlarang:
+        raise ValueError(f"Konfigurasi ini ditetapkan uji beban: {', '.join(terlarang)}")
+    return {
+        **(atur or {}),
+        "SUPABASE_URL": URL_TIRUAN,
+        "SUPABASE_KEY": KUNCI_TIRUAN,
+        "BERKAS_ANTRIAN": os.path.join(direktori, ".antrian_simpan.db"),
+        "BERKAS_LOKAL": os.path.join(direktori, "nilai_lokal.db"),
+        "BERKAS_METRIK": os.path.join(direktori, "metrik_latensi"),
+    }
+
+
+def pasang_supabase_tiruan(client) -> None:
+    """
+    create_client (dipakai init_supabase dan KoneksiSupabase) mengembalikan Supabase tiruan
+    """
+    import supabase
+
+    supabase.create_client = lambda url, key, **_: client
+
+
+def _rss_byte() -> int:
+    """
+    Resident set size proses saat ini; fallback ke puncak RSS jika /proc tidak tersedia
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# ==================== SESI DOSEN ====================
+@dataclass
+class Catatan:
+    aksi: str
+    detik: float
+    berhasil: bool
+
+
+class SesiDosen:
+    """
+    Satu sesi browser dosen: AppTest dengan session_state sendiri dan aksi acak berbobot
+    """
+
+    def __init__(self, nomor: int, seed: int, baris: int = BARIS_DEFAULT,
+                 timeout: float = TIMEOUT_RUN):
+        from streamlit.testing.v1 import AppTest
+
+        self.nomor = nomor
+        self.baris = baris
+        self.rng = random.Random(seed * 1000 + nomor)
+        self.at = AppTest.from_file(APP, default_timeout=timeout)
+        self.halaman = None
+        self.disimpan = 0
+        self.catatan: List[Catatan] = []
+        self.galat: List[str] = []
+
+    def _ukur(self, aksi: str, jalankan: Callable[[], None]) -> None:
+        mulai = time.perf_counter()
+        try:
+            jalankan()
+            galat = [str(e.value) for e in self.at.exception] + [str(e.value) for e in self.at.error]
+        except Exception as e:
+            galat = [f"{type(e).__name__}: {e}"]
+        self.catatan.append(Catatan(aksi, time.perf_counter() - mulai, not galat))
+        self.galat.extend(f"{aksi}: {g}" for g in galat[:1])
+
+    def _widget(self, daftar, label: str):
+        return next(w for w in daftar if w.label == label)
+
+    def buka(self) -> None:
+        self._ukur("buka_aplikasi", self.at.run)
+        self.halaman = "🏠 HOME"
+
+    def _ke(self, halaman: str) -> None:
+        if self.halaman != halaman:
+            self._ukur("pindah_halaman", lambda: self.at.sidebar.radio[0].set_value(halaman).run())
+            self.halaman = halaman
+
+    # ==================== AKSI ====================
+    def simpan_nilai(self) -> None:
+        self._ke(HALAMAN_INPUT)
+        self.disimpan += 1
+
+        def isi_form() -> None:
+            at = self.at
+            self._widget(at.text_input, "Nama Mahasiswa *").set_value(f"Beban {self.nomor}-{self.disimpan}")
+            # NIM unik per sesi agar tidak berhenti di konfirmasi duplikat
+            self._widget(at.text_input, "NIM *").set_value(f"9{self.nomor:04d}{self.disimpan:05d}")
+            self._widget(at.selectbox, "Program Studi *").set_value(self.rng.choice(DAFTAR_PRODI))
+            self._widget(at.selectbox, "Semester *").set_value(self.rng.choice(DAFTAR_SEMESTER))
+            for label in ("Nilai Tugas (0-100) *", "Nilai UTS (0-100) *", "Nilai UAS (0-100) *"):
+                self._widget(at.number_input, label).set_value(float(self.rng.randint(40, 100)))
+            self._widget(at.button, "🧮 Hitung & Simpan").click().run()
+
+        self._ukur("simpan_nilai", isi_form)
+
+    def filter_rekap(self) -> None:
+        self._ke(HALAMAN_REKAP)
+        prodi = self.rng.sample(DAFTAR_PRODI, self.rng.randint(1, len(DAFTAR_PRODI)))
+        self._ukur("filter_rekap", lambda: self._widget(
+            self.at.multiselect, "Filter Program Studi").set_value(prodi).run())
+
+    def halaman_rekap(self) -> None:
+        self._ke(HALAMAN_REKAP)
+
+        def pindah() -> None:
+            halaman = self.at.number_input(key="halaman_rekap")
+            halaman.set_value(self.rng.randint(1, int(halaman.max or 1))).run()
+
+        self._ukur("halaman_rekap", pindah)
+
+    def cari_rekap(self) -> None:
+        self._ke(HALAMAN_REKAP)
+        awalan = str(2020000000 + self.rng.randrange(self.baris))[:self.rng.randint(6, 9)]
+        self._ukur("cari_rekap", lambda: self.at.text_input(key="cari_rekap").set_value(awalan).run())
+
+    def tab_statistik(self) -> None:
+        self._ke(HALAMAN_STATISTIK)
+
+        def ganti() -> None:
+            tab = self.at.radio(key="tab_statistik")
+            tab.set_value(self.rng.choice([t for t in tab.options if t != tab.value])).run()
+
+        self._ukur("tab_statistik", ganti)
+
+    def langkah(self) -> None:
+        aksi = self.rng.choices(list(CAMPURAN_AKSI), weights=list(CAMPURAN_AKSI.values()))[0]
+        getattr(self, aksi)()
+
+
+# ==================== TINGKAT BEBAN ====================
+@dataclass
+class HasilTingkat:
+    sesi: int
+    detik: float
+    aksi: int
+    gagal: int
+    aksi_per_detik: float
+    cpu_persen: float
+    memori_per_sesi_mb: float
+    latensi_ms: Dict[str, float] = field(default_factory=dict)
+    per_aksi: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    contoh_galat: List[str] = field(default_factory=list)
+
+
+def _persentil(detik: Sequence[float]) -> Dict[str, float]:
+    if not detik:
+        return {f"p{p}": float("nan") for p in PERSENTIL}
+    nilai = np.percentile(np.asarray(detik) * 1000, PERSENTIL)
+    return {f"p{p}": float(v) for p, v in zip(PERSENTIL, nilai)}
+
+
+def jalankan_tingkat(sesi: int, durasi: float = DURASI_DEFAULT, jeda: float = JEDA_DEFAULT,
+                     baris: int = BARIS_DEFAULT, seed: int = 42,
+                     timeout: float = TIMEOUT_RUN) -> HasilTingkat:
+    """
+    sesi sesi dibuka bersamaan lalu menjalankan aksi acak sampai durasi habis.
+    Memori per sesi = kenaikan RSS proses selama tingkat ini dibagi jumlah sesi (termasuk
+    pertumbuhan cache bersama akibat data yang disimpan), diukur saat semua sesi masih hidup.
+    """
+    gc.collect()
+    rss_awal = _rss_byte()
+    daftar = [SesiDosen(i, seed, baris, timeout) for i in range(sesi)]
+    mulai_bersama = threading.Barrier(sesi)
+    batas_waktu: List[float] = []
+
+    def jalan(s: SesiDosen) -> None:
+        mulai_bersama.wait()
+        s.buka()
+        while time.perf_counter() < batas_waktu[0]:
+            s.langkah()
+            time.sleep(s.rng.expovariate(1 / jeda) if jeda > 0 else 0)
+
+    thread = [threading.Thread(target=jalan, args=(s,), name=f"sesi-{s.nomor}") for s in daftar]
+    mulai, cpu_mulai = time.perf_counter(), time.process_time()
+    batas_waktu.append(mulai + durasi)
+    for t in thread:
+        t.start()
+    for t in thread:
+        t.join()
+    detik = time.perf_counter() - mulai
+    cpu = time.process_time() - cpu_mulai
+    rss_akhir = _rss_byte()
+
+    catatan = [c for s in daftar for c in s.catatan]
+    per_aksi = {}
+    for aksi in sorted({c.aksi for c in catatan}):
+        bagian = [c for c in catatan if c.aksi == aksi]
+        per_aksi[aksi] = {"n": len(bagian), "gagal": sum(not c.berhasil for c in bagian),
+                          **_persentil([c.detik for c in bagian])}
+    # Throughput dan latensi keseluruhan hanya dari aksi pengguna, tanpa buka aplikasi
+    aksi_pengguna = [c for c in catatan if c.aksi != "buka_aplikasi"]
+    return HasilTingkat(
+        sesi=sesi,
+        detik=detik,
+        aksi=len(aksi_pengguna),
+        gagal=sum(not c.berhasil for c in catatan),
+        aksi_per_detik=len(aksi_pengguna) / detik,
+        cpu_persen=cpu / detik * 100,
+        memori_per_sesi_mb=max(rss_akhir - rss_awal, 0) / sesi / (1024 * 1024),
+        latensi_ms=_persentil([c.detik for c in aksi_pengguna]),
+        per_aksi=per_aksi,
+        contoh_galat=[g for s in daftar for g in s.galat][:5],
+    )
+
+
+def pemanasan(baris: int = BARIS_DEFAULT, timeout: float = TIMEOUT_RUN) -> None:
+    """
+    Satu sesi membuka semua halaman dan tab agar impor modul, inisialisasi layanan dan
+    cache grafik tidak ikut terukur pada tingkat pertama
+    """
+    s = SesiDosen(-1, 0, baris, timeout)
+    s.buka()
+    s.filter_rekap()
+    s.cari_rekap()
+    s._ke(HALAMAN_STATISTIK)
+    for tab in s.at.radio(key="tab_statistik").options:
+        s._ukur("tab_statistik", lambda: s.at.radio(key="tab_statistik").set_value(tab).run())
+    s.simpan_nilai()
+    if s.galat:
+        raise RuntimeError(f"Pemanasan gagal: {s.galat[0]}")
+
+
+def batas_skala(hasil: List[HasilTingkat], ambang_p95: float = AMBANG_P95) -> Optional[int]:
+    """
+    Jumlah sesi terbesar sebelum tingkat pertama yang p95-nya melewati ambang atau punya
+    aksi gagal; None jika tingkat terkecil pun sudah melewatinya
+    """
+    batas = None
+    for h in sorted(hasil, key=lambda h: h.sesi):
+        if h.gagal or h.latensi_ms["p95"] > ambang_p95 * 1000:
+            break
+        batas = h.sesi
+    return batas
+
+
+def uji_beban(sesi: Optional[List[int]] = None, durasi: float = DURASI_DEFAULT,
+              jeda: float = JEDA_DEFAULT, baris: int = BARIS_DEFAULT,
+              latensi: float = LATENSI_DEFAULT, atur: Optional[dict] = None,
+              seed: int = 42, timeout: float = TIMEOUT_RUN,
+              laporan: Optional[Callable[[HasilTingkat], None]] = None) -> List[HasilTingkat]:
+    """
+    Siapkan Supabase tiruan berisi `baris` data sintetis lalu jalankan setiap tingkat jumlah
+    sesi berurutan di proses yang sama (cache bersama tetap hangat antar tingkat).
+    Berkas yang ditulis aplikasi berada di direktori sementara yang dihapus setelah selesai.
+    """
+    from supabase_tiruan import SupabaseTiruan
+
+    with tempfile.TemporaryDirectory(prefix="uji_beban_") as direktori:
+        secrets = secrets_uji(direktori, atur)
+        client = SupabaseTiruan(latensi=latensi)
+        client.muat(data_sintetis(baris, seed))
+        pasang_supabase_tiruan(client)
+        pasang_apptest_bersama(secrets)
+
+        pemanasan(baris, timeout)
+        hasil = []
+        for n in sesi or SESI_DEFAULT:
+            tingkat = jalankan_tingkat(n, durasi, jeda, baris, seed, timeout)
+            hasil.append(tingkat)
+            if laporan:
+                laporan(tingkat)
+    return hasil
+
+
+# ==================== CLI ====================
+def _nilai_atur(teks: str):
+    """
+    NAMA=NILAI dari --atur; nilai dibaca sebagai JSON (true, 30, 0.5) atau teks biasa
+    """
+    nama, _, nilai = teks.partition("=")
+    try:
+        return nama.strip(), json.loads(nilai)
+    except json.JSONDecodeError:
+        return nama.strip(), nilai
+
+
+def _cetak_tingkat(h: HasilTingkat) -> None:
+    lat = h.latensi_ms
+    print(f"{h.sesi:>5} {h.aksi_per_detik:>9.2f} {lat['p50']:>9.0f} {lat['p95']:>9.0f} "
+          f"{lat['p99']:>9.0f} {h.gagal:>6} {h.memori_per_sesi_mb:>9.1f} {h.cpu_persen:>6.0f}",
+          flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Uji beban sesi dosen bersamaan (Streamlit AppTest)")
+    parser.add_argument("--sesi", type=int, nargs="+", default=SESI_DEFAULT,
+                        help="Jumlah sesi bersamaan yang diuji, berurutan")
+    parser.add_argument("--durasi", type=float, default=DURASI_DEFAULT,
+                        help="Lama setiap tingkat (detik)")
+    parser.add_argument("--jeda", type=float, default=JEDA_DEFAULT,
+                        help="Rata-rata jeda berpikir antar aksi (detik), 0 = tanpa jeda")
+    parser.add_argument("--baris", type=int, default=BARIS_DEFAULT,
+                        help="Jumlah baris data sintetis di Supabase tiruan")
+    parser.add_argument("--latensi", type=float, default=LATENSI_DEFAULT,
+                        help="Latensi per request Supabase tiruan (detik)")
+    parser.add_argument("--ambang-p95", type=float, default=AMBANG_P95,
+                        help="p95 latensi aksi (detik) untuk menentukan batas skala")
+    parser.add_argument("--atur", action="append", default=[], metavar="NAMA=NILAI",
+                        help="Konfigurasi aplikasi (secrets), mis. STATISTIK_BERJALAN=false")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_RUN,
+                        help="Batas waktu satu rerun AppTest (detik)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Tulis hasil lengkap ke berkas JSON")
+    args = parser.parse_args(argv)
+    atur = dict(_nilai_atur(a) for a in args.atur)
+    terlarang = sorted(set(atur) & set(KONFIGURASI_TETAP))
+    if terlarang:
+        parser.error(f"--atur tidak boleh mengubah {', '.join(terlarang)}")
+
+    # Peringatan Streamlit per rerun (konteks script, parameter usang) menenggelamkan laporan
+    from streamlit import config, logger
+
+    config.set_option("logger.level", "error")
+    logger.set_log_level("error")
+
+    print(f"{args.baris} baris, latensi {args.latensi * 1000:.0f} ms/request, "
+          f"{args.durasi:.0f} dtk per tingkat, jeda {args.jeda:.1f} dtk", flush=True)
+    print(f"{'sesi':>5} {'aksi/dtk':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'gagal':>6} {'MB/sesi':>9} {'CPU%':>6}", flush=True)
+    hasil = uji_beban(args.sesi, args.durasi, args.jeda, args.baris, args.latensi,
+                      atur, args.seed, args.timeout, laporan=_cetak_tingkat)
+
+    for h in hasil:
+        print(f"--- {h.sesi} sesi ---")
+        for aksi, r in h.per_aksi.items():
+            print(f"{aksi:>16}: n={r['n']:<5} gagal={r['gagal']:<3} "
+                  + " ".join(f"p{p}={r[f'p{p}']:.0f}ms" for p in PERSENTIL))
+        for galat in h.contoh_galat:
+            print(f"  galat {galat}")
+
+    batas = batas_skala(hasil, args.ambang_p95)
+    puncak = max(hasil, key=lambda h: h.aksi_per_detik)
+    print(f"Throughput puncak: {puncak.aksi_per_detik:.2f} aksi/dtk pada {puncak.sesi} sesi")
+    print(f"Batas skala (p95 <= {args.ambang_p95:.1f} dtk, tanpa gagal): "
+          + (f"{batas} sesi" if batas is not None else "tidak tercapai"))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"argumen": vars(args), "hasil": [asdict(h) for h in hasil],
+                       "batas_skala": batas}, f, indent=2)
+        print(f"Hasil ditulis ke {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())